@@ -0,0 +1,244 @@
+import time
+import bisect
+import argparse
+
+from storage import normalize_exercise_name
+
+# Bundled exercise names with the muscle groups offered in the Add Exercise dialog
+EXERCISE_CATALOG = {
+    'Chest': [
+        'Bench Press', 'Incline Bench Press', 'Decline Bench Press', 'Close-Grip Bench Press',
+        'Dumbbell Bench Press', 'Incline Dumbbell Press', 'Dumbbell Flyes', 'Incline Dumbbell Flyes',
+        'Cable Crossover', 'Cable Flyes', 'Pec Deck', 'Chest Press Machine', 'Push-ups',
+        'Diamond Push-ups', 'Chest Dips', 'Floor Press', 'Landmine Press', 'Svend Press'
+    ],
+    'Back': [
+        'Deadlift', 'Romanian Deadlift', 'Sumo Deadlift', 'Rack Pull', 'Pull-ups', 'Chin-ups',
+        'Lat Pulldown', 'Close-Grip Lat Pulldown', 'Barbell Row', 'Pendlay Row', 'Dumbbell Row',
+        'T-Bar Row', 'Seated Cable Row', 'Chest-Supported Row', 'Inverted Row', 'Straight-Arm Pulldown',
+        'Good Mornings', 'Back Extension', 'Shrugs', 'Dumbbell Shrugs', 'Meadows Row', 'Seal Row'
+    ],
+    'Legs': [
+        'Squat', 'Front Squat', 'Goblet Squat', 'Hack Squat', 'Box Squat', 'Bulgarian Split Squat',
+        'Leg Press', 'Lunges', 'Walking Lunges', 'Reverse Lunges', 'Step-ups', 'Leg Extension',
+        'Leg Curl', 'Seated Leg Curl', 'Nordic Curl', 'Hip Thrust', 'Glute Bridge', 'Calf Raises',
+        'Seated Calf Raises', 'Stiff-Leg Deadlift', 'Trap Bar Deadlift', 'Pistol Squat',
+        'Hip Abduction', 'Hip Adduction', 'Sissy Squat', 'Belt Squat'
+    ],
+    'Arms': [
+        'Bicep Curls', 'Barbell Curl', 'EZ-Bar Curl', 'Hammer Curls', 'Preacher Curl',
+        'Incline Dumbbell Curl', 'Concentration Curl', 'Cable Curl', 'Spider Curl', 'Reverse Curl',
+        'Tricep Pushdown', 'Rope Pushdown', 'Overhead Tricep Extension', 'Skull Crushers',
+        'Tricep Dips', 'Tricep Kickbacks', 'JM Press', 'Wrist Curls', 'Reverse Wrist Curls',
+        'Farmer\'s Walk'
+    ],
+    'Shoulders': [
+        'Overhead Press', 'Seated Dumbbell Press', 'Arnold Press', 'Push Press', 'Lateral Raises',
+        'Cable Lateral Raises', 'Front Raises', 'Rear Delt Flyes', 'Reverse Pec Deck', 'Face Pulls',
+        'Upright Row', 'Machine Shoulder Press', 'Behind-the-Neck Press', 'Y Raises',
+        'Handstand Push-ups', 'Z Press'
+    ],
+    'Core': [
+        'Plank', 'Side Plank', 'Crunches', 'Cable Crunch', 'Hanging Leg Raises', 'Lying Leg Raises',
+        'Russian Twists', 'Ab Wheel Rollout', 'Bicycle Crunches', 'Mountain Climbers', 'Dead Bug',
+        'Pallof Press', 'Sit-ups', 'V-ups', 'Hollow Hold', 'Woodchoppers', 'Dragon Flag',
+        'L-Sit', 'Toes to Bar', 'Bird Dog'
+    ]
+}
+
+class TrieNode:
+    __slots__ = ('children', 'top')
+    
+    def __init__(self):
+        self.children = {}
+        # Best-ranked entries anywhere below this node, so a prefix lookup never walks the subtree
+        self.top = []
+
+class ExerciseEntry:
+    __slots__ = ('key', 'name', 'muscle_group', 'uses', 'catalog', 'rank')
+    
+    def __init__(self, key, name, muscle_group, uses, catalog):
+        self.key = key
+        self.name = name
+        self.muscle_group = muscle_group
+        self.uses = uses
+        self.catalog = catalog
+        self.update_rank()
+    
+    def update_rank(self):
+        # The user's own exercises first (most used), then the catalog; shorter (more generic) names win ties
+        self.rank = (-self.uses, self.catalog, len(self.name), self.name.lower())
+
+class ExerciseAutocomplete:
+    # Trie over normalized exercise names, indexed at every word so "curl" finds "Hammer Curls".
+    # Prefix lookups are O(len(text)); typos fall back to a bounded edit-distance walk of the trie.
+    TOP_PER_NODE = 8
+    
+    def __init__(self, catalog=None, resolve_muscle_group=None):
+        self.root = TrieNode()
+        self.entries = {}
+        # Called with a user exercise name whose muscle group is unknown (e.g. a db lookup)
+        self.resolve_muscle_group = resolve_muscle_group
+        for muscle_group, names in (EXERCISE_CATALOG if catalog is None else catalog).items():
+            for name in names:
+                self.add(name, muscle_group, uses=0, catalog=True)
+    
+    def add(self, name, muscle_group=None, uses=1, catalog=False):
+        # Adding a name again bumps its ranking; the latest display name and muscle group win
+        norm = normalize_exercise_name(name)
+        if not norm:
+            return None
+        entry = self.entries.get(norm)
+        if entry is None:
+            entry = self.entries[norm] = ExerciseEntry(norm, name, muscle_group, uses, catalog)
+        else:
+            entry.uses += uses
+            if not catalog:
+                entry.name = name
+                entry.catalog = False
+            if muscle_group:
+                entry.muscle_group = muscle_group
+            entry.update_rank()
+        
+        words = norm.split(' ')
+        for i in range(len(words)):
+            self.insert(' '.join(words[i:]), entry)
+        return entry
+    
+    def insert(self, key, entry):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, TrieNode())
+            self.offer(node, entry)
+    
+    def offer(self, node, entry):
+        top = node.top
+        rank = entry.rank
+        if len(top) >= self.TOP_PER_NODE and rank >= top[-1].rank and entry is not top[-1]:
+            return
+        if entry in top:
+            top.remove(entry)
+        i = bisect.bisect_right(top, rank, key=lambda other: other.rank)
+        top.insert(i, entry)
+        del top[self.TOP_PER_NODE:]
+    
+    def find_node(self, key):
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+    
+    @staticmethod
+    def max_distance(key):
+        return 0 if len(key) < 3 else 1 if len(key) < 6 else 2
+    
+    def fuzzy_nodes(self, key, max_distance):
+        # Levenshtein rows carried down the trie; a branch is cut once every cell exceeds the bound.
+        # A node whose prefix is within the bound covers its whole subtree via its top list.
+        matches = []
+        first_row = list(range(len(key) + 1))
+        stack = [(child, ch, first_row) for ch, child in self.root.children.items()]
+        while stack:
+            node, ch, previous = stack.pop()
+            left = lowest = previous[0] + 1
+            row = [left]
+            for i, key_ch in enumerate(key):
+                # min() of substitution, insertion and deletion, inlined for speed
+                cell = previous[i] if key_ch == ch else previous[i] + 1
+                if left < cell:
+                    cell = left + 1 if left + 1 < cell else cell
+                above = previous[i + 1] + 1
+                left = above if above < cell else cell
+                if left < lowest:
+                    lowest = left
+                row.append(left)
+            if left <= max_distance:
+                matches.append((left, node))
+            elif lowest <= max_distance:
+                stack.extend((child, next_ch, row) for next_ch, child in node.children.items())
+        return matches
+    
+    def suggest(self, text, limit=5):
+        # [(name, muscle_group)] best first; exact prefix matches before fuzzy ones
+        key = normalize_exercise_name(text)
+        if not key:
+            return []
+        
+        results = []
+        node = self.find_node(key)
+        if node is not None:
+            results.extend(node.top)
+        
+        # Typos only: any prefix hit means the name is being typed correctly so far
+        if not results and self.max_distance(key):
+            fuzzy = sorted(self.fuzzy_nodes(key, self.max_distance(key)), key=lambda match: match[0])
+            for _, fuzzy_node in fuzzy:
+                results.extend(entry for entry in fuzzy_node.top if entry not in results)
+                if len(results) >= limit:
+                    break
+        
+        # Names starting with the text rank above those matched at a later word
+        results.sort(key=lambda entry: not entry.key.startswith(key))
+        return [(entry.name, self.muscle_group_of(entry)) for entry in results[:limit]]
+    
+    def muscle_group_of(self, entry):
+        if entry.muscle_group is None and self.resolve_muscle_group:
+            entry.muscle_group = self.resolve_muscle_group(entry.name) or ''
+        if not entry.muscle_group or entry.muscle_group == 'General':
+            # A user exercise without a specific group borrows it from the closest catalog name
+            entry.muscle_group = self.infer_from_catalog(entry.name)
+        return entry.muscle_group
+    
+    def infer_from_catalog(self, name):
+        # Trailing words are dropped until something matches, so "Bench Press (Barbell)"
+        # as exported by other apps still lands on "Bench Press"
+        words = normalize_exercise_name(name).split(' ')
+        while words:
+            key = ' '.join(words)
+            node = self.find_node(key)
+            candidates = list(node.top) if node is not None else []
+            if not candidates and self.max_distance(key):
+                for _, fuzzy_node in sorted(self.fuzzy_nodes(key, self.max_distance(key)), key=lambda match: match[0]):
+                    candidates.extend(fuzzy_node.top)
+            for entry in candidates:
+                if entry.catalog and entry.muscle_group:
+                    return entry.muscle_group
+            words.pop()
+        return 'General'
+    
+    def infer_muscle_group(self, name):
+        entry = self.entries.get(normalize_exercise_name(name))
+        if entry is not None:
+            return self.muscle_group_of(entry)
+        return self.infer_from_catalog(name)
+
+def build_autocomplete(db_manager):
+    # Catalog plus every exercise name the user has logged, ranked by how often it was used
+    autocomplete = ExerciseAutocomplete(resolve_muscle_group=db_manager.get_exercise_muscle_group)
+    for name, muscle_group, uses in db_manager.get_exercise_names():
+        autocomplete.add(name, muscle_group, uses=uses)
+    return autocomplete
+
+def run_benchmark(size=5000, repeat=200):
+    started = time.perf_counter()
+    autocomplete = ExerciseAutocomplete()
+    for i in range(size):
+        autocomplete.add(f"Custom Lift {i}", None, uses=i % 7)
+    print(f"built {len(autocomplete.entries)} entries in {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    for text in ('b', 'bench', 'benhc pres', 'curl', 'squta', 'custom lift 42', 'lateral raise'):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            suggestions = autocomplete.suggest(text)
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        print(f"{text!r:18} {elapsed:7.3f} ms  {[name for name, _ in suggestions[:3]]}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Exercise autocomplete utilities")
+    parser.add_argument('--benchmark', action='store_true', help="time suggestions over a large index")
+    parser.add_argument('--size', type=int, default=5000, help="user exercise names to add for --benchmark")
+    args = parser.parse_args()
+    if args.benchmark:
+        run_benchmark(args.size)
@@ -0,0 +1,297 @@
+import os
+import csv
+import collections
+import argparse
+from datetime import datetime
+
+from storage import create_database_manager, normalize_exercise_name, json_dumps, json_loads
+from exercise_catalog import ExerciseAutocomplete
+
+# Flat layout shared by the CSV and JSON-lines exports: one row per set
+EXPORT_FIELDS = [
+    'date', 'time', 'workout_name', 'workout_type', 'exercise_name', 'muscle_group',
+    'set_number', 'weight', 'reps', 'volume'
+]
+
+# Column names used by this app, Strong and Hevy exports, for each canonical field
+COLUMN_ALIASES = {
+    'date': ('date', 'Date', 'start_time'),
+    'time': ('time', 'Time'),
+    'workout_name': ('workout_name', 'Workout Name', 'title'),
+    'workout_type': ('workout_type',),
+    'exercise_name': ('exercise_name', 'Exercise Name', 'exercise_title'),
+    'muscle_group': ('muscle_group',),
+    'set_number': ('set_number', 'Set Order', 'set_index'),
+    'weight': ('weight', 'Weight', 'weight_kg', 'weight_lbs'),
+    'reps': ('reps', 'Reps'),
+}
+
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d',
+    '%d %b %Y, %H:%M', '%d %b %Y %H:%M', '%b %d, %Y, %I:%M %p', '%m/%d/%Y %H:%M', '%m/%d/%Y'
+)
+
+LBS_TO_KG = 0.45359237
+
+def iter_history_rows(db_manager):
+    # Oldest session first, one session in memory at a time. Exercises and sessions
+    # without sets still get a row (with empty set fields) so they survive a round trip.
+    for session_id, header in db_manager.sessions_between('0000-00-00', '9999-99-99'):
+        session = db_manager.scan_session(session_id)
+        base = {
+            'date': session.get('date', ''), 'time': session.get('time', ''),
+            'workout_name': session.get('name', ''), 'workout_type': session.get('workout_type', 'Custom')
+        }
+        exercises = session.get('exercises', {})
+        if not exercises:
+            yield dict(base, exercise_name='', muscle_group='', set_number='', weight='', reps='', volume='')
+        for exercise in exercises.values():
+            row = dict(base, exercise_name=exercise['name'], muscle_group=exercise.get('muscle_group', ''))
+            sets = sorted(exercise.get('sets', {}).values(), key=lambda set_data: set_data['set_number'])
+            if not sets:
+                yield dict(row, set_number='', weight='', reps='', volume='')
+            for set_data in sets:
+                yield dict(row, set_number=set_data['set_number'], weight=set_data['weight'],
+                           reps=set_data['reps'], volume=set_data['volume'])
+
+def write_export(path, write_rows):
+    # Written next to the target and moved over it, so a failed export leaves the old file
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            count = write_rows(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+def export_csv(db_manager, path):
+    def write_rows(f):
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        count = 0
+        for row in iter_history_rows(db_manager):
+            writer.writerow(row)
+            count += 1
+        return count
+    return write_export(path, write_rows)
+
+def export_jsonl(db_manager, path):
+    def write_rows(f):
+        count = 0
+        for row in iter_history_rows(db_manager):
+            f.write(json_dumps(row) + '\n')
+            count += 1
+        return count
+    return write_export(path, write_rows)
+
+def iter_csv_rows(path):
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            # Strong writes ';' in some locales
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.DictReader(f, dialect=dialect)
+
+def iter_jsonl_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json_loads(line)
+            except ValueError:
+                print(f"Skipping unreadable line {line_number} in {path}")
+
+def field(raw, name):
+    for alias in COLUMN_ALIASES[name]:
+        value = raw.get(alias)
+        if value not in (None, ''):
+            return alias, value
+    return None, None
+
+def parse_datetime(text):
+    text = str(text).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+def normalize_row(raw):
+    # Canonical row, or None when it cannot be imported (no date, cardio rows, ...). The
+    # placeholder rows written for sessions or exercises without sets come back with
+    # exercise_name and/or the set fields as None.
+    _, date_text = field(raw, 'date')
+    _, exercise_name = field(raw, 'exercise_name')
+    placeholder = all(field(raw, name)[1] is None for name in ('set_number', 'weight', 'reps'))
+    if not date_text or not (exercise_name or placeholder):
+        return None
+    
+    moment = parse_datetime(date_text)
+    if moment is None:
+        return None
+    base = {
+        'date': moment.strftime('%Y-%m-%d'),
+        'workout_name': str(field(raw, 'workout_name')[1] or 'Imported Workout'),
+        'workout_type': str(field(raw, 'workout_type')[1] or 'Custom'),
+        'exercise_name': str(exercise_name).strip() if exercise_name else None,
+        'muscle_group': field(raw, 'muscle_group')[1], 'set_number': None, 'weight': None, 'reps': None
+    }
+    _, time_text = field(raw, 'time')
+    if time_text:
+        clock = str(time_text)[:5]
+    elif len(str(date_text).strip()) > 10:
+        clock = moment.strftime('%H:%M')
+    else:
+        clock = '00:00'
+    base['time'] = clock
+    if placeholder:
+        return base
+    
+    try:
+        weight_alias, weight = field(raw, 'weight')
+        weight = float(weight or 0)
+        if weight_alias == 'weight_lbs' or str(raw.get('Weight Unit', '')).lower().startswith('lb'):
+            weight = round(weight * LBS_TO_KG, 2)
+        reps = int(float(field(raw, 'reps')[1] or 0))
+        set_alias, set_number = field(raw, 'set_number')
+        # Hevy numbers sets from 0
+        set_number = int(float(set_number)) + (1 if set_alias == 'set_index' else 0) if set_number else None
+    except (TypeError, ValueError):
+        return None
+    if reps <= 0 or weight < 0:
+        return None
+    
+    return dict(base, set_number=set_number, weight=weight, reps=reps)
+
+class HistoryImporter:
+    # Maps flat set rows onto a storage backend. Sessions are matched by (date, time, workout
+    # name), exercises by name within them, and a set is skipped when its exercise already holds
+    # its set number. Sets keep the number from the file; rows without one are numbered by their
+    # position within the exercise. Writes are grouped in transactions of batch_size sets, and
+    # stats are recounted once at the end.
+    def __init__(self, db_manager, batch_size=500, autocomplete=None):
+        self.db = db_manager
+        self.batch_size = batch_size
+        self.autocomplete = autocomplete or ExerciseAutocomplete()
+        self.sessions = {}
+        self.exercises = {}
+        # Set numbers stored per (session_id, exercise_id), and rows seen per exercise for unnumbered ones
+        self.set_numbers = {}
+        self.positions = collections.Counter()
+        self.counts = {"sessions": 0, "exercises": 0, "sets": 0, "duplicates": 0, "skipped": 0}
+    
+    def session_for(self, row):
+        key = (row['date'], row['time'], row['workout_name'])
+        session_id = self.sessions.get(key)
+        if session_id is None:
+            # A session from an earlier run of the same import is reused
+            for candidate_id, header in self.db.sessions_between(row['date'], row['date']):
+                if header.get('time') == row['time'] and header.get('name') == row['workout_name']:
+                    session_id = candidate_id
+                    for exercise_id, exercise in self.db.scan_session(session_id).get('exercises', {}).items():
+                        self.exercises.setdefault((session_id, normalize_exercise_name(exercise['name'])), exercise_id)
+                        self.set_numbers[(session_id, exercise_id)] = {
+                            set_data['set_number'] for set_data in exercise.get('sets', {}).values()
+                        }
+                    break
+            else:
+                session_id = self.db.create_workout_session(
+                    row['workout_name'], row['workout_type'], date=row['date'], time=row['time']
+                )
+                self.counts['sessions'] += 1
+            self.sessions[key] = session_id
+        return session_id
+    
+    def exercise_for(self, session_id, row):
+        key = (session_id, normalize_exercise_name(row['exercise_name']))
+        exercise_id = self.exercises.get(key)
+        if exercise_id is None:
+            muscle_group = row['muscle_group'] or self.autocomplete.infer_muscle_group(row['exercise_name'])
+            exercise_id = self.exercises[key] = self.db.add_exercise(session_id, row['exercise_name'], muscle_group)
+            self.set_numbers[(session_id, exercise_id)] = set()
+            self.counts['exercises'] += 1
+        return exercise_id
+    
+    def import_row(self, row):
+        # Placeholders only make sure their session / exercise exists
+        if row['exercise_name'] is None:
+            return self.session_for(row)
+        if row['reps'] is None:
+            session_id = self.session_for(row)
+            self.exercise_for(session_id, row)
+            return session_id
+        
+        session_id = self.session_for(row)
+        exercise_id = self.exercise_for(session_id, row)
+        self.positions[(session_id, exercise_id)] += 1
+        set_number = row['set_number'] or self.positions[(session_id, exercise_id)]
+        known = self.set_numbers[(session_id, exercise_id)]
+        if set_number in known:
+            self.counts['duplicates'] += 1
+            return None
+        
+        if self.db.add_set(session_id, exercise_id, row['weight'], row['reps'], set_number=set_number):
+            self.counts['sets'] += 1
+            known.add(set_number)
+        return session_id
+    
+    def import_rows(self, rows):
+        batch = []
+        touched = set()
+        for raw in rows:
+            row = normalize_row(raw)
+            if row is None:
+                self.counts['skipped'] += 1
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                touched = self.commit_batch(batch, touched)
+                batch = []
+        self.commit_batch(batch, touched)
+        
+        self.db.update_stats()
+        self.db.save_data()
+        return self.counts
+    
+    def commit_batch(self, batch, touched):
+        with self.db.transaction():
+            for row in batch:
+                session_id = self.import_row(row)
+                if session_id:
+                    touched.add(session_id)
+        self.db.save_data()
+        
+        # Sessions of earlier batches are on disk now; keep only the one still being filled
+        current = self.sessions.get((batch[-1]['date'], batch[-1]['time'], batch[-1]['workout_name'])) if batch else None
+        self.db.release_sessions(touched - {current})
+        return {current} & touched
+
+def import_history(db_manager, path, batch_size=500):
+    rows = iter_jsonl_rows(path) if path.endswith(('.jsonl', '.json')) else iter_csv_rows(path)
+    return HistoryImporter(db_manager, batch_size).import_rows(rows)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export or import workout history as CSV / JSON lines")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('path', help="a .csv file, or .jsonl for JSON lines")
+    parser.add_argument('--batch-size', type=int, default=500, help="sets per import transaction")
+    args = parser.parse_args()
+    
+    db_manager = create_database_manager()
+    try:
+        if args.action == 'export':
+            exporter = export_jsonl if args.path.endswith('.jsonl') else export_csv
+            print(f"Exported {exporter(db_manager, args.path)} rows to {args.path}")
+        else:
+            db_manager.create_tables()
+            print(f"Imported {args.path}: {import_history(db_manager, args.path, args.batch_size)}")
+    finally:
+        db_manager.close()
@@ -1,7 +1,17 @@
 import os
-import json
+import sys
+import time
+import importlib
 from datetime import datetime
-import uuid
+
+# Startup timings are measured from here, before the UI toolkit is imported
+STARTED = time.perf_counter()
+
+from startup_profile import pop_profile_flag, ImportTimer, write_report
+
+# Must run before kivy is imported: it parses sys.argv and rejects unknown options
+PROFILE_REPORT_FILE = pop_profile_flag(sys.argv)
+import_timer = ImportTimer().install() if PROFILE_REPORT_FILE else None
 
 from kivymd.app import MDApp
 from kivymd.uix.screen import MDScreen
@@ -10,180 +20,241 @@ from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.card import MDCard
 from kivymd.uix.label import MDLabel
 from kivymd.uix.button import MDButton, MDButtonText, MDIconButton
-from kivymd.uix.textfield import MDTextField, MDTextFieldHintText, MDTextFieldHelperText
-from kivymd.uix.dialog import MDDialog, MDDialogHeadlineText, MDDialogSupportingText, MDDialogButtonContainer, MDDialogContentContainer
-from kivymd.uix.scrollview import MDScrollView
-from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText, MDSnackbarActionButton, MDSnackbarActionButtonText
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.metrics import dp, sp
 from kivy.clock import Clock
 from kivy.animation import Animation
 from kivy.core.window import Window
 
+from storage import create_database_manager, json_dumps, json_loads, SessionAdded, SessionRemoved, ExerciseAdded, ExerciseRemoved, SetChanged
+from exercise_catalog import build_autocomplete
+
+IMPORTED = time.perf_counter()
+
+def deferred(module, name):
+    # Stands in for a widget class whose module is only imported when the first one is created
+    def create(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    create.__name__ = name
+    return create
+
+# Only needed once a dialog, snackbar or a secondary screen is opened
+MDTextField = deferred('kivymd.uix.textfield', 'MDTextField')
+MDTextFieldHintText = deferred('kivymd.uix.textfield', 'MDTextFieldHintText')
+MDTextFieldHelperText = deferred('kivymd.uix.textfield', 'MDTextFieldHelperText')
+MDDialog = deferred('kivymd.uix.dialog', 'MDDialog')
+MDDialogHeadlineText = deferred('kivymd.uix.dialog', 'MDDialogHeadlineText')
+MDDialogSupportingText = deferred('kivymd.uix.dialog', 'MDDialogSupportingText')
+MDDialogButtonContainer = deferred('kivymd.uix.dialog', 'MDDialogButtonContainer')
+MDDialogContentContainer = deferred('kivymd.uix.dialog', 'MDDialogContentContainer')
+MDScrollView = deferred('kivymd.uix.scrollview', 'MDScrollView')
+MDSnackbar = deferred('kivymd.uix.snackbar', 'MDSnackbar')
+MDSnackbarText = deferred('kivymd.uix.snackbar', 'MDSnackbarText')
+MDSnackbarActionButton = deferred('kivymd.uix.snackbar', 'MDSnackbarActionButton')
+MDSnackbarActionButtonText = deferred('kivymd.uix.snackbar', 'MDSnackbarActionButtonText')
+
 # Set mobile-friendly window size for testing
 Window.size = (400, 700)
 
-class DatabaseManager:
-    def __init__(self):
-        self.data_file = 'fitness_data.json'
-        self.data = self.load_data()
-    
-    def create_tables(self):
-        if not self.data:
-            self.data = {
-                "app_stats": {
-                    "total_exercises": 0,
-                    "total_sessions": 0, 
-                    "total_volume": 0,
-                    "weekly_workouts": 0
-                },
-                "workout_sessions": {},
-                "user_settings": {"name": "BellaajMohsen7", "weight_unit": "kg", "theme": "dark"}
-            }
-            self.save_data()
+class KeyedCardList:
+    # Keeps a vertical layout in step with an ordered [(key, row)] list. Cards are reused by key
+    # and only rebound when their row changed; only the delta is added, moved or removed.
+    def __init__(self, layout, pool):
+        self.layout = layout
+        self.pool = pool
+        self.cards = {}
+        self.rows = {}
+        self.order = []
     
-    def load_data(self):
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            print(f"Error loading data: {e}")
-            return {}
-    
-    def save_data(self):
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving data: {e}")
-    
-    def get_app_stats(self):
-        return self.data.get('app_stats', {
-            "total_exercises": 0,
-            "total_sessions": 0,
-            "total_volume": 0,
-            "weekly_workouts": 0
-        })
-    
-    def get_workout_sessions(self):
-        return self.data.get('workout_sessions', {})
-    
-    def create_workout_session(self, name, workout_type="Custom"):
-        session_id = f"session_{str(uuid.uuid4())[:8]}"
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        current_time = datetime.now().strftime("%H:%M")
-        
-        session_data = {
-            "id": session_id, "name": name, "date": current_date, "time": current_time,
-            "workout_type": workout_type, "exercises": {}, "status": "active"
-        }
-        
-        self.data['workout_sessions'][session_id] = session_data
-        self.update_stats()
-        self.save_data()
-        return session_id
+    def __contains__(self, key):
+        return key in self.cards
     
-    def delete_workout_session(self, session_id):
-        if session_id in self.data['workout_sessions']:
-            del self.data['workout_sessions'][session_id]
-            self.update_stats()
-            self.save_data()
-            return True
-        return False
+    def __len__(self):
+        return len(self.order)
+    
+    def reconcile_steps(self, items):
+        # One card per step from the top, so FrameBudgetScheduler can spread it over frames
+        keys = {key for key, _ in items}
+        for key in [key for key in self.order if key not in keys]:
+            self.remove(key)
+        
+        for position, (key, row) in enumerate(items):
+            if key not in self.cards:
+                self.insert(key, row, position)
+            else:
+                if self.order[position] != key:
+                    self.move(key, position)
+                self.update(key, row)
+            yield
+    
+    def insert(self, key, row, position=None):
+        if position is None:
+            position = len(self.order)
+        card = self.pool.acquire(key, row)
+        self.cards[key] = card
+        self.rows[key] = row
+        self.order.insert(position, key)
+        self.place(card, position)
+        return card
+    
+    def update(self, key, row):
+        if self.rows.get(key) != row:
+            self.rows[key] = row
+            self.cards[key].rebind(key, row)
     
-    def get_workout_session(self, session_id):
-        return self.data['workout_sessions'].get(session_id, {})
+    def move(self, key, position):
+        card = self.cards[key]
+        self.layout.remove_widget(card)
+        self.order.remove(key)
+        self.order.insert(position, key)
+        self.place(card, position)
     
-    def add_exercise(self, session_id, exercise_name, muscle_group="General"):
-        if session_id not in self.data['workout_sessions']:
+    def remove(self, key):
+        card = self.cards.pop(key, None)
+        if card is None:
             return None
-        
-        exercise_id = f"exercise_{str(uuid.uuid4())[:8]}"
-        exercise_data = {
-            "id": exercise_id, "name": exercise_name, "muscle_group": muscle_group,
-            "sets": {}, "created_at": datetime.now().strftime("%H:%M")
-        }
-        
-        self.data['workout_sessions'][session_id]['exercises'][exercise_id] = exercise_data
-        self.update_stats()
-        self.save_data()
-        return exercise_id
-    
-    def delete_exercise(self, session_id, exercise_id):
-        if (session_id in self.data['workout_sessions'] and 
-            exercise_id in self.data['workout_sessions'][session_id]['exercises']):
-            del self.data['workout_sessions'][session_id]['exercises'][exercise_id]
-            self.update_stats()
-            self.save_data()
+        del self.rows[key]
+        self.order.remove(key)
+        self.layout.remove_widget(card)
+        self.pool.release(card)
+    
+    def place(self, card, position):
+        # Kivy lists children bottom-up, so "above the next card" is one index past it
+        if position + 1 < len(self.order):
+            index = self.layout.children.index(self.cards[self.order[position + 1]]) + 1
+        else:
+            index = 0
+        self.layout.add_widget(card, index=index)
+
+class CardPool:
+    # Released cards kept for reuse, so refreshes rebind existing widget trees instead of
+    # allocating new ones; hits/misses tell whether the limit fits the lists actually shown
+    LIMIT = 64
+    
+    def __init__(self, factory, limit=None):
+        self.factory = factory
+        self.limit = self.LIMIT if limit is None else limit
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+    
+    def acquire(self, key, row):
+        if self.free:
+            self.hits += 1
+            card = self.free.pop()
+        else:
+            self.misses += 1
+            card = self.factory()
+        card.rebind(key, row)
+        return card
+    
+    def release(self, card):
+        if card.parent is not None:
+            card.parent.remove_widget(card)
+        if len(self.free) < self.limit:
+            self.free.append(card)
+        else:
+            self.dropped += 1
+    
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "dropped": self.dropped, "free": len(self.free)}
+
+class FrameTask:
+    # A generator of UI steps run a slice per frame; see FrameBudgetScheduler
+    def __init__(self, steps, budget, on_done=None):
+        self.steps = steps
+        self.budget = budget
+        self.on_done = on_done
+        self.event = None
+        self.done = False
+    
+    def start(self, first):
+        # The first steps (one screenful) run right away, so they show in the next frame
+        for _ in range(first):
+            if not self.advance():
+                return self
+        self.event = Clock.schedule_once(self.run_slice, 0)
+        return self
+    
+    def advance(self):
+        try:
+            next(self.steps)
             return True
-        return False
+        except StopIteration:
+            self.complete()
+            return False
     
-    def add_set(self, session_id, exercise_id, weight, reps):
-        if (session_id not in self.data['workout_sessions'] or 
-            exercise_id not in self.data['workout_sessions'][session_id]['exercises']):
-            return None
-        
-        sets = self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets']
-        set_number = len(sets) + 1
-        set_id = f"set_{set_number}"
-        
-        volume = float(weight) * int(reps)
-        set_data = {
-            "set_number": set_number, "weight": float(weight), "reps": int(reps),
-            "volume": volume, "created_at": datetime.now().strftime("%H:%M")
-        }
+    def run_slice(self, dt):
+        self.event = None
+        deadline = time.perf_counter() + self.budget
+        while time.perf_counter() < deadline:
+            if not self.advance():
+                return
+        self.event = Clock.schedule_once(self.run_slice, 0)
+    
+    def finish(self):
+        # Runs what is left now, e.g. before applying changes to a half-built list
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+        while not self.done and self.advance():
+            pass
+    
+    def cancel(self):
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+        self.steps.close()
+        self.done = True
+    
+    def complete(self):
+        self.done = True
+        if self.on_done is not None:
+            self.on_done()
+
+class FrameBudgetScheduler:
+    # Splits long widget work into slices that fit a per-frame time budget, so building a long
+    # list never holds the main loop for a whole frame. FITTRACKER_FRAME_BUDGET_MS overrides it.
+    BUDGET_MS = 8
+    
+    def __init__(self, budget_ms=None):
+        if budget_ms is None:
+            budget_ms = float(os.environ.get('FITTRACKER_FRAME_BUDGET_MS', self.BUDGET_MS))
+        self.budget = budget_ms / 1000
+    
+    def run(self, steps, on_done=None, first=0):
+        return FrameTask(steps, self.budget, on_done).start(first)
+
+class DialogCache:
+    # Dialogs built on their first open and reused afterwards: build() returns (dialog, parts) and
+    # prefill(parts, *args) resets those widgets before every open. The first open (which builds)
+    # and the later ones are timed separately, so the saving stays measurable.
+    def __init__(self):
+        self.dialogs = {}
+        self.latency = {}
+    
+    def open(self, name, build, prefill, *args):
+        started = time.perf_counter()
+        cached = self.dialogs.get(name)
+        reused = cached is not None
+        if not reused:
+            cached = self.dialogs[name] = build()
+        dialog, parts = cached
+        prefill(parts, *args)
+        dialog.open()
         
-        sets[set_id] = set_data
-        self.update_stats()
-        self.save_data()
-        return set_id
+        elapsed = (time.perf_counter() - started) * 1000
+        stats = self.latency.setdefault(name, {"first_open_ms": elapsed, "reopens": 0, "reopen_ms": 0.0})
+        if reused:
+            stats["reopens"] += 1
+            stats["reopen_ms"] += (elapsed - stats["reopen_ms"]) / stats["reopens"]
+        return dialog
     
-    def update_set(self, session_id, exercise_id, set_id, weight=None, reps=None):
-        if (session_id in self.data['workout_sessions'] and 
-            exercise_id in self.data['workout_sessions'][session_id]['exercises'] and
-            set_id in self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets']):
-            
-            set_data = self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets'][set_id]
-            
-            if weight is not None:
-                set_data['weight'] = float(weight)
-            if reps is not None:
-                set_data['reps'] = int(reps)
-            
-            set_data['volume'] = set_data['weight'] * set_data['reps']
-            self.update_stats()
-            self.save_data()
-            return True
-        return False
-    
-    def delete_set(self, session_id, exercise_id, set_id):
-        if (session_id in self.data['workout_sessions'] and 
-            exercise_id in self.data['workout_sessions'][session_id]['exercises'] and
-            set_id in self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets']):
-            del self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets'][set_id]
-            self.update_stats()
-            self.save_data()
-            return True
-        return False
-    
-    def update_stats(self):
-        total_exercises = 0
-        total_sessions = len(self.data['workout_sessions'])
-        total_volume = 0
-        
-        for session in self.data['workout_sessions'].values():
-            total_exercises += len(session['exercises'])
-            for exercise in session['exercises'].values():
-                for set_data in exercise['sets'].values():
-                    total_volume += set_data['volume']
-        
-        self.data['app_stats'] = {
-            "total_exercises": total_exercises,
-            "total_sessions": total_sessions,
-            "total_volume": int(total_volume),
-            "weekly_workouts": min(total_sessions, 7)
-        }
+    def stats(self):
+        return {name: dict(stats) for name, stats in self.latency.items()}
 
 class PerfectStatCard(MDCard):
     def __init__(self, title, value, subtitle, icon, color, **kwargs):
@@ -242,12 +313,18 @@ class PerfectStatCard(MDCard):
         anim = Animation(opacity=0.8, duration=0.15) + Animation(opacity=1, duration=0.15)
         anim.start(self.value_label)
 
-class PerfectWorkoutCard(MDCard):
-    def __init__(self, session_id, session_data, main_screen, **kwargs):
+class PerfectWorkoutCard(RecycleDataViewBehavior, MDCard):
+    # View class of the Recent Workouts RecycleView: built once, then rebound to
+    # whichever row scrolls into view by refresh_view_attrs
+    TYPE_COLORS = {
+        'Push': [0.94, 0.35, 0.35, 1], 'Pull': [0.23, 0.51, 0.96, 1],
+        'Legs': [0.06, 0.72, 0.51, 1], 'Custom': [0.55, 0.36, 0.97, 1]
+    }
+    
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.session_id = session_id
-        self.session_data = session_data
-        self.main_screen = main_screen
+        self.session_id = None
+        self.session_data = {}
         
         self.md_bg_color = [0.15, 0.15, 0.15, 1]
         self.elevation = 4
@@ -265,12 +342,8 @@ class PerfectWorkoutCard(MDCard):
         header_layout = MDBoxLayout(orientation='horizontal', spacing=dp(12))
         
         # Workout type indicator
-        type_colors = {
-            'Push': [0.94, 0.35, 0.35, 1], 'Pull': [0.23, 0.51, 0.96, 1],
-            'Legs': [0.06, 0.72, 0.51, 1], 'Custom': [0.55, 0.36, 0.97, 1]
-        }
-        type_indicator = MDCard(
-            md_bg_color=type_colors.get(self.session_data.get('workout_type', 'Custom'), type_colors['Custom']),
+        self.type_indicator = MDCard(
+            md_bg_color=self.TYPE_COLORS['Custom'],
             size_hint_x=None, width=dp(6), height=dp(50), radius=[3, 3, 3, 3]
         )
         
@@ -278,35 +351,29 @@ class PerfectWorkoutCard(MDCard):
         content_layout = MDBoxLayout(orientation='vertical', spacing=dp(4))
         
         # Workout name
-        name_label = MDLabel(
-            text=self.session_data['name'], font_size=sp(17), bold=True,
+        self.name_label = MDLabel(
+            text="", font_size=sp(17), bold=True,
             size_hint_y=None, height=dp(25), valign="middle"
         )
         
         # Date and time
-        date_time_label = MDLabel(
-            text=f"{self.session_data['date']} • {self.session_data.get('time', '00:00')}",
-            font_size=sp(13), theme_text_color="Secondary",
+        self.date_time_label = MDLabel(
+            text="", font_size=sp(13), theme_text_color="Secondary",
             size_hint_y=None, height=dp(20), valign="middle"
         )
         
-        content_layout.add_widget(name_label)
-        content_layout.add_widget(date_time_label)
+        content_layout.add_widget(self.name_label)
+        content_layout.add_widget(self.date_time_label)
         
-        header_layout.add_widget(type_indicator)
+        header_layout.add_widget(self.type_indicator)
         header_layout.add_widget(content_layout)
         
         # Stats row - perfectly aligned
         stats_layout = MDBoxLayout(orientation='horizontal', spacing=dp(20), size_hint_y=None, height=dp(30))
         
-        exercises_count = len(self.session_data.get('exercises', {}))
-        total_sets = sum(len(ex.get('sets', {})) for ex in self.session_data.get('exercises', {}).values())
-        total_volume = sum(sum(s.get('volume', 0) for s in ex.get('sets', {}).values()) 
-                          for ex in self.session_data.get('exercises', {}).values())
-        
-        stats_layout.add_widget(self.create_perfect_stat("💪", f"{exercises_count} Ex"))
-        stats_layout.add_widget(self.create_perfect_stat("📋", f"{total_sets} Sets"))
-        stats_layout.add_widget(self.create_perfect_stat("⚖️", f"{total_volume:.0f}kg"))
+        self.stat_labels = []
+        for emoji in ("💪", "📋", "⚖️"):
+            stats_layout.add_widget(self.create_perfect_stat(emoji, ""))
         
         # Actions row
         actions_layout = MDBoxLayout(orientation='horizontal', spacing=dp(12), size_hint_y=None, height=dp(40))
@@ -346,8 +413,23 @@ class PerfectWorkoutCard(MDCard):
         
         layout.add_widget(emoji_label)
         layout.add_widget(text_label)
+        self.stat_labels.append(text_label)
         return layout
     
+    def refresh_view_attrs(self, rv, index, data):
+        # The RecycleView is this card's pool: scrolling only rebinds, no widget is created
+        self.rebind(data['session_id'], data)
+    
+    def rebind(self, session_id, data):
+        self.session_id = session_id
+        self.session_data = data
+        self.type_indicator.md_bg_color = self.TYPE_COLORS.get(data['workout_type'], self.TYPE_COLORS['Custom'])
+        self.name_label.text = data['name']
+        self.date_time_label.text = f"{data['date']} • {data['time']}"
+        texts = (f"{data['exercises']} Ex", f"{data['sets']} Sets", f"{data['volume']:.0f}kg")
+        for label, text in zip(self.stat_labels, texts):
+            label.text = text
+    
     def view_workout(self):
         app = MDApp.get_running_app()
         app.workout_screen.set_current_session(self.session_id)
@@ -356,7 +438,7 @@ class PerfectWorkoutCard(MDCard):
     def confirm_delete(self):
         dialog = MDDialog(
             MDDialogHeadlineText(text="Delete Workout"),
-            MDDialogSupportingText(text=f"Delete '{self.session_data['name']}'? This cannot be undone."),
+            MDDialogSupportingText(text=f"Delete '{self.session_data['name']}' and all its exercises?"),
             MDDialogButtonContainer(
                 MDButton(MDButtonText(text="CANCEL"), style="text", on_release=lambda x: dialog.dismiss()),
                 MDButton(MDButtonText(text="DELETE"), style="text", theme_text_color="Custom",
@@ -368,20 +450,24 @@ class PerfectWorkoutCard(MDCard):
     def delete_workout(self, dialog):
         app = MDApp.get_running_app()
         app.db_manager.delete_workout_session(self.session_id)
-        self.main_screen.update_statistics()
         dialog.dismiss()
         
         snackbar = MDSnackbar(
             MDSnackbarText(text="Workout deleted successfully"),
+            MDSnackbarActionButton(
+                MDSnackbarActionButtonText(text="UNDO"),
+                on_release=lambda x: app.db_manager.undo_delete()
+            ),
             size_hint_x=0.95, pos_hint={"center_x": 0.5}
         )
         snackbar.open()
 
 class PerfectSetCard(MDCard):
-    def __init__(self, set_id, set_data, exercise_screen, **kwargs):
+    # Pooled: built once, then rebound to whichever set it shows
+    def __init__(self, exercise_screen, **kwargs):
         super().__init__(**kwargs)
-        self.set_id = set_id
-        self.set_data = set_data
+        self.set_id = None
+        self.set_data = {}
         self.exercise_screen = exercise_screen
         
         self.md_bg_color = [0.12, 0.12, 0.12, 1]
@@ -401,31 +487,29 @@ class PerfectSetCard(MDCard):
             md_bg_color=[0.23, 0.51, 0.96, 1], size_hint_x=None, width=dp(50), height=dp(50), 
             radius=[25, 25, 25, 25]
         )
-        set_label = MDLabel(
-            text=str(self.set_data['set_number']), font_size=sp(18), bold=True,
+        self.set_label = MDLabel(
+            text="", font_size=sp(18), bold=True,
             halign="center", valign="middle", theme_text_color="Custom", text_color=(1, 1, 1, 1)
         )
-        set_indicator.add_widget(set_label)
+        set_indicator.add_widget(self.set_label)
         
         # Details - perfectly aligned
         details_layout = MDBoxLayout(orientation='vertical', spacing=dp(6))
         
         # Main info - weight and reps
-        main_info = MDLabel(
-            text=f"{self.set_data['weight']}kg × {self.set_data['reps']} reps",
-            font_size=sp(16), bold=True, size_hint_y=None, height=dp(22),
+        self.main_info = MDLabel(
+            text="", font_size=sp(16), bold=True, size_hint_y=None, height=dp(22),
             valign="middle"
         )
         
         # Secondary info - volume and time
-        secondary_info = MDLabel(
-            text=f"Vol: {self.set_data['volume']:.0f}kg • {self.set_data.get('created_at', '00:00')}",
-            font_size=sp(13), theme_text_color="Secondary", size_hint_y=None, height=dp(18),
+        self.secondary_info = MDLabel(
+            text="", font_size=sp(13), theme_text_color="Secondary", size_hint_y=None, height=dp(18),
             valign="middle"
         )
         
-        details_layout.add_widget(main_info)
-        details_layout.add_widget(secondary_info)
+        details_layout.add_widget(self.main_info)
+        details_layout.add_widget(self.secondary_info)
         
         # Action buttons - perfectly aligned
         action_layout = MDBoxLayout(orientation='horizontal', size_hint_x=None, width=dp(80), spacing=dp(8))
@@ -449,42 +533,16 @@ class PerfectSetCard(MDCard):
         main_layout.add_widget(action_layout)
         self.add_widget(main_layout)
     
+    def rebind(self, set_id, set_data):
+        self.set_id = set_id
+        self.set_data = set_data
+        self.set_label.text = str(set_data['set_number'])
+        self.main_info.text = f"{set_data['weight']}kg × {set_data['reps']} reps"
+        self.secondary_info.text = f"Vol: {set_data['volume']:.0f}kg • {set_data.get('created_at', '00:00')}"
+    
     def edit_set(self):
-        content = MDBoxLayout(orientation='vertical', spacing=dp(20), size_hint_y=None, height=dp(180))
-        
-        # Current values display
-        current_info = MDLabel(
-            text=f"Current: {self.set_data['weight']}kg × {self.set_data['reps']} reps",
-            font_size=sp(15), theme_text_color="Secondary", size_hint_y=None, height=dp(30),
-            halign="center", valign="middle"
-        )
-        
-        weight_field = MDTextField(
-            MDTextFieldHintText(text="Weight (kg)"),
-            text=str(self.set_data['weight']), input_filter="float", 
-            size_hint_y=None, height=dp(60), font_size=sp(16)
-        )
-        
-        reps_field = MDTextField(
-            MDTextFieldHintText(text="Repetitions"),
-            text=str(self.set_data['reps']), input_filter="int",
-            size_hint_y=None, height=dp(60), font_size=sp(16)
-        )
-        
-        content.add_widget(current_info)
-        content.add_widget(weight_field)
-        content.add_widget(reps_field)
-        
-        dialog = MDDialog(
-            MDDialogHeadlineText(text=f"Edit Set {self.set_data['set_number']}"),
-            MDDialogContentContainer(content),
-            MDDialogButtonContainer(
-                MDButton(MDButtonText(text="CANCEL"), style="text", on_release=lambda x: dialog.dismiss()),
-                MDButton(MDButtonText(text="UPDATE"), style="text",
-                        on_release=lambda x: self.update_set(dialog, weight_field.text, reps_field.text)),
-            ),
-        )
-        dialog.open()
+        self.exercise_screen.dialogs.open('edit_set', self.exercise_screen.build_edit_set_dialog,
+                                          self.exercise_screen.prefill_edit_set_dialog, self)
     
     def update_set(self, dialog, weight, reps):
         try:
@@ -500,9 +558,6 @@ class PerfectSetCard(MDCard):
                 )
                 
                 if success:
-                    self.exercise_screen.refresh_sets()
-                    app.main_screen.update_statistics()
-                    
                     snackbar = MDSnackbar(
                         MDSnackbarText(text="Set updated successfully"),
                         size_hint_x=0.95, pos_hint={"center_x": 0.5}
@@ -533,9 +588,99 @@ class PerfectSetCard(MDCard):
         app = MDApp.get_running_app()
         app.db_manager.delete_set(self.exercise_screen.current_session_id,
                                   self.exercise_screen.current_exercise_id, self.set_id)
-        self.exercise_screen.refresh_sets()
-        app.main_screen.update_statistics()
         dialog.dismiss()
+        
+        snackbar = MDSnackbar(
+            MDSnackbarText(text=f"Set {self.set_data['set_number']} deleted"),
+            MDSnackbarActionButton(
+                MDSnackbarActionButtonText(text="UNDO"),
+                on_release=lambda x: app.db_manager.undo_delete()
+            ),
+            size_hint_x=0.95, pos_hint={"center_x": 0.5}
+        )
+        snackbar.open()
+
+class PerfectExerciseCard(MDCard):
+    # Pooled like PerfectSetCard; rows are {"name", "muscle_group", "sets", "volume"}
+    EMOJIS = {
+        'Chest': '💪', 'Back': '🎯', 'Legs': '🦵', 'Arms': '💪', 'Shoulders': '🔥', 'Core': '⚡'
+    }
+    
+    def __init__(self, workout_screen, **kwargs):
+        super().__init__(**kwargs)
+        self.exercise_id = None
+        self.row = {}
+        self.workout_screen = workout_screen
+        
+        self.md_bg_color = [0.15, 0.15, 0.15, 1]
+        self.elevation = 4
+        self.padding = dp(16)
+        self.size_hint_y = None
+        self.height = dp(90)
+        self.radius = [12, 12, 12, 12]
+        
+        self.build_card()
+    
+    def build_card(self):
+        main_layout = MDBoxLayout(orientation='horizontal', spacing=dp(12))
+        
+        # Exercise emoji - perfect alignment
+        self.emoji_label = MDLabel(
+            text="", font_size=sp(24), size_hint_x=None, width=dp(40), 
+            halign="center", valign="middle"
+        )
+        
+        # Exercise details
+        details_layout = MDBoxLayout(orientation='vertical', spacing=dp(4))
+        
+        self.name_label = MDLabel(
+            text="", font_size=sp(15), bold=True, 
+            size_hint_y=None, height=dp(22), valign="middle"
+        )
+        
+        self.muscle_label = MDLabel(
+            text="", font_size=sp(12),
+            theme_text_color="Secondary", size_hint_y=None, height=dp(18), valign="middle"
+        )
+        
+        self.stats_label = MDLabel(
+            text="", font_size=sp(11),
+            theme_text_color="Primary", size_hint_y=None, height=dp(16), valign="middle"
+        )
+        
+        details_layout.add_widget(self.name_label)
+        details_layout.add_widget(self.muscle_label)
+        details_layout.add_widget(self.stats_label)
+        
+        # Action buttons
+        action_layout = MDBoxLayout(orientation='horizontal', size_hint_x=None, width=dp(80), spacing=dp(6))
+        
+        view_button = MDButton(
+            MDButtonText(text="Open"), style="elevated", size_hint=(None, None), size=(dp(55), dp(32)),
+            on_release=lambda x: self.workout_screen.view_exercise(self.exercise_id)
+        )
+        
+        delete_button = MDIconButton(
+            icon="delete-outline", style="standard", theme_icon_color="Custom",
+            icon_color=[0.94, 0.27, 0.27, 1], size_hint=(None, None), size=(dp(32), dp(32)),
+            on_release=lambda x: self.workout_screen.confirm_delete_exercise(self.exercise_id, self.row['name'])
+        )
+        
+        action_layout.add_widget(view_button)
+        action_layout.add_widget(delete_button)
+        
+        main_layout.add_widget(self.emoji_label)
+        main_layout.add_widget(details_layout)
+        main_layout.add_widget(action_layout)
+        self.add_widget(main_layout)
+    
+    def rebind(self, exercise_id, row):
+        self.exercise_id = exercise_id
+        self.row = row
+        self.emoji_label.text = self.EMOJIS.get(row['muscle_group'], '🏋️')
+        self.name_label.text = row['name']
+        self.muscle_label.text = row['muscle_group']
+        self.stats_label.text = f"{row['sets']} sets • {row['volume']:.0f}kg"
 
 class PerfectHeaderCard(MDCard):
     def __init__(self, title, **kwargs):
@@ -574,9 +719,82 @@ class PerfectHeaderCard(MDCard):
     def set_title(self, title):
         self.title_label.text = title
 
-class MainScreen(MDScreen):
+class LiveScreen(MDScreen):
+    # Follows storage change events: applied right away while the screen is shown, otherwise
+    # queued and applied when it is next entered
+    MAX_PENDING_CHANGES = 200
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.pending_changes = []
+        self.needs_reload = False
+        self.render_task = None
+        # The main screen is built before the data is loaded and attached by initialize_app
+        db_manager = MDApp.get_running_app().db_manager
+        if db_manager is not None:
+            self.attach(db_manager)
+    
+    def attach(self, db_manager):
+        db_manager.changes.subscribe(self.on_changes)
+    
+    def on_changes(self, events):
+        if self.manager is not None and self.manager.current == self.name:
+            self.finish_render()
+            self.apply_changes(events)
+        elif not self.needs_reload:
+            self.pending_changes.extend(events)
+            if len(self.pending_changes) > self.MAX_PENDING_CHANGES:
+                # A rebuild is cheaper than replaying this many
+                self.pending_changes = []
+                self.needs_reload = True
+    
+    def on_pre_enter(self, *args):
+        super().on_pre_enter(*args)
+        if self.needs_reload:
+            self.reload()
+        elif self.pending_changes:
+            self.finish_render()
+            events, self.pending_changes = self.pending_changes, []
+            self.apply_changes(events)
+    
+    def on_leave(self, *args):
+        super().on_leave(*args)
+        self.cancel_render()
+    
+    def reloaded(self):
+        # Call after a full rebuild: everything queued is reflected already
+        self.pending_changes = []
+        self.needs_reload = False
+    
+    def render(self, steps, on_done, row_height):
+        # Builds a list a screenful first, then within the frame budget; replaces unfinished work
+        self.cancel_render()
+        first = int(Window.height / row_height) + 1
+        self.render_task = MDApp.get_running_app().scheduler.run(steps, on_done, first)
+    
+    def finish_render(self):
+        if self.render_task is not None:
+            self.render_task.finish()
+            self.render_task = None
+    
+    def cancel_render(self):
+        if self.render_task is not None and not self.render_task.done:
+            self.render_task.cancel()
+            # Left half-built: rebuilt when the screen is entered again
+            self.needs_reload = True
+        self.render_task = None
+    
+    def apply_changes(self, events):
+        raise NotImplementedError
+    
+    def reload(self):
+        raise NotImplementedError
+
+class MainScreen(LiveScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.empty_state = None
+        self.dialogs = DialogCache()
         self.build_ui()
     
     def build_ui(self):
@@ -630,7 +848,10 @@ class MainScreen(MDScreen):
             valign="middle"
         )
         
-        actions_layout = MDBoxLayout(orientation='vertical', spacing=dp(10), size_hint_y=None, height=dp(110))
+        # Enabled once the data is loaded
+        self.actions_layout = actions_layout = MDBoxLayout(
+            orientation='vertical', spacing=dp(10), size_hint_y=None, height=dp(110), disabled=True
+        )
         
         new_workout_button = MDButton(
             MDButtonText(text="Start New Workout"), style="elevated", 
@@ -652,9 +873,17 @@ class MainScreen(MDScreen):
             valign="middle"
         )
         
-        self.workouts_scroll = MDScrollView()
-        self.workouts_layout = MDBoxLayout(orientation='vertical', spacing=dp(12), size_hint_y=None, height=dp(0))
-        self.workouts_scroll.add_widget(self.workouts_layout)
+        # Recycled rows: only the cards on screen (plus the view's buffer) exist, whatever
+        # the history size; each row is a plain dict that PerfectWorkoutCard binds to
+        self.workouts_area = MDBoxLayout(orientation='vertical')
+        self.workouts_view = RecycleView(viewclass=PerfectWorkoutCard, bar_width=dp(4))
+        workouts_layout = RecycleBoxLayout(
+            orientation='vertical', spacing=dp(12), size_hint_y=None,
+            default_size=(None, dp(130)), default_size_hint=(1, None)
+        )
+        workouts_layout.bind(minimum_height=workouts_layout.setter('height'))
+        self.workouts_view.add_widget(workouts_layout)
+        self.workouts_area.add_widget(self.workouts_view)
         
         # Add components
         main_layout.add_widget(header_layout)
@@ -666,36 +895,108 @@ class MainScreen(MDScreen):
         main_layout.add_widget(actions_header)
         main_layout.add_widget(actions_layout)
         main_layout.add_widget(workouts_header)
-        main_layout.add_widget(self.workouts_scroll)
+        main_layout.add_widget(self.workouts_area)
         
         self.add_widget(main_layout)
     
     def update_statistics(self):
-        app = MDApp.get_running_app()
-        stats = app.db_manager.get_app_stats()
-        
-        self.total_exercises_card.update_value(stats['total_exercises'])
-        self.total_sessions_card.update_value(stats['total_sessions'])
-        self.total_volume_card.update_value(f"{stats['total_volume']:,}")
-        self.weekly_workouts_card.update_value(stats.get('weekly_workouts', 0))
-        
+        self.update_stat_cards()
         self.refresh_workouts_list()
+        self.reloaded()
+    
+    def reload(self):
+        self.update_statistics()
+    
+    def attach(self, db_manager):
+        super().attach(db_manager)
+        self.actions_layout.disabled = False
+    
+    def update_stat_cards(self, stats=None):
+        if stats is None:
+            stats = MDApp.get_running_app().db_manager.get_app_stats()
+        
+        values = (
+            (self.total_exercises_card, stats['total_exercises']),
+            (self.total_sessions_card, stats['total_sessions']),
+            (self.total_volume_card, f"{stats['total_volume']:,}"),
+            (self.weekly_workouts_card, stats.get('weekly_workouts', 0))
+        )
+        # Only cards whose number moved are animated
+        for card, value in values:
+            if card.value_label.text != str(value):
+                card.update_value(value)
+    
+    def apply_changes(self, events):
+        touched = set()
+        for event in events:
+            if isinstance(event, SessionAdded):
+                self.add_workout_card(event.session_id)
+            elif isinstance(event, SessionRemoved):
+                self.remove_workout_card(event.session_id)
+            else:
+                touched.add(event.session_id)
+        
+        rows = self.workouts_view.data
+        if touched:
+            app = MDApp.get_running_app()
+            for i, row in enumerate(rows):
+                if row['session_id'] in touched:
+                    rows[i] = dict(row, **app.db_manager.get_session_totals(row['session_id']))
+        self.update_stat_cards()
+    
+    @staticmethod
+    def workout_row(session_id, header):
+        return {
+            'session_id': session_id, 'name': header['name'], 'date': header['date'],
+            'time': header.get('time', '00:00'), 'workout_type': header.get('workout_type', 'Custom'),
+            'exercises': header.get('exercise_count', 0), 'sets': header.get('set_count', 0),
+            'volume': header.get('total_volume', 0.0)
+        }
     
     def refresh_workouts_list(self):
-        self.workouts_layout.clear_widgets()
-        self.workouts_layout.height = dp(0)
-        
         app = MDApp.get_running_app()
-        sessions = app.db_manager.get_workout_sessions()
-        
-        sorted_sessions = sorted(sessions.items(), key=lambda x: x[1]['date'], reverse=True)
-        
-        for session_id, session_data in sorted_sessions:
-            workout_card = PerfectWorkoutCard(session_id, session_data, self)
-            self.workouts_layout.add_widget(workout_card)
-            self.workouts_layout.height += dp(142)  # Card height + spacing
+        # Headers only, already in date order: unopened sessions stay on disk
+        sessions = app.db_manager.recent_sessions()
+        self.workouts_view.data = []
+        self.render(self.workout_rows(sessions), self.update_empty_state, dp(142))
+        self.update_empty_state()
+    
+    def workout_rows(self, sessions):
+        rows = self.workouts_view.data
+        for session_id, header in sessions:
+            rows.append(self.workout_row(session_id, header))
+            yield
+    
+    def add_workout_card(self, session_id):
+        rows = self.workouts_view.data
+        if any(row['session_id'] == session_id for row in rows):
+            return
+        app = MDApp.get_running_app()
+        header = app.db_manager.get_session_header(session_id)
+        if not header:
+            return
         
-        if not sessions:
+        # Newest first: the row goes above the first one that does not sort after it
+        row = self.workout_row(session_id, header)
+        key = (row['date'], row['time'])
+        position = next((i for i, other in enumerate(rows) if (other['date'], other['time']) <= key), len(rows))
+        rows.insert(position, row)
+        self.update_empty_state()
+    
+    def remove_workout_card(self, session_id):
+        rows = self.workouts_view.data
+        for i, row in enumerate(rows):
+            if row['session_id'] == session_id:
+                del rows[i]
+                break
+        self.update_empty_state()
+    
+    def update_empty_state(self):
+        if self.workouts_view.data:
+            if self.empty_state is not None:
+                self.workouts_area.remove_widget(self.empty_state)
+                self.empty_state = None
+        elif self.empty_state is None:
             self.add_empty_state()
     
     def add_empty_state(self):
@@ -727,10 +1028,13 @@ class MainScreen(MDScreen):
         empty_layout.add_widget(subtitle_label)
         
         empty_state.add_widget(empty_layout)
-        self.workouts_layout.add_widget(empty_state)
-        self.workouts_layout.height += dp(192)
+        self.workouts_area.add_widget(empty_state, index=len(self.workouts_area.children))
+        self.empty_state = empty_state
     
     def show_new_workout_dialog(self, *args):
+        self.dialogs.open('new_workout', self.build_new_workout_dialog, self.prefill_new_workout_dialog)
+    
+    def build_new_workout_dialog(self):
         # FIXED DIALOG CONTENT - Properly aligned
         content = MDBoxLayout(orientation='vertical', spacing=dp(16), size_hint_y=None, height=dp(280))
         
@@ -773,8 +1077,6 @@ class MainScreen(MDScreen):
             type_buttons.append(btn)
             type_layout.add_widget(btn)
         
-        # Set last button as elevated (selected)
-        type_buttons[-1].style = "elevated"
         type_scroll.add_widget(type_layout)
         
         # Add all content with proper spacing
@@ -800,7 +1102,11 @@ class MainScreen(MDScreen):
                 ),
             ),
         )
-        dialog.open()
+        return dialog, {"name": workout_name_field, "type_buttons": type_buttons, "selected_type": selected_type}
+    
+    def prefill_new_workout_dialog(self, parts):
+        parts["name"].text = ""
+        self.select_workout_type('Custom', parts["type_buttons"], parts["selected_type"])
     
     def select_workout_type(self, workout_type, buttons, selected_type):
         selected_type[0] = workout_type
@@ -835,7 +1141,6 @@ class MainScreen(MDScreen):
     def create_quick_workout(self, dialog, name, workout_type):
         app = MDApp.get_running_app()
         session_id = app.db_manager.create_workout_session(name, workout_type)
-        self.update_statistics()
         dialog.dismiss()
         
         app.workout_screen.set_current_session(session_id)
@@ -847,16 +1152,17 @@ class MainScreen(MDScreen):
         
         app = MDApp.get_running_app()
         session_id = app.db_manager.create_workout_session(workout_name.strip(), workout_type)
-        self.update_statistics()
         dialog.dismiss()
         
         app.workout_screen.set_current_session(session_id)
         app.screen_manager.current = 'workout'
 
-class WorkoutScreen(MDScreen):
+class WorkoutScreen(LiveScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.current_session_id = None
+        self.empty_state = None
+        self.dialogs = DialogCache()
         self.build_ui()
     
     def build_ui(self):
@@ -935,8 +1241,11 @@ class WorkoutScreen(MDScreen):
         )
         
         self.exercises_scroll = MDScrollView()
-        self.exercises_layout = MDBoxLayout(orientation='vertical', spacing=dp(12), size_hint_y=None, height=dp(0))
+        self.exercises_layout = MDBoxLayout(orientation='vertical', spacing=dp(12), size_hint_y=None)
+        self.exercises_layout.bind(minimum_height=self.exercises_layout.setter('height'))
         self.exercises_scroll.add_widget(self.exercises_layout)
+        self.exercise_pool = CardPool(lambda: PerfectExerciseCard(self))
+        self.exercise_cards = KeyedCardList(self.exercises_layout, self.exercise_pool)
         
         content_layout.add_widget(self.info_card)
         content_layout.add_widget(actions_layout)
@@ -949,8 +1258,30 @@ class WorkoutScreen(MDScreen):
     
     def set_current_session(self, session_id):
         self.current_session_id = session_id
+        self.reload()
+    
+    def reload(self):
         self.refresh_session_info()
         self.refresh_exercises()
+        self.reloaded()
+    
+    def apply_changes(self, events):
+        events = [event for event in events if event.session_id == self.current_session_id]
+        if not events:
+            return
+        
+        touched = set()
+        for event in events:
+            if isinstance(event, ExerciseAdded):
+                self.add_exercise_card(event.exercise_id)
+            elif isinstance(event, ExerciseRemoved):
+                self.remove_exercise_card(event.exercise_id)
+            elif isinstance(event, SetChanged):
+                touched.add(event.exercise_id)
+        
+        for exercise_id in touched:
+            self.refresh_exercise_totals(exercise_id)
+        self.refresh_session_info()
     
     def refresh_session_info(self):
         if not self.current_session_id:
@@ -964,9 +1295,8 @@ class WorkoutScreen(MDScreen):
             self.workout_date_label.text = f"{session_data['date']} • {session_data.get('time', '00:00')}"
             self.header_card.set_title(session_data['name'])
             
-            exercises_count = len(session_data.get('exercises', {}))
-            total_sets = sum(len(ex.get('sets', {})) for ex in session_data.get('exercises', {}).values())
-            self.workout_stats_label.text = f"{exercises_count} exercises • {total_sets} sets"
+            totals = app.db_manager.get_session_totals(self.current_session_id)
+            self.workout_stats_label.text = f"{totals['exercises']} exercises • {totals['sets']} sets"
             
             workout_type = session_data.get('workout_type', 'Custom')
             colors = {
@@ -976,25 +1306,48 @@ class WorkoutScreen(MDScreen):
             self.type_indicator.md_bg_color = colors.get(workout_type, colors['Custom'])
     
     def refresh_exercises(self):
-        self.exercises_layout.clear_widgets()
-        self.exercises_layout.height = dp(0)
-        
-        if not self.current_session_id:
-            return
-        
+        items = []
+        if self.current_session_id:
+            app = MDApp.get_running_app()
+            session_data = app.db_manager.get_workout_session(self.current_session_id) or {}
+            # Exercises are listed in the order they were added
+            items = [(exercise_id, self.exercise_row(exercise_id, exercise_data))
+                     for exercise_id, exercise_data in session_data.get('exercises', {}).items()]
+        
+        self.render(self.exercise_cards.reconcile_steps(items), self.update_empty_state, dp(102))
+        self.update_empty_state()
+    
+    def exercise_row(self, exercise_id, exercise_data):
+        totals = MDApp.get_running_app().db_manager.get_exercise_totals(self.current_session_id, exercise_id)
+        return {'name': exercise_data['name'], 'muscle_group': exercise_data['muscle_group'],
+                'sets': totals['sets'], 'volume': totals['volume']}
+    
+    def add_exercise_card(self, exercise_id):
         app = MDApp.get_running_app()
-        session_data = app.db_manager.get_workout_session(self.current_session_id)
-        
-        if session_data and 'exercises' in session_data:
-            exercises = session_data['exercises']
-            
-            if not exercises:
-                self.add_exercise_empty_state()
-            else:
-                for exercise_id, exercise_data in exercises.items():
-                    exercise_card = self.create_perfect_exercise_card(exercise_id, exercise_data)
-                    self.exercises_layout.add_widget(exercise_card)
-                    self.exercises_layout.height += dp(102)  # Card height + spacing
+        exercise_data = app.db_manager.get_workout_session(self.current_session_id).get('exercises', {}).get(exercise_id)
+        if exercise_data is None or exercise_id in self.exercise_cards:
+            return
+        self.exercise_cards.insert(exercise_id, self.exercise_row(exercise_id, exercise_data))
+        self.update_empty_state()
+    
+    def remove_exercise_card(self, exercise_id):
+        self.exercise_cards.remove(exercise_id)
+        self.update_empty_state()
+    
+    def refresh_exercise_totals(self, exercise_id):
+        row = self.exercise_cards.rows.get(exercise_id)
+        if row is None:
+            return
+        totals = MDApp.get_running_app().db_manager.get_exercise_totals(self.current_session_id, exercise_id)
+        self.exercise_cards.update(exercise_id, dict(row, sets=totals['sets'], volume=totals['volume']))
+    
+    def update_empty_state(self):
+        if len(self.exercise_cards):
+            if self.empty_state is not None:
+                self.exercises_layout.remove_widget(self.empty_state)
+                self.empty_state = None
+        elif self.empty_state is None:
+            self.add_exercise_empty_state()
     
     def add_exercise_empty_state(self):
         empty_state = MDCard(
@@ -1026,86 +1379,17 @@ class WorkoutScreen(MDScreen):
         
         empty_state.add_widget(empty_layout)
         self.exercises_layout.add_widget(empty_state)
-        self.exercises_layout.height += dp(152)
-    
-    def create_perfect_exercise_card(self, exercise_id, exercise_data):
-        card = MDCard(
-            md_bg_color=[0.15, 0.15, 0.15, 1], elevation=4, padding=dp(16),
-            size_hint_y=None, height=dp(90), radius=[12, 12, 12, 12]
-        )
-        
-        main_layout = MDBoxLayout(orientation='horizontal', spacing=dp(12))
-        
-        # Exercise emoji - perfect alignment
-        emoji_map = {
-            'Chest': '💪', 'Back': '🎯', 'Legs': '🦵', 'Arms': '💪', 'Shoulders': '🔥', 'Core': '⚡'
-        }
-        emoji = emoji_map.get(exercise_data['muscle_group'], '🏋️')
-        
-        emoji_label = MDLabel(
-            text=emoji, font_size=sp(24), size_hint_x=None, width=dp(40), 
-            halign="center", valign="middle"
-        )
-        
-        # Exercise details
-        details_layout = MDBoxLayout(orientation='vertical', spacing=dp(4))
-        
-        name_label = MDLabel(
-            text=exercise_data['name'], font_size=sp(15), bold=True, 
-            size_hint_y=None, height=dp(22), valign="middle"
-        )
-        
-        muscle_label = MDLabel(
-            text=exercise_data['muscle_group'], font_size=sp(12),
-            theme_text_color="Secondary", size_hint_y=None, height=dp(18), valign="middle"
-        )
-        
-        sets_count = len(exercise_data['sets'])
-        total_volume = sum(s.get('volume', 0) for s in exercise_data['sets'].values())
-        
-        stats_label = MDLabel(
-            text=f"{sets_count} sets • {total_volume:.0f}kg", font_size=sp(11),
-            theme_text_color="Primary", size_hint_y=None, height=dp(16), valign="middle"
-        )
-        
-        details_layout.add_widget(name_label)
-        details_layout.add_widget(muscle_label)
-        details_layout.add_widget(stats_label)
-        
-        # Action buttons
-        action_layout = MDBoxLayout(orientation='horizontal', size_hint_x=None, width=dp(80), spacing=dp(6))
-        
-        view_button = MDButton(
-            MDButtonText(text="Open"), style="elevated", size_hint=(None, None), size=(dp(55), dp(32)),
-            on_release=lambda x: self.view_exercise(exercise_id)
-        )
-        
-        delete_button = MDIconButton(
-            icon="delete-outline", style="standard", theme_icon_color="Custom",
-            icon_color=[0.94, 0.27, 0.27, 1], size_hint=(None, None), size=(dp(32), dp(32)),
-            on_release=lambda x: self.confirm_delete_exercise(exercise_id, exercise_data['name'])
-        )
-        
-        action_layout.add_widget(view_button)
-        action_layout.add_widget(delete_button)
-        
-        main_layout.add_widget(emoji_label)
-        main_layout.add_widget(details_layout)
-        main_layout.add_widget(action_layout)
-        card.add_widget(main_layout)
-        return card
+        self.empty_state = empty_state
     
     def quick_add_exercise(self, exercise_name):
-        muscle_groups = {'Bench Press': 'Chest', 'Squat': 'Legs', 'Deadlift': 'Back', 'Pull-ups': 'Back'}
-        muscle_group = muscle_groups.get(exercise_name, 'General')
-        
         app = MDApp.get_running_app()
+        autocomplete = app.get_exercise_autocomplete()
+        muscle_group = autocomplete.infer_muscle_group(exercise_name)
+        
         exercise_id = app.db_manager.add_exercise(self.current_session_id, exercise_name, muscle_group)
         
         if exercise_id:
-            self.refresh_exercises()
-            self.refresh_session_info()
-            app.main_screen.update_statistics()
+            autocomplete.add(exercise_name, muscle_group)
             
             snackbar = MDSnackbar(
                 MDSnackbarText(text=f"{exercise_name} added!"),
@@ -1133,20 +1417,24 @@ class WorkoutScreen(MDScreen):
     def delete_exercise(self, dialog, exercise_id):
         app = MDApp.get_running_app()
         app.db_manager.delete_exercise(self.current_session_id, exercise_id)
-        self.refresh_exercises()
-        self.refresh_session_info()
-        app.main_screen.update_statistics()
         dialog.dismiss()
         
         snackbar = MDSnackbar(
             MDSnackbarText(text="Exercise deleted successfully"),
+            MDSnackbarActionButton(
+                MDSnackbarActionButtonText(text="UNDO"),
+                on_release=lambda x: app.db_manager.undo_delete()
+            ),
             size_hint_x=0.95, pos_hint={"center_x": 0.5}
         )
         snackbar.open()
     
     def show_add_exercise_dialog(self, *args):
+        self.dialogs.open('add_exercise', self.build_add_exercise_dialog, self.prefill_add_exercise_dialog)
+    
+    def build_add_exercise_dialog(self):
         # FIXED EXERCISE DIALOG - Properly aligned
-        content = MDBoxLayout(orientation='vertical', spacing=dp(16), size_hint_y=None, height=dp(300))
+        content = MDBoxLayout(orientation='vertical', spacing=dp(16), size_hint_y=None, height=dp(356))
         
         exercise_name_field = MDTextField(
             MDTextFieldHintText(text="Exercise name"),
@@ -1182,10 +1470,15 @@ class WorkoutScreen(MDScreen):
             muscle_buttons.append(btn)
             muscle_layout.add_widget(btn)
         
-        muscle_buttons[0].style = "elevated"
         muscle_scroll.add_widget(muscle_layout)
         
+        # Matches from the catalog and past exercises, refreshed on every keystroke
+        suggestions_layout = MDBoxLayout(orientation='horizontal', spacing=dp(8), size_hint_y=None, height=dp(40))
+        exercise_name_field.bind(text=lambda field, text: self.update_exercise_suggestions(
+            text, field, suggestions_layout, muscle_buttons, selected_muscle))
+        
         content.add_widget(exercise_name_field)
+        content.add_widget(suggestions_layout)
         content.add_widget(muscle_label)
         content.add_widget(muscle_scroll)
         
@@ -1199,7 +1492,30 @@ class WorkoutScreen(MDScreen):
                         on_release=lambda x: self.add_exercise(dialog, exercise_name_field.text, selected_muscle[0])),
             ),
         )
-        dialog.open()
+        return dialog, {"name": exercise_name_field, "muscle_buttons": muscle_buttons, "selected_muscle": selected_muscle}
+    
+    def prefill_add_exercise_dialog(self, parts):
+        # Clearing the name also clears the suggestions through the text binding
+        parts["name"].text = ""
+        self.select_muscle_group('Chest', parts["muscle_buttons"], parts["selected_muscle"])
+    
+    def update_exercise_suggestions(self, text, field, suggestions_layout, muscle_buttons, selected_muscle):
+        suggestions_layout.clear_widgets()
+        autocomplete = MDApp.get_running_app().get_exercise_autocomplete()
+        
+        for name, muscle_group in autocomplete.suggest(text, limit=3):
+            if name == text:
+                continue
+            suggestions_layout.add_widget(MDButton(
+                MDButtonText(text=name, font_size=sp(12)), style="tonal", size_hint_y=None, height=dp(36),
+                on_release=lambda x, n=name, m=muscle_group: self.pick_exercise_suggestion(
+                    n, m, field, muscle_buttons, selected_muscle)
+            ))
+    
+    def pick_exercise_suggestion(self, name, muscle_group, field, muscle_buttons, selected_muscle):
+        field.text = name
+        if any(btn.children[0].text == muscle_group for btn in muscle_buttons):
+            self.select_muscle_group(muscle_group, muscle_buttons, selected_muscle)
     
     def select_muscle_group(self, muscle_group, buttons, selected_muscle):
         selected_muscle[0] = muscle_group
@@ -1219,9 +1535,7 @@ class WorkoutScreen(MDScreen):
         exercise_id = app.db_manager.add_exercise(self.current_session_id, exercise_name.strip(), muscle_group)
         
         if exercise_id:
-            self.refresh_exercises()
-            self.refresh_session_info()
-            app.main_screen.update_statistics()
+            app.get_exercise_autocomplete().add(exercise_name.strip(), muscle_group)
             
             snackbar = MDSnackbar(
                 MDSnackbarText(text=f"{exercise_name} added successfully!"),
@@ -1238,13 +1552,16 @@ class WorkoutScreen(MDScreen):
     def go_back(self, *args):
         app = MDApp.get_running_app()
         app.screen_manager.current = 'main'
-        app.main_screen.update_statistics()
 
-class ExerciseScreen(MDScreen):
+class ExerciseScreen(LiveScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.current_session_id = None
         self.current_exercise_id = None
+        # Earlier logging of this exercise; looked up on reload, not on every set change
+        self.previous_performance = None
+        self.empty_state = None
+        self.dialogs = DialogCache()
         self.build_ui()
     
     def build_ui(self):
@@ -1342,8 +1659,11 @@ class ExerciseScreen(MDScreen):
         
         # Sets scroll view
         self.sets_scroll = MDScrollView()
-        self.sets_layout = MDBoxLayout(orientation='vertical', spacing=dp(12), size_hint_y=None, height=dp(0))
+        self.sets_layout = MDBoxLayout(orientation='vertical', spacing=dp(12), size_hint_y=None)
+        self.sets_layout.bind(minimum_height=self.sets_layout.setter('height'))
         self.sets_scroll.add_widget(self.sets_layout)
+        self.set_pool = CardPool(lambda: PerfectSetCard(self))
+        self.set_cards = KeyedCardList(self.sets_layout, self.set_pool)
         
         # Add components
         content_layout.add_widget(self.info_card)
@@ -1358,8 +1678,33 @@ class ExerciseScreen(MDScreen):
     def set_current_exercise(self, session_id, exercise_id):
         self.current_session_id = session_id
         self.current_exercise_id = exercise_id
+        self.reload()
+    
+    def reload(self):
+        self.previous_performance = None
+        if self.current_session_id and self.current_exercise_id:
+            app = MDApp.get_running_app()
+            self.previous_performance = app.db_manager.get_previous_performance(
+                self.current_session_id, self.current_exercise_id
+            )
         self.refresh_exercise_info()
         self.refresh_sets()
+        self.reloaded()
+    
+    def apply_changes(self, events):
+        events = [event for event in events if isinstance(event, SetChanged) and
+                  (event.session_id, event.exercise_id) == (self.current_session_id, self.current_exercise_id)]
+        if not events:
+            return
+        
+        for event in events:
+            if event.set_data is None:
+                self.remove_set_card(event.set_id)
+            elif event.set_id in self.set_cards:
+                self.set_cards.update(event.set_id, dict(event.set_data))
+            else:
+                self.add_set_card(event.set_id, event.set_data)
+        self.refresh_exercise_info()
     
     def refresh_exercise_info(self):
         if not self.current_session_id or not self.current_exercise_id:
@@ -1383,45 +1728,56 @@ class ExerciseScreen(MDScreen):
             }
             self.exercise_emoji.text = emoji_map.get(exercise_data['muscle_group'], '🏋️')
             
-            # Calculate stats
-            sets = exercise_data.get('sets', {})
-            total_volume = sum(s.get('volume', 0) for s in sets.values())
-            sets_count = len(sets)
+            totals = app.db_manager.get_exercise_totals(self.current_session_id, self.current_exercise_id)
             
-            self.exercise_stats_label.text = f"{sets_count} sets • {total_volume:.0f}kg total volume"
-            self.sets_summary.text = f"{sets_count} completed"
+            self.exercise_stats_label.text = f"{totals['sets']} sets • {totals['volume']:.0f}kg total volume"
+            self.sets_summary.text = f"{totals['sets']} completed"
             
             created_at = exercise_data.get('created_at', '')
             if created_at:
                 self.last_performed_label.text = f"Added at {created_at}"
             else:
                 self.last_performed_label.text = "Added just now"
+            
+            previous = self.previous_performance
+            if previous:
+                best = max((set_data for _, set_data in previous['sets']), key=lambda s: (s['weight'], s['reps']))
+                self.last_performed_label.text += (
+                    f" • Last: {len(previous['sets'])} sets, best {best['weight']:.1f}kg × {best['reps']} "
+                    f"({previous['date']})"
+                )
     
     def refresh_sets(self):
-        self.sets_layout.clear_widgets()
-        self.sets_layout.height = dp(0)
-        
-        if not self.current_session_id or not self.current_exercise_id:
-            return
-        
-        app = MDApp.get_running_app()
-        session_data = app.db_manager.get_workout_session(self.current_session_id)
-        
-        if (session_data and 'exercises' in session_data and 
-            self.current_exercise_id in session_data['exercises']):
-            
-            exercise_data = session_data['exercises'][self.current_exercise_id]
-            sets = exercise_data.get('sets', {})
-            
-            if not sets:
-                self.add_sets_empty_state()
-            else:
-                sorted_sets = sorted(sets.items(), key=lambda x: x[1]['set_number'])
-                
-                for set_id, set_data in sorted_sets:
-                    set_card = PerfectSetCard(set_id, set_data, self)
-                    self.sets_layout.add_widget(set_card)
-                    self.sets_layout.height += dp(102)  # Card height + spacing
+        items = []
+        if self.current_session_id and self.current_exercise_id:
+            app = MDApp.get_running_app()
+            session_data = app.db_manager.get_workout_session(self.current_session_id) or {}
+            exercise_data = session_data.get('exercises', {}).get(self.current_exercise_id, {})
+            # Copies, so a later edit of the stored set still compares as a change
+            items = sorted(((set_id, dict(set_data)) for set_id, set_data in exercise_data.get('sets', {}).items()),
+                           key=lambda x: x[1]['set_number'])
+        
+        self.render(self.set_cards.reconcile_steps(items), self.update_empty_state, dp(102))
+        self.update_empty_state()
+    
+    def add_set_card(self, set_id, set_data):
+        # Sets are listed by set number; the card goes below every lower one
+        rows = self.set_cards.rows
+        position = sum(1 for key in self.set_cards.order if rows[key]['set_number'] < set_data['set_number'])
+        self.set_cards.insert(set_id, dict(set_data), position)
+        self.update_empty_state()
+    
+    def remove_set_card(self, set_id):
+        self.set_cards.remove(set_id)
+        self.update_empty_state()
+    
+    def update_empty_state(self):
+        if len(self.set_cards):
+            if self.empty_state is not None:
+                self.sets_layout.remove_widget(self.empty_state)
+                self.empty_state = None
+        elif self.empty_state is None:
+            self.add_sets_empty_state()
     
     def add_sets_empty_state(self):
         empty_state = MDCard(
@@ -1453,77 +1809,115 @@ class ExerciseScreen(MDScreen):
         
         empty_state.add_widget(empty_layout)
         self.sets_layout.add_widget(empty_state)
-        self.sets_layout.height += dp(152)
+        self.empty_state = empty_state
     
-    def show_add_set_dialog(self, *args):
-        # FIXED SET DIALOG - Properly aligned content
-        content = MDBoxLayout(orientation='vertical', spacing=dp(16), size_hint_y=None, height=dp(280))
+    def build_edit_set_dialog(self):
+        content = MDBoxLayout(orientation='vertical', spacing=dp(20), size_hint_y=None, height=dp(180))
+        
+        # Current values display
+        current_info = MDLabel(
+            text="", font_size=sp(15), theme_text_color="Secondary", size_hint_y=None, height=dp(30),
+            halign="center", valign="middle"
+        )
+        
+        weight_field = MDTextField(
+            MDTextFieldHintText(text="Weight (kg)"),
+            input_filter="float", size_hint_y=None, height=dp(60), font_size=sp(16)
+        )
+        
+        reps_field = MDTextField(
+            MDTextFieldHintText(text="Repetitions"),
+            input_filter="int", size_hint_y=None, height=dp(60), font_size=sp(16)
+        )
+        
+        content.add_widget(current_info)
+        content.add_widget(weight_field)
+        content.add_widget(reps_field)
         
-        # Previous set info (if available)
+        # The card being edited changes with every open
+        editing = [None]
+        headline = MDDialogHeadlineText(text="")
+        dialog = MDDialog(
+            headline,
+            MDDialogContentContainer(content),
+            MDDialogButtonContainer(
+                MDButton(MDButtonText(text="CANCEL"), style="text", on_release=lambda x: dialog.dismiss()),
+                MDButton(MDButtonText(text="UPDATE"), style="text",
+                        on_release=lambda x: editing[0].update_set(dialog, weight_field.text, reps_field.text)),
+            ),
+        )
+        return dialog, {"headline": headline, "current": current_info, "weight": weight_field,
+                        "reps": reps_field, "editing": editing}
+    
+    def prefill_edit_set_dialog(self, parts, set_card):
+        set_data = set_card.set_data
+        parts["editing"][0] = set_card
+        parts["headline"].text = f"Edit Set {set_data['set_number']}"
+        parts["current"].text = f"Current: {set_data['weight']}kg × {set_data['reps']} reps"
+        parts["weight"].text = str(set_data['weight'])
+        parts["reps"].text = str(set_data['reps'])
+    
+    def show_add_set_dialog(self, *args):
+        self.dialogs.open('add_set', self.build_add_set_dialog, self.prefill_add_set_dialog)
+    
+    def last_set(self):
+        # (exercise_data, sets, last set or None) of the current exercise
         app = MDApp.get_running_app()
         session_data = app.db_manager.get_workout_session(self.current_session_id)
         exercise_data = session_data['exercises'][self.current_exercise_id]
         sets = exercise_data.get('sets', {})
-        
-        last_weight = 0
-        last_reps = 0
-        if sets:
-            last_set = max(sets.values(), key=lambda x: x['set_number'])
-            last_weight = last_set['weight']
-            last_reps = last_set['reps']
+        last_set = max(sets.values(), key=lambda x: x['set_number']) if sets else None
+        return exercise_data, sets, last_set
+    
+    def build_add_set_dialog(self):
+        # FIXED SET DIALOG - Properly aligned content
+        content = MDBoxLayout(orientation='vertical', spacing=dp(16), size_hint_y=None, height=dp(280))
         
         # Header with set number - properly aligned
         header_label = MDLabel(
-            text=f"Set {len(sets) + 1} for {exercise_data['name']}", font_size=sp(16), bold=True,
+            text="", font_size=sp(16), bold=True,
             size_hint_y=None, height=dp(30), halign="center", valign="middle"
         )
-        content.add_widget(header_label)
         
-        # Previous set info - properly aligned
-        if sets:
-            previous_info = MDLabel(
-                text=f"Previous: {last_weight}kg × {last_reps} reps", font_size=sp(13),
-                theme_text_color="Secondary", size_hint_y=None, height=dp(25), 
-                halign="center", valign="middle"
-            )
-            content.add_widget(previous_info)
+        # Previous set info - only shown when there is a previous set
+        previous_info = MDLabel(
+            text="", font_size=sp(13),
+            theme_text_color="Secondary", size_hint_y=None, height=dp(25), 
+            halign="center", valign="middle"
+        )
         
         # Input fields - properly sized
         weight_field = MDTextField(
             MDTextFieldHintText(text="Weight (kg)"),
             MDTextFieldHelperText(text="Enter the weight you're lifting"),
-            text=str(last_weight) if last_weight > 0 else "", input_filter="float",
-            size_hint_y=None, height=dp(70), font_size=sp(16)
+            input_filter="float", size_hint_y=None, height=dp(70), font_size=sp(16)
         )
         
         reps_field = MDTextField(
             MDTextFieldHintText(text="Repetitions"),
             MDTextFieldHelperText(text="How many reps did you complete?"),
-            text=str(last_reps) if last_reps > 0 else "", input_filter="int",
-            size_hint_y=None, height=dp(70), font_size=sp(16)
+            input_filter="int", size_hint_y=None, height=dp(70), font_size=sp(16)
         )
         
-        content.add_widget(weight_field)
-        content.add_widget(reps_field)
+        # Quick weight adjustment buttons, relative to the last weight - properly aligned
+        last_weight = [0]
+        quick_label = MDLabel(
+            text="Quick adjustments:", font_size=sp(13), bold=True,
+            theme_text_color="Secondary", size_hint_y=None, height=dp(25), valign="middle"
+        )
         
-        # Quick weight adjustment buttons - properly aligned
-        if last_weight > 0:
-            quick_label = MDLabel(
-                text="Quick adjustments:", font_size=sp(13), bold=True,
-                theme_text_color="Secondary", size_hint_y=None, height=dp(25), valign="middle"
+        quick_buttons_layout = MDBoxLayout(orientation='horizontal', spacing=dp(6), size_hint_y=None, height=dp(40))
+        increments = [-5, -2.5, 2.5, 5]
+        for inc in increments:
+            btn = MDButton(
+                MDButtonText(text=f"{inc:+g}kg"), style="outlined", size_hint_x=None, width=dp(70),
+                on_release=lambda x, i=inc: self.adjust_weight(weight_field, last_weight[0] + i)
             )
-            
-            quick_buttons_layout = MDBoxLayout(orientation='horizontal', spacing=dp(6), size_hint_y=None, height=dp(40))
-            increments = [-5, -2.5, 2.5, 5]
-            for inc in increments:
-                btn = MDButton(
-                    MDButtonText(text=f"{inc:+g}kg"), style="outlined", size_hint_x=None, width=dp(70),
-                    on_release=lambda x, i=inc: self.adjust_weight(weight_field, last_weight + i)
-                )
-                quick_buttons_layout.add_widget(btn)
-            
-            content.add_widget(quick_label)
-            content.add_widget(quick_buttons_layout)
+            quick_buttons_layout.add_widget(btn)
+        
+        content.add_widget(header_label)
+        content.add_widget(weight_field)
+        content.add_widget(reps_field)
         
         dialog = MDDialog(
             MDDialogHeadlineText(text="Add New Set"),
@@ -1535,12 +1929,45 @@ class ExerciseScreen(MDScreen):
                         on_release=lambda x: self.add_set(dialog, weight_field.text, reps_field.text)),
             ),
         )
-        dialog.open()
+        return dialog, {
+            "content": content, "header": header_label, "previous": previous_info, "weight": weight_field,
+            "reps": reps_field, "quick": (quick_label, quick_buttons_layout), "last_weight": last_weight
+        }
+    
+    def prefill_add_set_dialog(self, parts):
+        exercise_data, sets, last_set = self.last_set()
+        last_weight = last_set['weight'] if last_set else 0
+        last_reps = last_set['reps'] if last_set else 0
+        parts["last_weight"][0] = last_weight
+        
+        # Same numbering as storage: one past the highest set number, which may exceed the count after a delete
+        set_number = last_set['set_number'] + 1 if last_set else 1
+        parts["header"].text = f"Set {set_number} for {exercise_data['name']}"
+        parts["weight"].text = str(last_weight) if last_weight > 0 else ""
+        parts["reps"].text = str(last_reps) if last_reps > 0 else ""
+        
+        # The optional rows are added or taken out instead of rebuilding the dialog
+        content = parts["content"]
+        previous = parts["previous"]
+        if last_set:
+            previous.text = f"Previous: {last_weight}kg × {last_reps} reps"
+            if previous.parent is None:
+                content.add_widget(previous, index=len(content.children) - 1)
+        elif previous.parent is not None:
+            content.remove_widget(previous)
+        for widget in parts["quick"]:
+            if last_weight > 0 and widget.parent is None:
+                content.add_widget(widget)
+            elif last_weight <= 0 and widget.parent is not None:
+                content.remove_widget(widget)
     
     def adjust_weight(self, weight_field, new_weight):
         weight_field.text = str(new_weight)
     
     def show_quick_sets_dialog(self, *args):
+        self.dialogs.open('quick_sets', self.build_quick_sets_dialog, self.prefill_quick_sets_dialog)
+    
+    def build_quick_sets_dialog(self):
         # FIXED QUICK SETS DIALOG - Properly aligned
         content = MDBoxLayout(orientation='vertical', spacing=dp(16), size_hint_y=None, height=dp(240))
         
@@ -1552,7 +1979,7 @@ class ExerciseScreen(MDScreen):
         sets_field = MDTextField(
             MDTextFieldHintText(text="Number of sets"),
             MDTextFieldHelperText(text="How many sets do you want to add?"),
-            text="3", input_filter="int", size_hint_y=None, height=dp(70), font_size=sp(16)
+            input_filter="int", size_hint_y=None, height=dp(70), font_size=sp(16)
         )
         
         weight_field = MDTextField(
@@ -1582,7 +2009,14 @@ class ExerciseScreen(MDScreen):
                         on_release=lambda x: self.add_multiple_sets(dialog, sets_field.text, weight_field.text, reps_field.text)),
             ),
         )
-        dialog.open()
+        return dialog, {"sets": sets_field, "weight": weight_field, "reps": reps_field}
+    
+    def prefill_quick_sets_dialog(self, parts):
+        # Starts from the last set logged, so repeating it is a single tap
+        _, _, last_set = self.last_set()
+        parts["sets"].text = "3"
+        parts["weight"].text = str(last_set['weight']) if last_set else ""
+        parts["reps"].text = str(last_set['reps']) if last_set else ""
     
     def add_multiple_sets(self, dialog, num_sets, weight, reps):
         try:
@@ -1593,12 +2027,9 @@ class ExerciseScreen(MDScreen):
             if sets_count > 0 and weight_val > 0 and reps_val > 0 and sets_count <= 10:
                 app = MDApp.get_running_app()
                 
-                for i in range(sets_count):
-                    app.db_manager.add_set(self.current_session_id, self.current_exercise_id, weight_val, reps_val)
-                
-                self.refresh_sets()
-                self.refresh_exercise_info()
-                app.main_screen.update_statistics()
+                app.db_manager.add_sets_bulk(
+                    self.current_session_id, self.current_exercise_id, [(weight_val, reps_val)] * sets_count
+                )
                 
                 snackbar = MDSnackbar(
                     MDSnackbarText(text=f"Added {sets_count} sets successfully!"),
@@ -1630,12 +2061,12 @@ class ExerciseScreen(MDScreen):
                 set_id = app.db_manager.add_set(self.current_session_id, self.current_exercise_id, weight_val, reps_val)
                 
                 if set_id:
-                    self.refresh_sets()
-                    self.refresh_exercise_info()
-                    app.main_screen.update_statistics()
+                    message = f"Set added: {weight_val}kg × {reps_val} reps"
+                    if app.db_manager.get_set_records(self.current_session_id, self.current_exercise_id, set_id):
+                        message = f"🏆 New PR! {message}"
                     
                     snackbar = MDSnackbar(
-                        MDSnackbarText(text=f"Set added: {weight_val}kg × {reps_val} reps"),
+                        MDSnackbarText(text=message),
                         MDSnackbarActionButton(
                             MDSnackbarActionButtonText(text="ADD ANOTHER"),
                             on_release=lambda x: self.show_add_set_dialog()
@@ -1663,39 +2094,143 @@ class ExerciseScreen(MDScreen):
         app.screen_manager.current = 'workout'
 
 class FitnessTrackerApp(MDApp):
+    # Stats of the last run, painted on the main screen before the data is loaded
+    STATS_CACHE_FILE = 'fitness_stats_cache.json'
+    # Seconds after the data is loaded before the other screens are built in idle frames
+    PREBUILD_DELAY = 0.5
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.title = "FitTracker Pro"
         self.theme_cls.theme_style = "Dark"
         self.theme_cls.primary_palette = "Purple"
         self.theme_cls.material_style = "M3"
-        self.db_manager = DatabaseManager()
+        # Loaded after the first frame, see initialize_app
+        self.db_manager = None
+        self.exercise_autocomplete = None
+        self.screens = {}
+        # Only the main screen is built up front; the others on first use or when idle
+        self.screen_factories = {'workout': WorkoutScreen, 'exercise': ExerciseScreen}
+        self.startup_timings = {'imports': (IMPORTED - STARTED) * 1000}
+        self.scheduler = FrameBudgetScheduler()
         
     def build(self):
         self.screen_manager = MDScreenManager()
         
-        self.main_screen = MainScreen(name='main')
-        self.workout_screen = WorkoutScreen(name='workout')
-        self.exercise_screen = ExerciseScreen(name='exercise')
-        
+        self.main_screen = self.screens['main'] = MainScreen(name='main')
         self.screen_manager.add_widget(self.main_screen)
-        self.screen_manager.add_widget(self.workout_screen)
-        self.screen_manager.add_widget(self.exercise_screen)
-        
         self.screen_manager.current = 'main'
         
-        Clock.schedule_once(self.initialize_app, 0.1)
+        cached_stats = self.load_cached_stats()
+        if cached_stats:
+            self.main_screen.update_stat_cards(cached_stats)
+        
+        Window.bind(on_flip=self.on_first_frame)
+        self.mark_startup('build')
         
         return self.screen_manager
     
+    def on_first_frame(self, *args):
+        Window.unbind(on_flip=self.on_first_frame)
+        self.mark_startup('first_frame')
+        Clock.schedule_once(self.initialize_app, 0)
+    
+    def mark_startup(self, phase):
+        self.startup_timings[phase] = (time.perf_counter() - STARTED) * 1000
+    
     def initialize_app(self, dt):
+        self.db_manager = create_database_manager()
         self.db_manager.create_tables()
-        self.main_screen.update_statistics()
+        self.mark_startup('data_loaded')
         
+        self.main_screen.attach(self.db_manager)
+        self.main_screen.update_statistics()
+        self.mark_startup('ready')
+        print("Startup: " + ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.startup_timings.items()))
+        if PROFILE_REPORT_FILE:
+            import_timer.uninstall()
+            if write_report(PROFILE_REPORT_FILE, self.startup_timings, import_timer):
+                print(f"Startup profile written to {PROFILE_REPORT_FILE}")
+        
+        Clock.schedule_once(self.prebuild_screens, self.PREBUILD_DELAY)
         Clock.schedule_once(self.show_welcome_message, 1.5)
     
+    def prebuild_screens(self, dt):
+        # One screen per frame, so the main screen keeps responding meanwhile
+        for name in self.screen_factories:
+            if name not in self.screens:
+                self.get_screen(name)
+                Clock.schedule_once(self.prebuild_screens, 0)
+                return
+    
+    def get_screen(self, name):
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.screens[name] = self.screen_factories[name](name=name)
+            self.screen_manager.add_widget(screen)
+        return screen
+    
+    @property
+    def workout_screen(self):
+        return self.get_screen('workout')
+    
+    @property
+    def exercise_screen(self):
+        return self.get_screen('exercise')
+    
+    def load_cached_stats(self):
+        try:
+            with open(self.STATS_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def save_cached_stats(self):
+        try:
+            with open(self.STATS_CACHE_FILE, 'w', encoding='utf-8') as f:
+                f.write(json_dumps(self.db_manager.get_app_stats()))
+        except OSError as e:
+            print(f"Error saving cached stats: {e}")
+    
+    def get_exercise_autocomplete(self):
+        # Built on first use; reads every exercise name logged so far
+        if self.exercise_autocomplete is None:
+            self.exercise_autocomplete = build_autocomplete(self.db_manager)
+        return self.exercise_autocomplete
+    
+    def on_pause(self):
+        # The OS may kill a paused app without further notice
+        if self.db_manager is not None:
+            self.db_manager.flush()
+            self.save_cached_stats()
+        return True
+    
+    def on_stop(self):
+        if os.environ.get('FITTRACKER_UI_STATS'):
+            print(f"Card pools: {self.card_pool_stats()}")
+            print(f"Dialogs: {self.dialog_stats()}")
+        if self.db_manager is not None:
+            self.save_cached_stats()
+            self.db_manager.close()
+    
+    def card_pool_stats(self):
+        # Screens not built yet have no pool to report
+        stats = {}
+        if 'workout' in self.screens:
+            stats['exercise'] = self.screens['workout'].exercise_pool.stats()
+        if 'exercise' in self.screens:
+            stats['set'] = self.screens['exercise'].set_pool.stats()
+        return stats
+    
+    def dialog_stats(self):
+        # {dialog name: first/reopen latency} for every dialog opened so far
+        stats = {}
+        for screen in self.screens.values():
+            stats.update(screen.dialogs.stats())
+        return stats
+    
     def show_welcome_message(self, dt):
-        if not self.db_manager.get_workout_sessions():
+        if not self.db_manager.get_session_headers():
             snackbar = MDSnackbar(
                 MDSnackbarText(text="Welcome to FitTracker Pro! Ready to start your fitness journey?"),
                 MDSnackbarActionButton(
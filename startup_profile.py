@@ -0,0 +1,82 @@
+import sys
+import time
+import builtins
+
+PROFILE_FLAG = '--profile-startup'
+DEFAULT_REPORT_FILE = 'startup_profile.txt'
+
+def pop_profile_flag(argv):
+    # Report path for --profile-startup[=path], or None. The flag is removed from argv
+    # because kivy parses the command line on import and exits on options it does not know.
+    path = None
+    for arg in list(argv[1:]):
+        if arg == PROFILE_FLAG or arg.startswith(PROFILE_FLAG + '='):
+            argv.remove(arg)
+            path = arg.partition('=')[2] or DEFAULT_REPORT_FILE
+    return path
+
+class ImportTimer:
+    # -X importtime style timings taken in-process: self and cumulative microseconds for every
+    # module imported while installed, nested by which import triggered it. Submodules pulled in
+    # by "from package import module" are counted in the importing module's own time.
+    def __init__(self):
+        self.records = []
+        self.stack = []
+        self.original_import = None
+    
+    def install(self):
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+        return self
+    
+    def uninstall(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+    
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        
+        record = [len(self.stack), name, 0.0, 0.0]
+        self.records.append(record)
+        self.stack.append(record)
+        started = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1e6
+            self.stack.pop()
+            record[3] = elapsed
+            record[2] += elapsed
+            if self.stack:
+                self.stack[-1][2] -= elapsed
+    
+    def slowest(self, n=15):
+        return sorted(self.records, key=lambda record: record[3], reverse=True)[:n]
+
+def write_report(path, phases, import_timer=None):
+    # phases: {name: ms since start}, in the order they happened
+    lines = ["# Startup phases (ms since start, ms since previous phase)"]
+    previous = 0.0
+    for phase, ms in phases.items():
+        lines.append(f"{phase:<14} {ms:9.1f} {ms - previous:9.1f}")
+        previous = ms
+    
+    if import_timer is not None and import_timer.records:
+        lines.append("")
+        lines.append("# Slowest imports (cumulative us)")
+        for depth, name, self_us, cumulative_us in import_timer.slowest():
+            lines.append(f"{cumulative_us:12.0f}  {name}")
+        lines.append("")
+        lines.append("import time: self [us] | cumulative | imported package")
+        for depth, name, self_us, cumulative_us in import_timer.records:
+            lines.append(f"import time: {self_us:9.0f} | {cumulative_us:10.0f} | {'  ' * depth}{name}")
+    
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    except OSError as e:
+        print(f"Error writing startup profile: {e}")
+        return False
+    return True
@@ -0,0 +1,2826 @@
+import io
+import os
+import re
+import gzip
+import json
+import time
+import bisect
+import itertools
+import pickle
+import argparse
+import tempfile
+import uuid
+import sqlite3
+import functools
+import contextlib
+import threading
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping, MutableMapping
+from datetime import datetime, timedelta
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def synchronized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class SnapshotWriter(threading.Thread):
+    # Owns the data files: coalesces journal appends and snapshots off the UI thread
+    def __init__(self, journal_path, serialize, debounce=0.5, compact_bytes=256 * 1024, on_error=None):
+        super().__init__(name="SnapshotWriter", daemon=True)
+        self.journal_path = journal_path
+        # serialize() returns [(path, payload)]; a None payload deletes the path
+        self.serialize = serialize
+        self.on_error = on_error
+        self.debounce = debounce
+        self.compact_bytes = compact_bytes
+        self.journal_size = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+        
+        self._cond = threading.Condition()
+        self._pending = []
+        self._snapshot_requested = False
+        self._flush_requested = False
+        self._stopping = False
+        self._submitted = 0
+        self._completed = 0
+    
+    def append(self, *lines):
+        with self._cond:
+            self._pending.extend(lines)
+            self._submitted += 1
+            self._cond.notify_all()
+    
+    def request_snapshot(self):
+        with self._cond:
+            self._snapshot_requested = True
+            self._submitted += 1
+            self._cond.notify_all()
+    
+    def flush(self, timeout=None):
+        # Block until everything submitted so far is on disk
+        with self._cond:
+            target = self._submitted
+            self._flush_requested = True
+            self._cond.notify_all()
+            if not self.is_alive():
+                return self._completed >= target
+            return self._cond.wait_for(lambda: self._completed >= target, timeout)
+    
+    def stop(self):
+        self.flush()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join()
+    
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._snapshot_requested or self._stopping)
+                if self._stopping and not self._pending and not self._snapshot_requested:
+                    return
+                
+                # Debounce: let a burst of taps land in the same write
+                deadline = time.monotonic() + self.debounce
+                while not self._flush_requested and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                
+                lines, self._pending = self._pending, []
+                snapshot = self._snapshot_requested
+                self._snapshot_requested = False
+                self._flush_requested = False
+                generation = self._submitted
+            
+            self.write_cycle(lines, snapshot)
+            
+            with self._cond:
+                self._completed = generation
+                self._cond.notify_all()
+    
+    def write_cycle(self, lines, snapshot):
+        try:
+            if lines:
+                with open(self.journal_path, 'a') as f:
+                    f.write(''.join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.journal_size += sum(len(line) for line in lines)
+            
+            if snapshot or self.journal_size > self.compact_bytes:
+                # The snapshot covers every journaled record; records queued meanwhile
+                # are replayed on top of it, which is harmless since they are idempotent
+                for path, payload in self.serialize():
+                    if payload is not None:
+                        self.write_atomic(path, payload)
+                    elif os.path.exists(path):
+                        os.remove(path)
+                for path in (self.journal_path, self.journal_path + '.old'):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self.journal_size = 0
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            if self.on_error:
+                self.on_error()
+    
+    @staticmethod
+    def write_atomic(path, payload):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb' if isinstance(payload, bytes) else 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        
+        try:
+            dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        except OSError:
+            return  # Directories cannot be opened for fsync on Windows
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+DEFAULT_APP_STATS = {
+    "total_exercises": 0,
+    "total_sessions": 0,
+    "total_volume": 0,
+    "weekly_workouts": 0
+}
+
+DEFAULT_USER_SETTINGS = {"name": "BellaajMohsen7", "weight_unit": "kg", "theme": "dark"}
+
+def json_dumps(obj):
+    # Compact JSON text, through orjson when it is installed
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+def json_loads(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+class _DataUnpickler(pickle.Unpickler):
+    # Snapshots only hold dicts, lists, strings and numbers; refuse anything importable
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Refusing to load {module}.{name} from a snapshot")
+
+class JsonCodec:
+    name = 'json'
+    extension = '.json'
+    
+    def dumps(self, obj):
+        return json_dumps(obj).encode('utf-8')
+
+class BinaryCodec:
+    # b'FTB' + format byte + body: msgpack when installed, otherwise a pickle
+    # restricted to plain data. The format byte keeps old files readable.
+    name = 'binary'
+    extension = '.bin'
+    MAGIC = b'FTB'
+    FORMAT_PICKLE = 1
+    FORMAT_MSGPACK = 2
+    
+    def dumps(self, obj):
+        if msgpack is not None:
+            return self.MAGIC + bytes([self.FORMAT_MSGPACK]) + msgpack.packb(obj, use_bin_type=True)
+        return self.MAGIC + bytes([self.FORMAT_PICKLE]) + pickle.dumps(obj, protocol=4)
+
+SNAPSHOT_CODECS = {codec.name: codec for codec in (JsonCodec(), BinaryCodec())}
+
+class GzipCompressor:
+    name = 'gzip'
+    extension = '.gz'
+    MAGIC = b'\x1f\x8b'
+    
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    
+    def decompress(self, data):
+        return gzip.decompress(data)
+
+class ZstdCompressor:
+    name = 'zstd'
+    extension = '.zst'
+    MAGIC = b'\x28\xb5\x2f\xfd'
+    
+    def compress(self, data):
+        if zstandard is None:
+            raise ValueError("zstd archives need the zstandard package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    
+    def decompress(self, data):
+        if zstandard is None:
+            raise ValueError("Archive was written with zstd, which is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+# Compression of archived (cold) session files; zstd when installed, gzip otherwise
+ARCHIVE_COMPRESSORS = {compressor.name: compressor for compressor in (ZstdCompressor(), GzipCompressor())}
+
+def decode_snapshot(data):
+    # Sniffs the content, so either format loads whatever the file extension says
+    for compressor in ARCHIVE_COMPRESSORS.values():
+        if data[:len(compressor.MAGIC)] == compressor.MAGIC:
+            return decode_snapshot(compressor.decompress(data))
+    if data[:3] == BinaryCodec.MAGIC:
+        version, body = data[3], data[4:]
+        if version == BinaryCodec.FORMAT_MSGPACK:
+            if msgpack is None:
+                raise ValueError("Snapshot was written with msgpack, which is not installed")
+            return msgpack.unpackb(body, raw=False)
+        if version == BinaryCodec.FORMAT_PICKLE:
+            return _DataUnpickler(io.BytesIO(body)).load()
+        raise ValueError(f"Unsupported binary snapshot version {version}")
+    return json_loads(data)
+
+def read_snapshot(path):
+    with open(path, 'rb') as f:
+        return decode_snapshot(f.read())
+
+def snapshot_variants(base_path):
+    return [base_path + codec.extension for codec in SNAPSHOT_CODECS.values()]
+
+def find_snapshot(base_path, codec):
+    # Prefer the configured format but still read files written in another one
+    for path in [base_path + codec.extension] + snapshot_variants(base_path):
+        if os.path.exists(path):
+            return path
+    return None
+
+def archive_variants(base_path):
+    return [path + compressor.extension for path in snapshot_variants(base_path)
+            for compressor in ARCHIVE_COMPRESSORS.values()]
+
+def find_archive(base_path):
+    for path in archive_variants(base_path):
+        if os.path.exists(path):
+            return path
+    return None
+
+def iter_shard_files(shard_dir, archive_dir):
+    # (session_id, path, archived) for every session file. Archived copies come first so a
+    # hot shard left by an interrupted move is seen last and wins.
+    extensions = tuple(codec.extension for codec in SNAPSHOT_CODECS.values())
+    for directory in (archive_dir, shard_dir):
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            base = filename
+            for compressor in ARCHIVE_COMPRESSORS.values():
+                if directory == archive_dir and base.endswith(compressor.extension):
+                    base = base[:-len(compressor.extension)]
+            session_id, extension = os.path.splitext(base)
+            if extension not in extensions or (directory == archive_dir and base == filename):
+                continue
+            yield session_id, os.path.join(directory, filename), directory == archive_dir
+
+def quarantine_file(path):
+    # Keep an unreadable file for recovery instead of overwriting it on the next save
+    corrupt_path = f"{path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    try:
+        os.replace(path, corrupt_path)
+        print(f"Moved unreadable {path} to {corrupt_path}")
+    except OSError as e:
+        print(f"Error quarantining {path}: {e}")
+
+def quarantine_record(path, session_id, raw):
+    # One unreadable session out of a larger file; kept as JSON lines next to it
+    try:
+        with open(f"{path}.corrupt-sessions", 'a') as f:
+            f.write(json.dumps({"id": session_id, "raw": raw}) + '\n')
+        print(f"Skipped unreadable session {session_id} from {path}")
+    except OSError as e:
+        print(f"Error quarantining session {session_id}: {e}")
+
+class JsonStreamReader:
+    # Walks a JSON document in fixed-size chunks and hands out one value at a time as raw
+    # text, so memory is bounded by the largest single value rather than the whole file
+    CHUNK_SIZE = 64 * 1024
+    OUTSIDE_STRING = re.compile(r'["{}\[\]]')
+    INSIDE_STRING = re.compile(r'["\\]')
+    SCALAR_END = re.compile(r'[,}\]\s]')
+    
+    def __init__(self, f, chunk_size=None):
+        self.f = f
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+    
+    def fill(self):
+        # Drops the consumed text; False once the file is exhausted
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+    
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+    
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Expected {ch!r} in JSON stream, found {self.peek()!r}")
+        self.pos += 1
+    
+    def read_raw(self):
+        # Text of the next value, delimited by bracket depth outside of strings
+        first = self.peek()
+        if not first:
+            raise ValueError("Unexpected end of JSON stream")
+        
+        offset, depth, in_string = 0, 0, False
+        if first not in '{["':
+            while True:
+                match = self.SCALAR_END.search(self.buf, self.pos)
+                if match or not self.fill():
+                    end = match.start() if match else len(self.buf)
+                    raw, self.pos = self.buf[self.pos:end], end
+                    return raw
+        
+        while True:
+            pattern = self.INSIDE_STRING if in_string else self.OUTSIDE_STRING
+            match = pattern.search(self.buf, self.pos + offset)
+            if match is None or (match.group() == '\\' and match.end() >= len(self.buf)):
+                offset = len(self.buf) - self.pos if match is None else match.start() - self.pos
+                if not self.fill():
+                    raise ValueError("Unexpected end of JSON stream")
+                continue
+            
+            ch = match.group()
+            offset = match.end() - self.pos
+            if ch == '\\':
+                offset += 1
+            elif ch == '"':
+                in_string = not in_string
+            elif ch in '{[':
+                depth += 1
+            else:
+                depth -= 1
+            
+            if not in_string and depth == 0:
+                raw = self.buf[self.pos:self.pos + offset]
+                self.pos += offset
+                return raw
+    
+    def iter_object(self):
+        # Yields each key; the caller must consume the value before asking for the next one
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = json.loads(self.read_raw())
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+            else:
+                self.expect('}')
+                return
+
+# Sessions are upgraded on import by the steps from the file's schema_version onwards;
+# files without one were written by builds before the versioned layout
+SESSION_SCHEMA_VERSION = 2
+
+def upgrade_session_v1(session_id, session):
+    session['id'] = session.get('id', session_id)
+    for field in ('name', 'date'):
+        if not isinstance(session.get(field), str):
+            raise ValueError(f"Session {session_id} has no {field}")
+    session.setdefault('time', '00:00')
+    session.setdefault('workout_type', 'Custom')
+    session.setdefault('status', 'active')
+    for exercise_id, exercise in session.setdefault('exercises', {}).items():
+        exercise['id'] = exercise.get('id', exercise_id)
+        exercise.setdefault('muscle_group', 'General')
+        for set_id, set_data in exercise.setdefault('sets', {}).items():
+            set_data['weight'] = float(set_data['weight'])
+            set_data['reps'] = int(set_data['reps'])
+            set_data['volume'] = set_data['weight'] * set_data['reps']
+            set_data.setdefault('set_number', int(set_id.rsplit('_', 1)[-1]) if set_id[-1:].isdigit() else 0)
+    return session
+
+SESSION_UPGRADES = {1: upgrade_session_v1}
+
+def upgrade_session(session_id, session, version):
+    if not isinstance(session, dict):
+        raise ValueError(f"Session {session_id} is not an object")
+    while version < SESSION_SCHEMA_VERSION:
+        session = SESSION_UPGRADES[version](session_id, session)
+        version += 1
+    return session
+
+def iter_legacy_snapshot(f):
+    # Single-file layout ({"app_stats", "workout_sessions", "user_settings"}) as a stream of
+    # ('section', key, value), ('session', id, session) and ('corrupt', id, raw_text)
+    reader = JsonStreamReader(f)
+    version = 1
+    for key in reader.iter_object():
+        if key == 'workout_sessions':
+            for session_id in reader.iter_object():
+                raw = reader.read_raw()
+                try:
+                    yield 'session', session_id, upgrade_session(session_id, json_loads(raw), version)
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    yield 'corrupt', session_id, raw
+        else:
+            value = json_loads(reader.read_raw())
+            if key == 'schema_version':
+                version = value
+            yield 'section', key, value
+
+# Change events published after each mutation; deltas are what the mutation added or removed
+SessionAdded = namedtuple('SessionAdded', 'session_id')
+SessionRemoved = namedtuple('SessionRemoved', 'session_id')
+ExerciseAdded = namedtuple('ExerciseAdded', 'session_id exercise_id sets_delta volume_delta')
+ExerciseRemoved = namedtuple('ExerciseRemoved', 'session_id exercise_id sets_delta volume_delta')
+# set_data is None when the set was deleted
+SetChanged = namedtuple('SetChanged', 'session_id exercise_id set_id set_data sets_delta volume_delta')
+
+class ChangeBus:
+    # Synchronous fan-out of change events to subscribers, e.g. screens
+    def __init__(self):
+        self.subscribers = []
+    
+    def subscribe(self, callback, kinds=None):
+        # kinds: event types to receive (all when None); returns the handle for unsubscribe
+        handle = (callback, tuple(kinds) if kinds else None)
+        self.subscribers.append(handle)
+        return handle
+    
+    def unsubscribe(self, handle):
+        if handle in self.subscribers:
+            self.subscribers.remove(handle)
+    
+    def publish(self, events):
+        for callback, kinds in list(self.subscribers):
+            wanted = [event for event in events if kinds is None or isinstance(event, kinds)]
+            if wanted:
+                try:
+                    callback(wanted)
+                except Exception as e:
+                    print(f"Error handling change events: {e}")
+
+class StorageBackend:
+    # Interface shared by every storage engine; screens only talk to these methods
+    UNDO_LIMIT = 20
+    # Whether end_transaction(failed=True) undoes the block's writes; if so its events and
+    # undo entries describe changes that never happened and are dropped
+    ROLLS_BACK_FAILED_TRANSACTIONS = False
+    
+    def __init__(self):
+        # Debug aid: recompute stats after every mutation and report drift
+        self.verify_stats_on_write = os.environ.get('FITTRACKER_VERIFY_STATS') == '1'
+        self._volume_total = 0.0
+        self.lock = threading.RLock()
+        self._transaction_depth = 0
+        # (kind, *args) of the latest deletes, newest last; each keeps the removed data by reference
+        self.undo_stack = []
+        self.changes = ChangeBus()
+        self._pending_events = []
+        # Undo entries pushed inside the current transaction
+        self._transaction_undo = 0
+    
+    def create_tables(self):
+        raise NotImplementedError
+    
+    def get_app_stats(self):
+        raise NotImplementedError
+    
+    def get_user_settings(self):
+        raise NotImplementedError
+    
+    def get_workout_sessions(self):
+        raise NotImplementedError
+    
+    def get_session_headers(self):
+        # {session_id: header} with name/date/time/workout_type/status and cached
+        # exercise_count/set_count/total_volume; never loads full sessions
+        raise NotImplementedError
+    
+    def get_session_header(self, session_id):
+        # One header, or None
+        return self.get_session_headers().get(session_id)
+    
+    def recent_sessions(self, n=None):
+        # [(session_id, header)] newest first, ties broken by time
+        raise NotImplementedError
+    
+    def get_week_rollup(self, date=None):
+        # {"sessions", "sets", "volume", "training_days"} for the ISO week of date (default today)
+        raise NotImplementedError
+    
+    def get_month_rollup(self, date=None):
+        # Same totals for the calendar month of date (default today)
+        raise NotImplementedError
+    
+    def sessions_between(self, start, end):
+        # [(session_id, header)] for inclusive "YYYY-MM-DD" bounds, oldest first
+        raise NotImplementedError
+    
+    def get_workout_session(self, session_id):
+        raise NotImplementedError
+    
+    def scan_session(self, session_id):
+        # Like get_workout_session, for passes over the whole history that should not
+        # leave every session cached
+        return self.get_workout_session(session_id)
+    
+    def release_sessions(self, session_ids):
+        # Hint that these sessions are no longer needed in memory
+        pass
+    
+    def get_exercise_history(self, exercise_name, limit=None):
+        # Every logging of an exercise name (normalized), newest first:
+        # [{"session_id", "exercise_id", "date", "sets": [(set_id, set_data)]}]
+        raise NotImplementedError
+    
+    def get_previous_performance(self, session_id, exercise_id):
+        # Latest entry with sets for the same exercise name logged before this one, or None
+        raise NotImplementedError
+    
+    def get_exercise_names(self):
+        # [(display name, muscle_group or None if not at hand, times logged)], one per normalized name
+        raise NotImplementedError
+    
+    def get_exercise_muscle_group(self, exercise_name):
+        # Muscle group of the latest logging of this exercise, or None
+        for entry in self.get_exercise_history(exercise_name, limit=1):
+            exercise = self.scan_session(entry['session_id']).get('exercises', {}).get(entry['exercise_id'])
+            return exercise.get('muscle_group') if exercise else None
+        return None
+    
+    def get_personal_records(self, exercise_name):
+        # {"max_weight", "best_volume", "best_e1rm": {"value", "ref", "previous"},
+        #  "reps_at_weight": {"<weight>": {...}}}, empty if the exercise has no sets
+        raise NotImplementedError
+    
+    def get_set_records(self, session_id, exercise_id, set_id):
+        # Record kinds this set beat an earlier best in, e.g. ["max_weight", "best_e1rm"]
+        raise NotImplementedError
+    
+    def create_workout_session(self, name, workout_type="Custom", date=None, time=None):
+        # date/time default to now; importers pass the original ones
+        raise NotImplementedError
+    
+    def delete_workout_session(self, session_id):
+        raise NotImplementedError
+    
+    def add_exercise(self, session_id, exercise_name, muscle_group="General"):
+        raise NotImplementedError
+    
+    def delete_exercise(self, session_id, exercise_id):
+        raise NotImplementedError
+    
+    def add_set(self, session_id, exercise_id, weight, reps, set_number=None):
+        # Numbered one past the highest set; importers pass the original number, and get None
+        # if the exercise already has a set with it
+        raise NotImplementedError
+    
+    def update_set(self, session_id, exercise_id, set_id, weight=None, reps=None):
+        raise NotImplementedError
+    
+    def delete_set(self, session_id, exercise_id, set_id):
+        raise NotImplementedError
+    
+    def restore_session(self, session):
+        # Undo of delete_workout_session; False if the id was taken again
+        raise NotImplementedError
+    
+    def restore_exercise(self, session_id, exercise_id, exercise):
+        raise NotImplementedError
+    
+    def restore_set(self, session_id, exercise_id, set_id, set_data):
+        raise NotImplementedError
+    
+    def push_undo(self, kind, *args):
+        self.undo_stack.append((kind,) + args)
+        del self.undo_stack[:-self.UNDO_LIMIT]
+        if self._transaction_depth:
+            self._transaction_undo += 1
+    
+    def can_undo(self):
+        return bool(self.undo_stack)
+    
+    def undo_delete(self):
+        # Reverts the latest delete; returns its kind ('session', 'exercise', 'set') or None
+        with self.lock:
+            if not self.undo_stack:
+                return None
+            kind, *args = self.undo_stack.pop()
+            return kind if getattr(self, f'restore_{kind}')(*args) else None
+    
+    def compute_stats(self):
+        # Full recount: (total_exercises, total_sessions, total_volume)
+        raise NotImplementedError
+    
+    def recount_stats(self):
+        # Slow path used for verification; engines may recount from primary data
+        return self.compute_stats()
+    
+    def stats_store(self):
+        # The mutable dict the running counters live in
+        raise NotImplementedError
+    
+    def get_session_totals(self, session_id):
+        # {"exercises": n, "sets": n, "volume": kg} for one session
+        raise NotImplementedError
+    
+    def get_exercise_totals(self, session_id, exercise_id):
+        # {"sets": n, "volume": kg} for one exercise
+        raise NotImplementedError
+    
+    def flush(self):
+        pass
+    
+    def save_data(self):
+        # Everything on disk in its final form, not just journaled
+        self.flush()
+    
+    def close(self):
+        self.flush()
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        # Group mutations so they are persisted together; nested blocks join the outer one
+        with self.lock:
+            self._transaction_depth += 1
+            failed = False
+            try:
+                yield self
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self._transaction_depth -= 1
+                if not self._transaction_depth:
+                    self.end_transaction(failed)
+                    self.stats_store()['weekly_workouts'] = self.get_week_rollup()['training_days']
+                    if self.verify_stats_on_write:
+                        self.verify_stats()
+                    events, self._pending_events = self._pending_events, []
+                    undo_count, self._transaction_undo = self._transaction_undo, 0
+                    if failed and self.ROLLS_BACK_FAILED_TRANSACTIONS:
+                        # Nothing of the block is left to announce or to undo
+                        if undo_count:
+                            del self.undo_stack[-undo_count:]
+                    elif events:
+                        # Changes kept after a failure are published like any others
+                        self.changes.publish(events)
+    
+    def end_transaction(self, failed):
+        pass
+    
+    def emit(self, event):
+        # Published once the outermost transaction ends, so subscribers see consistent totals
+        if not self.changes.subscribers:
+            return
+        if self._transaction_depth:
+            self._pending_events.append(event)
+        else:
+            self.changes.publish([event])
+    
+    def add_sets_bulk(self, session_id, exercise_id, sets):
+        # sets: iterable of (weight, reps); returns the new set ids in order
+        with self.transaction():
+            return [self.add_set(session_id, exercise_id, weight, reps) for weight, reps in sets]
+    
+    def update_stats(self):
+        total_exercises, total_sessions, total_volume = self.compute_stats()
+        self._volume_total = total_volume
+        
+        stats = self.stats_store()
+        stats.update({
+            "total_exercises": total_exercises,
+            "total_sessions": total_sessions,
+            "total_volume": int(round(total_volume, 6)),
+            "weekly_workouts": self.get_week_rollup()['training_days']
+        })
+    
+    def adjust_stats(self, exercises=0, sessions=0, volume=0.0):
+        # O(1) running counters, fed with the delta of each mutation
+        stats = self.stats_store()
+        stats['total_exercises'] = stats.get('total_exercises', 0) + exercises
+        stats['total_sessions'] = stats.get('total_sessions', 0) + sessions
+        self._volume_total += volume
+        stats['total_volume'] = int(round(self._volume_total, 6))
+        if not self._transaction_depth:
+            # Refreshed once when an enclosing transaction ends
+            stats['weekly_workouts'] = self.get_week_rollup()['training_days']
+        
+        if self.verify_stats_on_write and not self._transaction_depth:
+            self.verify_stats()
+    
+    def verify_stats(self, repair=False):
+        total_exercises, total_sessions, total_volume = self.recount_stats()
+        stats = self.get_app_stats()
+        
+        drift = {}
+        if stats.get('total_exercises', 0) != total_exercises:
+            drift['total_exercises'] = (stats.get('total_exercises', 0), total_exercises)
+        if stats.get('total_sessions', 0) != total_sessions:
+            drift['total_sessions'] = (stats.get('total_sessions', 0), total_sessions)
+        if abs(self._volume_total - total_volume) > 1e-6:
+            drift['total_volume'] = (self._volume_total, total_volume)
+        
+        if drift:
+            print(f"Stats drift detected: {drift}")
+            if repair:
+                self.update_stats()
+        return drift
+    
+    @staticmethod
+    def exercise_volume(exercise_data):
+        return sum(s.get('volume', 0) for s in exercise_data.get('sets', {}).values())
+
+class SetColumns:
+    # Parallel arrays with one row per set (its volume and interned exercise key) and running
+    # set counts and volumes per exercise, kept up to date by put/remove so a lookup never
+    # walks the nested session -> exercise -> set dicts. Only opened shards are covered.
+    def __init__(self):
+        self.volume = array('d')
+        self.exercise_key = array('I')
+        
+        self.rows = {}
+        self.free_rows = []
+        self.exercise_keys = {}
+        self.exercise_sets = []
+        self.exercise_volumes = []
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def clear(self):
+        self.__init__()
+    
+    def load_sessions(self, sessions):
+        for session_id, session in sessions.items():
+            for exercise_id, exercise in session.get('exercises', {}).items():
+                self.register_exercise(session_id, exercise_id)
+                for set_id, set_data in exercise.get('sets', {}).items():
+                    self.put(session_id, exercise_id, set_id, set_data)
+    
+    def register_exercise(self, session_id, exercise_id):
+        key = self.exercise_keys.get((session_id, exercise_id))
+        if key is None:
+            key = self.exercise_keys[(session_id, exercise_id)] = len(self.exercise_keys)
+            self.exercise_sets.append(0)
+            self.exercise_volumes.append(0.0)
+        return key
+    
+    def put(self, session_id, exercise_id, set_id, set_data):
+        row_key = (session_id, exercise_id, set_id)
+        row = self.rows.get(row_key)
+        volume = float(set_data['volume'])
+        
+        if row is None:
+            ex_key = self.register_exercise(session_id, exercise_id)
+            if self.free_rows:
+                row = self.free_rows.pop()
+                self.exercise_key[row] = ex_key
+            else:
+                row = len(self.volume)
+                self.volume.append(0.0)
+                self.exercise_key.append(ex_key)
+            self.rows[row_key] = row
+            self.count(row, 1, volume)
+        else:
+            self.count(row, 0, volume - self.volume[row])
+        self.volume[row] = volume
+    
+    def count(self, row, sets, volume):
+        ex_key = self.exercise_key[row]
+        self.exercise_sets[ex_key] += sets
+        self.exercise_volumes[ex_key] += volume
+    
+    def remove(self, session_id, exercise_id, set_id):
+        row = self.rows.pop((session_id, exercise_id, set_id), None)
+        if row is None:
+            return
+        self.count(row, -1, -self.volume[row])
+        # The slot is reused by the next insert
+        self.volume[row] = 0.0
+        self.free_rows.append(row)
+    
+    def remove_exercise(self, session_id, exercise_id, exercise_data):
+        for set_id in exercise_data.get('sets', {}):
+            self.remove(session_id, exercise_id, set_id)
+    
+    def remove_session(self, session_id, session_data):
+        for exercise_id, exercise_data in session_data.get('exercises', {}).items():
+            self.remove_exercise(session_id, exercise_id, exercise_data)
+    
+    def exercise_totals(self, session_id, exercise_id):
+        ex_key = self.exercise_keys.get((session_id, exercise_id))
+        if ex_key is None:
+            return 0, 0.0
+        return self.exercise_sets[ex_key], self.exercise_volumes[ex_key]
+
+class SessionDateIndex:
+    # Session ids ordered by (date, time, insertion order), kept sorted with bisect so
+    # readers never sort; insertion order keeps ties stable
+    def __init__(self):
+        self.keys = []
+        self.key_of = {}
+        self._seq = 0
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def make_key(self, session_id, date, clock):
+        key = (date or '', clock or '00:00', self._seq, session_id)
+        self._seq += 1
+        return key
+    
+    def rebuild(self, headers):
+        self.key_of = {
+            session_id: self.make_key(session_id, header.get('date'), header.get('time'))
+            for session_id, header in headers.items()
+        }
+        self.keys = sorted(self.key_of.values())
+    
+    def add(self, session_id, date, clock):
+        self.remove(session_id)
+        key = self.key_of[session_id] = self.make_key(session_id, date, clock)
+        bisect.insort(self.keys, key)
+    
+    def remove(self, session_id):
+        key = self.key_of.pop(session_id, None)
+        if key is None:
+            return
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+    
+    def recent(self, n=None):
+        # Newest first; O(n) regardless of history length
+        n = len(self.keys) if n is None else min(n, len(self.keys))
+        return [self.keys[-1 - i][3] for i in range(n)]
+    
+    def between(self, start, end):
+        # Inclusive "YYYY-MM-DD" bounds, oldest first
+        lo = bisect.bisect_left(self.keys, (start,))
+        hi = bisect.bisect_right(self.keys, (end, '\uffff'))
+        return [key[3] for key in self.keys[lo:hi]]
+
+class CalendarRollups:
+    # Per ISO week and per month totals, adjusted by delta on every mutation so the
+    # "This Week" card and trend views read them in O(1)
+    def __init__(self):
+        self.weeks = {}
+        self.months = {}
+        self._week_keys = {}
+    
+    @staticmethod
+    def empty_summary():
+        return {"sessions": 0, "sets": 0, "volume": 0.0, "training_days": 0}
+    
+    def week_key(self, date):
+        key = self._week_keys.get(date)
+        if key is None:
+            try:
+                year, week, _ = datetime.strptime(date, "%Y-%m-%d").isocalendar()
+                key = f"{year}-W{week:02d}"
+            except (TypeError, ValueError):
+                key = ''
+            self._week_keys[date] = key
+        return key
+    
+    def buckets(self, date):
+        for table, key in ((self.weeks, self.week_key(date)), (self.months, (date or '')[:7])):
+            bucket = table.get(key)
+            if bucket is None:
+                bucket = table[key] = {"sessions": 0, "sets": 0, "volume": 0.0, "days": {}}
+            yield bucket
+    
+    def rebuild(self, headers):
+        self.weeks, self.months = {}, {}
+        for header in headers.values():
+            self.add_session(header.get('date'), header.get('set_count', 0), header.get('total_volume', 0.0))
+    
+    def add_session(self, date, sets=0, volume=0.0):
+        for bucket in self.buckets(date):
+            bucket['sessions'] += 1
+            bucket['sets'] += sets
+            bucket['volume'] += volume
+            bucket['days'][date] = bucket['days'].get(date, 0) + 1
+    
+    def remove_session(self, date, sets=0, volume=0.0):
+        for bucket in self.buckets(date):
+            bucket['sessions'] -= 1
+            bucket['sets'] -= sets
+            bucket['volume'] -= volume
+            remaining = bucket['days'].get(date, 0) - 1
+            if remaining > 0:
+                bucket['days'][date] = remaining
+            else:
+                bucket['days'].pop(date, None)
+    
+    def adjust(self, date, sets=0, volume=0.0):
+        for bucket in self.buckets(date):
+            bucket['sets'] += sets
+            bucket['volume'] += volume
+    
+    @staticmethod
+    def summarize(bucket):
+        if bucket is None:
+            return CalendarRollups.empty_summary()
+        return {"sessions": bucket['sessions'], "sets": bucket['sets'], "volume": bucket['volume'],
+                "training_days": len(bucket['days'])}
+    
+    def week(self, date):
+        return self.summarize(self.weeks.get(self.week_key(date)))
+    
+    def month(self, date):
+        return self.summarize(self.months.get(date[:7]))
+
+def normalize_exercise_name(name):
+    # "Bench-Press ", "bench press" and "BENCH  PRESS" share one history
+    return ' '.join(''.join(ch if ch.isalnum() else ' ' for ch in (name or '').lower()).split())
+
+class ExerciseHistoryIndex:
+    # Normalized exercise name -> every (session, exercise) it was logged under, ordered
+    # like SessionDateIndex; sets are read from the referenced exercise on demand
+    def __init__(self):
+        self.entries = {}
+        self.key_of = {}
+        self._seq = 0
+    
+    def make_key(self, session_key, exercise_id):
+        date, clock, _, session_id = session_key
+        key = (date, clock, self._seq, session_id, exercise_id)
+        self._seq += 1
+        return key
+    
+    def rebuild(self, headers, session_index):
+        self.entries, self.key_of = {}, {}
+        for session_key in session_index.keys:
+            session_id = session_key[3]
+            for exercise_id, name in headers[session_id].get('exercise_names', {}).items():
+                norm = normalize_exercise_name(name)
+                key = self.key_of[(session_id, exercise_id)] = (norm, self.make_key(session_key, exercise_id))
+                self.entries.setdefault(norm, []).append(key[1])
+    
+    def add(self, name, session_key, exercise_id):
+        session_id = session_key[3]
+        self.remove(session_id, exercise_id)
+        norm = normalize_exercise_name(name)
+        key = self.make_key(session_key, exercise_id)
+        self.key_of[(session_id, exercise_id)] = (norm, key)
+        bisect.insort(self.entries.setdefault(norm, []), key)
+    
+    def remove(self, session_id, exercise_id):
+        found = self.key_of.pop((session_id, exercise_id), None)
+        if found is None:
+            return
+        norm, key = found
+        keys = self.entries[norm]
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+        if not keys:
+            del self.entries[norm]
+    
+    def remove_session(self, session_id, exercise_ids):
+        for exercise_id in exercise_ids:
+            self.remove(session_id, exercise_id)
+    
+    def history(self, name):
+        # Newest first as (date, session_id, exercise_id)
+        for key in reversed(self.entries.get(normalize_exercise_name(name), ())):
+            yield key[0], key[3], key[4]
+    
+    def before(self, session_id, exercise_id):
+        # Older entries of the same exercise name, newest first, skipping its own session
+        found = self.key_of.get((session_id, exercise_id))
+        if found is None:
+            return
+        norm, key = found
+        keys = self.entries[norm]
+        for i in range(bisect.bisect_left(keys, key) - 1, -1, -1):
+            if keys[i][3] != session_id:
+                yield keys[i][0], keys[i][3], keys[i][4]
+
+def estimated_one_rep_max(weight, reps):
+    # Epley formula
+    return float(weight) if reps <= 1 else float(weight) * (1 + reps / 30.0)
+
+class PersonalRecords:
+    # Per normalized exercise name: the best value of each kind and the set holding it,
+    # as [session_id, exercise_id, set_id]. "previous" is the value it beat (None for the
+    # first set ever logged) and "previous_ref" the set that held it, so a set can be told
+    # apart as a new PR later.
+    KINDS = ('max_weight', 'best_volume', 'best_e1rm')
+    
+    def __init__(self, table=None):
+        self.table = table if table is not None else {}
+    
+    @staticmethod
+    def weight_key(weight):
+        return f"{float(weight):g}"
+    
+    @staticmethod
+    def offer_value(records, kind, value, ref, precedes=None):
+        # False when the value takes nothing, None when the name must be rebuilt: a set logged
+        # before the holder that ties or beats it changes which set broke which
+        current = records.get(kind)
+        if current is not None and precedes is not None and precedes(current['ref']):
+            if value >= current['value']:
+                return None
+            # It only raises the best the holder beat
+            previous, previous_ref = current['previous'], current.get('previous_ref')
+            if (previous is None or value > previous or
+                    (value == previous and previous_ref is not None and precedes(previous_ref))):
+                records[kind] = dict(current, previous=value, previous_ref=ref)
+            return False
+        if current is not None and value <= current['value']:
+            return False
+        records[kind] = {"value": value, "ref": ref, "previous": current['value'] if current else None,
+                         "previous_ref": current['ref'] if current else None}
+        return True
+    
+    def offer(self, name, ref, set_data, precedes=None):
+        # O(1) per set. precedes(other_ref) tells whether this set was logged before another one;
+        # without it the set is taken as the latest. True if it took any record, None when
+        # the name needs a rebuild instead.
+        records = self.table.setdefault(normalize_exercise_name(name), {"reps_at_weight": {}})
+        weight, reps = set_data['weight'], set_data['reps']
+        values = (weight, set_data['volume'], estimated_one_rep_max(weight, reps))
+        took = [self.offer_value(records, kind, value, ref, precedes) for kind, value in zip(self.KINDS, values)]
+        took.append(self.offer_value(records['reps_at_weight'], self.weight_key(weight), reps, ref, precedes))
+        return None if None in took else any(took)
+    
+    def holders(self, records):
+        yield from (records[kind] for kind in self.KINDS if kind in records)
+        yield from records['reps_at_weight'].values()
+    
+    def touches(self, name, *ref):
+        # Whether a record is held, or was last beaten, by the set, exercise or session
+        # identified by the ref prefix
+        records = self.table.get(normalize_exercise_name(name))
+        if records is None:
+            return False
+        ref = list(ref)
+        return any(record['ref'][:len(ref)] == ref or (record.get('previous_ref') or [])[:len(ref)] == ref
+                   for record in self.holders(records))
+    
+    def rebuild(self, name, sets):
+        # sets: ([session_id, exercise_id, set_id], set_data) oldest first
+        norm = normalize_exercise_name(name)
+        self.table.pop(norm, None)
+        for ref, set_data in sets:
+            self.offer(norm, ref, set_data)
+    
+    def get(self, name):
+        return self.table.get(normalize_exercise_name(name), {})
+    
+    def snapshot(self):
+        # Record entries are replaced, never changed in place, so two levels of copying suffice
+        return {norm: dict(records, reps_at_weight=dict(records['reps_at_weight']))
+                for norm, records in self.table.items()}
+    
+    def broken_by(self, name, ref):
+        # Record kinds this set set over an earlier best
+        records = self.table.get(normalize_exercise_name(name))
+        if records is None:
+            return []
+        broken = [kind for kind in self.KINDS
+                  if kind in records and records[kind]['ref'] == ref and records[kind]['previous'] is not None]
+        at_weight = [record for record in records['reps_at_weight'].values() if record['ref'] == ref]
+        if any(record['previous'] is not None for record in at_weight):
+            broken.append('reps_at_weight')
+        return broken
+
+class LazySessionMap(MutableMapping):
+    # Session headers always live in memory; a full session is read from its
+    # shard file the first time it is accessed. Archived sessions have their
+    # shard compressed in archive_dir instead, and move back when changed.
+    def __init__(self, shard_dir, headers=None, on_load=None, codec=None, archive_dir=None, archived=None):
+        self.shard_dir = shard_dir
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(shard_dir), 'archive')
+        self.archived = set(archived or ())
+        self.codec = codec or SNAPSHOT_CODECS['json']
+        self.headers = headers if headers is not None else {}
+        self.loaded = {}
+        self.dirty = set()
+        self.removed = set()
+        self.on_load = on_load
+        # Copy-on-write: ids of containers created or copied since the last freeze(). Anything
+        # else may be shared with a snapshot being written and is copied before its first change.
+        self.owned = set()
+    
+    @staticmethod
+    def make_header(session):
+        exercises = session.get('exercises', {})
+        return {
+            "id": session.get('id'), "name": session.get('name', ''), "date": session.get('date', ''),
+            "time": session.get('time', '00:00'), "workout_type": session.get('workout_type', 'Custom'),
+            "status": session.get('status', 'active'),
+            "exercise_count": len(exercises),
+            "set_count": sum(len(ex.get('sets', {})) for ex in exercises.values()),
+            "total_volume": float(sum(StorageBackend.exercise_volume(ex) for ex in exercises.values())),
+            "exercise_names": {exercise_id: ex.get('name', '') for exercise_id, ex in exercises.items()}
+        }
+    
+    def shard_base(self, session_id):
+        return os.path.join(self.shard_dir, session_id)
+    
+    def shard_path(self, session_id):
+        return self.shard_base(session_id) + self.codec.extension
+    
+    def archive_base(self, session_id):
+        return os.path.join(self.archive_dir, session_id)
+    
+    def find_shard(self, session_id):
+        # Both places are tried: an interrupted move can leave the only copy in the other one
+        places = [
+            lambda: find_snapshot(self.shard_base(session_id), self.codec),
+            lambda: find_archive(self.archive_base(session_id))
+        ]
+        if session_id in self.archived:
+            places.reverse()
+        for place in places:
+            path = place()
+            if path is not None:
+                return path
+        return None
+    
+    def is_loaded(self, session_id):
+        return session_id in self.loaded
+    
+    def own(self, obj):
+        self.owned.add(id(obj))
+        return obj
+    
+    def writable_table(self, name):
+        # 'loaded' or 'headers'; copied (shallow, once per snapshot) if a snapshot holds it
+        table = getattr(self, name)
+        if id(table) not in self.owned:
+            table = self.own(dict(table))
+            setattr(self, name, table)
+        return table
+    
+    def writable(self, container, key):
+        # container[key], swapped for a private shallow copy unless already owned;
+        # the container itself must be writable
+        value = container[key]
+        if id(value) not in self.owned:
+            value = container[key] = self.own(value.copy())
+        return value
+    
+    def writable_path(self, session_id, *keys):
+        # e.g. writable_path(session_id, 'exercises', exercise_id, 'sets'): only this path is copied
+        self[session_id]
+        node = self.writable(self.writable_table('loaded'), session_id)
+        for key in keys:
+            node = self.writable(node, key)
+        return node
+    
+    def writable_header(self, session_id):
+        return self.writable(self.writable_table('headers'), session_id)
+    
+    def freeze(self):
+        # O(1) snapshot: nothing reachable from the returned tables is changed afterwards
+        frozen = (self.loaded, self.headers, self.dirty, self.removed)
+        self.owned = set()
+        self.dirty, self.removed = set(), set()
+        return frozen
+    
+    def load_shard(self, session_id):
+        path = self.find_shard(session_id)
+        try:
+            if path is None:
+                raise FileNotFoundError(f"no shard for {session_id}")
+            session = read_snapshot(path)
+        except Exception as e:
+            print(f"Error loading session {session_id}: {e}")
+            if path is not None:
+                quarantine_file(path)
+            # Keep the header's identity so the session can still be opened and deleted
+            session = {key: self.headers[session_id][key]
+                       for key in ("id", "name", "date", "time", "workout_type", "status")}
+            session['exercises'] = {}
+            self.writable_table('headers')[session_id] = self.make_header(session)
+        
+        self.writable_table('loaded')[session_id] = session
+        if self.on_load:
+            self.on_load(session_id, session)
+        return session
+    
+    def __getitem__(self, session_id):
+        session = self.loaded.get(session_id)
+        if session is None:
+            if session_id not in self.headers:
+                raise KeyError(session_id)
+            session = self.load_shard(session_id)
+        return session
+    
+    def __setitem__(self, session_id, session):
+        self.writable_table('loaded')[session_id] = session
+        self.writable_table('headers')[session_id] = self.make_header(session)
+        self.dirty.add(session_id)
+        self.removed.discard(session_id)
+    
+    def __delitem__(self, session_id):
+        del self.writable_table('headers')[session_id]
+        self.writable_table('loaded').pop(session_id, None)
+        self.dirty.discard(session_id)
+        self.removed.add(session_id)
+        self.archived.discard(session_id)
+    
+    def __contains__(self, session_id):
+        return session_id in self.headers
+    
+    def __iter__(self):
+        return iter(self.headers)
+    
+    def __len__(self):
+        return len(self.headers)
+    
+    def peek(self, session_id):
+        # Read a session without keeping it resident, for passes over every shard
+        session = self.loaded.get(session_id)
+        if session is not None:
+            return session
+        path = self.find_shard(session_id)
+        try:
+            return read_snapshot(path)
+        except Exception:
+            # Let the regular load report and quarantine it
+            return self.load_shard(session_id)
+    
+    def put_cold(self, session_id, session):
+        # Write the shard right away and keep only its header (streaming imports)
+        SnapshotWriter.write_atomic(self.shard_path(session_id), self.codec.dumps(session))
+        self.writable_table('headers')[session_id] = self.make_header(session)
+        self.writable_table('loaded').pop(session_id, None)
+        self.dirty.discard(session_id)
+        self.removed.discard(session_id)
+        self.archived.discard(session_id)
+    
+    def refresh_header(self, session_id):
+        if session_id in self.loaded:
+            self.writable_table('headers')[session_id] = self.make_header(self.loaded[session_id])
+            self.dirty.add(session_id)
+
+class DatabaseManager(StorageBackend):
+    # Journal size after which it is folded into a fresh snapshot
+    JOURNAL_COMPACT_BYTES = 256 * 1024
+    # Window in which a burst of mutations is coalesced into one write
+    WRITE_DEBOUNCE_SECONDS = 0.5
+    SCHEMA_VERSION = 3
+    # Sessions older than this many days (or no longer active) move to the compressed archive
+    ARCHIVE_AFTER_DAYS = 30
+    
+    def __init__(self, data_file='fitness_data.json', snapshot_format=None, archive_after_days=None,
+                 archive_compression=None):
+        super().__init__()
+        # FITTRACKER_SNAPSHOT_FORMAT=binary opts in to the compact binary snapshots
+        snapshot_format = snapshot_format or os.environ.get('FITTRACKER_SNAPSHOT_FORMAT') or 'json'
+        self.codec = SNAPSHOT_CODECS[snapshot_format]
+        # FITTRACKER_ARCHIVE_AFTER_DAYS=-1 keeps every session hot
+        if archive_after_days is None:
+            archive_after_days = int(os.environ.get('FITTRACKER_ARCHIVE_AFTER_DAYS', self.ARCHIVE_AFTER_DAYS))
+        self.archive_after_days = archive_after_days
+        archive_compression = (archive_compression or os.environ.get('FITTRACKER_ARCHIVE_COMPRESSION')
+                               or ('zstd' if zstandard is not None else 'gzip'))
+        self.compressor = ARCHIVE_COMPRESSORS[archive_compression]
+        # Single-file layout of older builds, migrated on first start
+        self.legacy_file = data_file
+        self.legacy_journal_file = os.path.splitext(data_file)[0] + '.journal'
+        
+        # fitness_data/index.json holds stats and session headers, sessions/<id>.json one shard each
+        self.store_dir = os.path.splitext(data_file)[0]
+        self.index_base = os.path.join(self.store_dir, 'index')
+        self.index_file = self.index_base + self.codec.extension
+        self.shard_dir = os.path.join(self.store_dir, 'sessions')
+        self.archive_dir = os.path.join(self.store_dir, 'archive')
+        self.journal_file = os.path.join(self.store_dir, 'journal')
+        os.makedirs(self.shard_dir, exist_ok=True)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        
+        self._batched_records = []
+        self._inflight = (set(), set())
+        self.columns = SetColumns()
+        self.session_index = SessionDateIndex()
+        self.rollups = CalendarRollups()
+        self.history = ExerciseHistoryIndex()
+        self.records = PersonalRecords()
+        self._replayed = set()
+        # Set when the index on disk no longer describes the shards and must be rewritten at start
+        self.index_stale = False
+        # Picked once per start; the writer moves them with the next snapshot
+        self.pending_archive = set()
+        
+        migrating = find_snapshot(self.index_base, self.codec) is None and os.path.exists(self.legacy_file)
+        self.data = self.load_legacy_data() if migrating else self.load_data()
+        if self.data:
+            sessions = self.data['workout_sessions']
+            # Shards loaded from here on feed the columns as they are opened
+            self.columns.load_sessions(sessions.loaded)
+            sessions.on_load = lambda session_id, session: self.columns.load_sessions({session_id: session})
+            # Headers written before exercise names were cached: open those shards once
+            for session_id, header in sessions.headers.items():
+                if 'exercise_names' not in header:
+                    sessions.headers[session_id] = sessions.make_header(sessions.peek(session_id))
+                    self.index_stale = True
+            self.session_index.rebuild(sessions.headers)
+            self.rollups.rebuild(sessions.headers)
+            self.history.rebuild(sessions.headers, self.session_index)
+            self.load_records()
+            # One pass over the headers at load; afterwards counters are adjusted per mutation
+            self.update_stats()
+        
+        self.writer = SnapshotWriter(
+            self.journal_file, self.serialize_snapshot, debounce=self.WRITE_DEBOUNCE_SECONDS,
+            compact_bytes=self.JOURNAL_COMPACT_BYTES, on_error=self.snapshot_failed
+        )
+        self.writer.start()
+        
+        if self.data:
+            self.pending_archive = self.archive_candidates()
+        if self.data and (migrating or self.index_stale):
+            self.save_data()
+        elif self.pending_archive:
+            self.writer.request_snapshot()
+        if migrating and self.data:
+            for path in (self.legacy_file, self.legacy_journal_file, self.legacy_journal_file + '.old'):
+                if os.path.exists(path):
+                    os.replace(path, path + '.migrated')
+    
+    def create_tables(self):
+        if not self.data:
+            self.data = self.empty_data()
+            self.save_data()
+    
+    def empty_data(self, headers=None, archived=None):
+        return {
+            "app_stats": dict(DEFAULT_APP_STATS),
+            "workout_sessions": LazySessionMap(self.shard_dir, headers, codec=self.codec,
+                                               archive_dir=self.archive_dir, archived=archived),
+            "user_settings": dict(DEFAULT_USER_SETTINGS)
+        }
+    
+    def load_data(self):
+        data = {}
+        index_path = find_snapshot(self.index_base, self.codec)
+        try:
+            if index_path:
+                index = read_snapshot(index_path)
+                data = self.empty_data(index.get('sessions', {}), index.get('archived_sessions'))
+                data['app_stats'].update(index.get('app_stats', {}))
+                data['user_settings'].update(index.get('user_settings', {}))
+                data['personal_records'] = index.get('personal_records')
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            quarantine_file(index_path)
+            data = self.recover_index()
+        
+        return self.replay_journal(self.journal_file, data)
+    
+    def recover_index(self):
+        # The shards are the primary data; rebuild their headers one file at a time.
+        # Archived copies are read first so a hot shard left by an interrupted move wins.
+        headers, archived = {}, set()
+        for session_id, path, in_archive in iter_shard_files(self.shard_dir, self.archive_dir):
+            try:
+                session = read_snapshot(path)
+                headers[session_id] = LazySessionMap.make_header(session)
+                if in_archive:
+                    archived.add(session_id)
+                else:
+                    archived.discard(session_id)
+            except Exception as e:
+                print(f"Error loading session {session_id}: {e}")
+                quarantine_file(path)
+        if not headers:
+            return {}
+        
+        print(f"Rebuilt the index from {len(headers)} session files")
+        data = self.empty_data(headers, archived)
+        self.index_stale = True
+        return data
+    
+    def load_legacy_data(self):
+        # One streaming pass: each session is upgraded and written to its shard before the next
+        # is parsed, and an unreadable session is set aside instead of failing the whole file
+        data = self.empty_data()
+        sessions = data['workout_sessions']
+        found = False
+        try:
+            with open(self.legacy_file, 'r') as f:
+                for kind, key, value in iter_legacy_snapshot(f):
+                    found = True
+                    if kind == 'session':
+                        sessions.put_cold(key, value)
+                    elif kind == 'corrupt':
+                        quarantine_record(self.legacy_file, key, value)
+                    elif key in ('app_stats', 'user_settings') and isinstance(value, dict):
+                        data[key].update(value)
+        except Exception as e:
+            # Sessions read before the damage are kept
+            print(f"Error loading data: {e}")
+            quarantine_file(self.legacy_file)
+        
+        # Replay mutations logged since the last snapshot (a journal rotated by older builds first)
+        for path in (self.legacy_journal_file + '.old', self.legacy_journal_file):
+            data = self.replay_journal(path, data)
+        if not found and not sessions:
+            return {}
+        return data
+    
+    def replay_journal(self, path, data):
+        if not os.path.exists(path):
+            return data
+        
+        touched = set()
+        try:
+            with open(path, 'r') as f:
+                content = f.read()
+            
+            if not content.endswith('\n'):
+                # Cut a torn final line from a crash mid-append so new records start clean
+                content = content[:content.rfind('\n') + 1]
+                with open(path, 'w') as f:
+                    f.write(content)
+            
+            for line in content.splitlines():
+                try:
+                    record = json_loads(line)
+                except ValueError:
+                    print(f"Skipping unreadable journal record in {path}")
+                    continue
+                if not data:
+                    data = self.empty_data()
+                self.apply_journal_record(data, record)
+                touched.add(record.get('s'))
+                self._replayed.add(record.get('s'))
+            
+        except Exception as e:
+            print(f"Error replaying journal: {e}")
+        
+        # Replayed records bypass the cached header totals
+        sessions = data.get('workout_sessions')
+        if isinstance(sessions, LazySessionMap):
+            for session_id in touched:
+                sessions.refresh_header(session_id)
+        return data
+    
+    @staticmethod
+    def apply_journal_record(data, record):
+        # Records carry final values (not deltas), so replaying one twice is harmless
+        sessions = data.setdefault('workout_sessions', {})
+        op = record.get('op')
+        session = sessions.get(record.get('s'))
+        exercise = session['exercises'].get(record.get('e')) if session else None
+        
+        if op == 'session':
+            sessions[record['s']] = record['v']
+        elif op == 'del_session':
+            if record['s'] in sessions:
+                del sessions[record['s']]
+        elif op == 'exercise' and session:
+            session['exercises'][record['e']] = record['v']
+        elif op == 'del_exercise' and session:
+            session['exercises'].pop(record['e'], None)
+        elif op == 'set' and exercise:
+            exercise['sets'][record['id']] = record['v']
+        elif op == 'del_set' and exercise:
+            exercise['sets'].pop(record['id'], None)
+    
+    def append_journal(self, op, **fields):
+        # Serialized now: the record must capture the values as of this mutation
+        record = dict(op=op, **fields)
+        line = json_dumps(record) + '\n'
+        if self._transaction_depth:
+            self._batched_records.append(line)
+        else:
+            self.writer.append(line)
+    
+    def end_transaction(self, failed):
+        # Mutations applied before a failure stay in memory, so they are persisted too
+        lines, self._batched_records = self._batched_records, []
+        if lines:
+            self.writer.append(*lines)
+    
+    def serialize_snapshot(self):
+        # Called from the writer thread. Only the O(1) freeze runs under the lock: mutations copy
+        # whatever they change from then on, so encoding proceeds while the UI keeps writing.
+        # Only sessions changed since the last snapshot are rewritten, the index goes last.
+        with self.lock:
+            sessions = self.data['workout_sessions']
+            loaded, headers, dirty, removed = sessions.freeze()
+            # Sessions due for the archive are moved now (changed ones straight from memory);
+            # any other changed session is hot again
+            archiving = {session_id for session_id in self.pending_archive if session_id in headers}
+            unarchived = (dirty & sessions.archived) - archiving
+            self.pending_archive = set()
+            sessions.archived = (sessions.archived - dirty) | archiving
+            index = {
+                "schema_version": self.SCHEMA_VERSION,
+                "app_stats": dict(self.data['app_stats']),
+                "user_settings": dict(self.data['user_settings']),
+                "sessions": headers,
+                "archived_sessions": sorted(sessions.archived),
+                "personal_records": self.records.snapshot()
+            }
+            self._inflight = (dirty, removed)
+        
+        files = [
+            (sessions.shard_path(session_id), self.codec.dumps(loaded[session_id]))
+            for session_id in dirty - archiving if session_id in loaded
+        ]
+        files.append((self.index_file, self.codec.dumps(index)))
+        # Drop copies left in another format after switching snapshot_format
+        files.extend(
+            (path, None) for written, _ in list(files)
+            for path in snapshot_variants(os.path.splitext(written)[0]) if path != written
+        )
+        # The compressed copy is written before the hot shard goes; reading falls back to either
+        files.extend(self.archive_files(sessions, loaded, archiving))
+        files.extend(
+            (path, None) for session_id in removed
+            for path in snapshot_variants(sessions.shard_base(session_id)) + archive_variants(sessions.archive_base(session_id))
+        )
+        files.extend(
+            (path, None) for session_id in unarchived
+            for path in archive_variants(sessions.archive_base(session_id))
+        )
+        return files
+    
+    def archive_candidates(self):
+        # One pass over the headers at start; the moves happen off the UI thread
+        if self.archive_after_days < 0:
+            return set()
+        sessions = self.data['workout_sessions']
+        cutoff = (datetime.now() - timedelta(days=self.archive_after_days)).strftime("%Y-%m-%d")
+        return {
+            session_id for session_id, header in sessions.headers.items()
+            if session_id not in sessions.archived and (header['date'] < cutoff or header['status'] != 'active')
+        }
+    
+    def archive_files(self, sessions, loaded, session_ids):
+        files = []
+        for session_id in session_ids:
+            path = find_snapshot(sessions.shard_base(session_id), self.codec)
+            try:
+                if session_id in loaded:
+                    payload = self.codec.dumps(loaded[session_id])
+                    path = path or sessions.shard_path(session_id)
+                else:
+                    with open(path, 'rb') as f:
+                        payload = f.read()
+                    decode_snapshot(payload)
+            except Exception as e:
+                # Stays where it is; the archived flag only changes which place is tried first
+                print(f"Error archiving session {session_id}: {e}")
+                continue
+            archive_path = os.path.join(sessions.archive_dir, os.path.basename(path)) + self.compressor.extension
+            files.append((archive_path, self.compressor.compress(payload)))
+            files.extend((variant, None) for variant in archive_variants(sessions.archive_base(session_id))
+                         if variant != archive_path)
+            files.extend((variant, None) for variant in snapshot_variants(sessions.shard_base(session_id)))
+        return files
+    
+    def snapshot_failed(self):
+        # Journal is kept on failure; make sure the next snapshot retries these shards
+        with self.lock:
+            sessions = self.data['workout_sessions']
+            dirty, removed = self._inflight
+            sessions.dirty |= {session_id for session_id in dirty if session_id in sessions}
+            sessions.removed |= {session_id for session_id in removed if session_id not in sessions}
+    
+    def save_data(self):
+        self.writer.request_snapshot()
+        self.flush()
+    
+    def export_json(self, path):
+        # Human-readable single-file copy in the original layout (opens every shard)
+        with self.lock:
+            export = {
+                "schema_version": SESSION_SCHEMA_VERSION,
+                "app_stats": self.get_app_stats(),
+                "workout_sessions": dict(self.get_workout_sessions().items()),
+                "user_settings": self.get_user_settings()
+            }
+            payload = json.dumps(export, indent=2)
+        SnapshotWriter.write_atomic(path, payload)
+    
+    def flush(self):
+        self.writer.flush()
+    
+    def close(self):
+        self.writer.stop()
+    
+    def get_app_stats(self):
+        return self.data.get('app_stats', dict(DEFAULT_APP_STATS))
+    
+    def stats_store(self):
+        return self.data.setdefault('app_stats', dict(DEFAULT_APP_STATS))
+    
+    def get_user_settings(self):
+        return self.data.get('user_settings', dict(DEFAULT_USER_SETTINGS))
+    
+    def get_workout_sessions(self):
+        return self.data.get('workout_sessions', {})
+    
+    def get_session_headers(self):
+        sessions = self.data.get('workout_sessions')
+        return sessions.headers if sessions is not None else {}
+    
+    def recent_sessions(self, n=None):
+        headers = self.get_session_headers()
+        return [(session_id, headers[session_id]) for session_id in self.session_index.recent(n)]
+    
+    def sessions_between(self, start, end):
+        headers = self.get_session_headers()
+        return [(session_id, headers[session_id]) for session_id in self.session_index.between(start, end)]
+    
+    def touch_session(self, session_id, exercises=0, sets=0, volume=0.0):
+        # Keep the cached header totals in step and schedule the shard for the next snapshot
+        sessions = self.data['workout_sessions']
+        header = sessions.writable_header(session_id)
+        header['exercise_count'] += exercises
+        header['set_count'] += sets
+        header['total_volume'] += volume
+        sessions.dirty.add(session_id)
+        if sets or volume:
+            self.rollups.adjust(header['date'], sets, volume)
+    
+    def load_records(self):
+        # The persisted table predates any replayed journal records, so names those touched are redone
+        sessions = self.data['workout_sessions']
+        table = self.data.pop('personal_records', None)
+        if table is None:
+            # Store written before records were kept: one pass over every shard
+            names = list(self.history.entries)
+        else:
+            self.records.table = table
+            # Tables written before previous_ref was kept are redone once as well
+            names = {norm for norm, records in table.items()
+                     if any(record['ref'][0] in self._replayed or 'previous_ref' not in record
+                            for record in self.records.holders(records))}
+            names.update(
+                normalize_exercise_name(name) for session_id in self._replayed if session_id in sessions
+                for name in sessions.headers[session_id]['exercise_names'].values()
+            )
+        for name in names:
+            self.rebuild_records(name)
+        self._replayed = set()
+    
+    def rebuild_records(self, name):
+        # Only when a delete or edit hit the holder of a record; opens the shards of that exercise's history
+        sessions = self.data['workout_sessions']
+        sets = (
+            ([session_id, exercise_id, set_id], set_data)
+            for _, session_id, exercise_id in reversed(list(self.history.history(name)))
+            for set_id, set_data in sorted(
+                sessions.peek(session_id)['exercises'].get(exercise_id, {}).get('sets', {}).items(),
+                key=lambda item: item[1]['set_number'])
+        )
+        self.records.rebuild(name, sets)
+    
+    def get_personal_records(self, exercise_name):
+        return self.records.get(exercise_name)
+    
+    def get_set_records(self, session_id, exercise_id, set_id):
+        exercise = self.get_workout_session(session_id).get('exercises', {}).get(exercise_id)
+        if not exercise:
+            return []
+        return self.records.broken_by(exercise['name'], [session_id, exercise_id, set_id])
+    
+    def get_week_rollup(self, date=None):
+        return self.rollups.week(date or datetime.now().strftime("%Y-%m-%d"))
+    
+    def get_month_rollup(self, date=None):
+        return self.rollups.month(date or datetime.now().strftime("%Y-%m-%d"))
+    
+    @synchronized
+    def create_workout_session(self, name, workout_type="Custom", date=None, time=None):
+        session_id = f"session_{str(uuid.uuid4())[:8]}"
+        current_date = date or datetime.now().strftime("%Y-%m-%d")
+        current_time = time or datetime.now().strftime("%H:%M")
+        
+        session_data = {
+            "id": session_id, "name": name, "date": current_date, "time": current_time,
+            "workout_type": workout_type, "exercises": {}, "status": "active"
+        }
+        
+        self.data['workout_sessions'][session_id] = session_data
+        self.session_index.add(session_id, current_date, current_time)
+        self.rollups.add_session(current_date)
+        self.adjust_stats(sessions=1)
+        self.append_journal('session', s=session_id, v=session_data)
+        self.emit(SessionAdded(session_id))
+        return session_id
+    
+    @synchronized
+    def delete_workout_session(self, session_id):
+        sessions = self.data['workout_sessions']
+        if session_id in sessions:
+            # Opened for the undo stack; the header still has the totals
+            session = sessions[session_id]
+            header = sessions.headers[session_id]
+            self.columns.remove_session(session_id, session)
+            del sessions[session_id]
+            self.history.remove_session(session_id, header['exercise_names'])
+            for name in set(header['exercise_names'].values()):
+                if self.records.touches(name, session_id):
+                    self.rebuild_records(name)
+            self.session_index.remove(session_id)
+            self.rollups.remove_session(header['date'], header['set_count'], header['total_volume'])
+            self.adjust_stats(
+                exercises=-header['exercise_count'], sessions=-1, volume=-header['total_volume']
+            )
+            self.append_journal('del_session', s=session_id)
+            self.push_undo('session', session)
+            self.emit(SessionRemoved(session_id))
+            return True
+        return False
+    
+    @synchronized
+    def get_workout_session(self, session_id):
+        return self.data['workout_sessions'].get(session_id, {})
+    
+    @synchronized
+    def add_exercise(self, session_id, exercise_name, muscle_group="General"):
+        if session_id not in self.data['workout_sessions']:
+            return None
+        
+        exercise_id = f"exercise_{str(uuid.uuid4())[:8]}"
+        exercise_data = {
+            "id": exercise_id, "name": exercise_name, "muscle_group": muscle_group,
+            "sets": {}, "created_at": datetime.now().strftime("%H:%M")
+        }
+        
+        sessions = self.data['workout_sessions']
+        sessions.writable_path(session_id, 'exercises')[exercise_id] = exercise_data
+        self.columns.register_exercise(session_id, exercise_id)
+        self.touch_session(session_id, exercises=1)
+        sessions.writable(sessions.writable_header(session_id), 'exercise_names')[exercise_id] = exercise_name
+        self.history.add(exercise_name, self.session_index.key_of[session_id], exercise_id)
+        self.adjust_stats(exercises=1)
+        self.append_journal('exercise', s=session_id, e=exercise_id, v=exercise_data)
+        self.emit(ExerciseAdded(session_id, exercise_id, 0, 0.0))
+        return exercise_id
+    
+    @synchronized
+    def delete_exercise(self, session_id, exercise_id):
+        if (session_id in self.data['workout_sessions'] and 
+            exercise_id in self.data['workout_sessions'][session_id]['exercises']):
+            sessions = self.data['workout_sessions']
+            exercise = sessions.writable_path(session_id, 'exercises').pop(exercise_id)
+            self.columns.remove_exercise(session_id, exercise_id, exercise)
+            volume = self.exercise_volume(exercise)
+            self.touch_session(session_id, exercises=-1, sets=-len(exercise['sets']), volume=-volume)
+            sessions.writable(sessions.writable_header(session_id), 'exercise_names').pop(exercise_id, None)
+            self.history.remove(session_id, exercise_id)
+            if self.records.touches(exercise['name'], session_id, exercise_id):
+                self.rebuild_records(exercise['name'])
+            self.adjust_stats(exercises=-1, volume=-volume)
+            self.append_journal('del_exercise', s=session_id, e=exercise_id)
+            self.push_undo('exercise', session_id, exercise_id, exercise)
+            self.emit(ExerciseRemoved(session_id, exercise_id, -len(exercise['sets']), -volume))
+            return True
+        return False
+    
+    @synchronized
+    def add_set(self, session_id, exercise_id, weight, reps, set_number=None):
+        if (session_id not in self.data['workout_sessions'] or 
+            exercise_id not in self.data['workout_sessions'][session_id]['exercises']):
+            return None
+        
+        sets = self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets']
+        if set_number is None:
+            # Numbered after the highest set, not the count: after a delete the count names a set that still exists
+            set_number = max((set_data['set_number'] for set_data in sets.values()), default=0) + 1
+        elif f"set_{set_number}" in sets or any(set_data['set_number'] == set_number for set_data in sets.values()):
+            return None
+        set_id = f"set_{set_number}"
+        sets = self.data['workout_sessions'].writable_path(session_id, 'exercises', exercise_id, 'sets')
+        
+        volume = float(weight) * int(reps)
+        set_data = {
+            "set_number": set_number, "weight": float(weight), "reps": int(reps),
+            "volume": volume, "created_at": datetime.now().strftime("%H:%M")
+        }
+        
+        sets[set_id] = set_data
+        self.columns.put(session_id, exercise_id, set_id, set_data)
+        self.touch_session(session_id, sets=1, volume=volume)
+        self.adjust_stats(volume=volume)
+        self.update_records(session_id, exercise_id, set_id, set_data, False)
+        self.append_journal('set', s=session_id, e=exercise_id, id=set_id, v=set_data)
+        self.emit(SetChanged(session_id, exercise_id, set_id, set_data, 1, volume))
+        return set_id
+    
+    @synchronized
+    def update_set(self, session_id, exercise_id, set_id, weight=None, reps=None):
+        if (session_id in self.data['workout_sessions'] and 
+            exercise_id in self.data['workout_sessions'][session_id]['exercises'] and
+            set_id in self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets']):
+            
+            set_data = self.data['workout_sessions'].writable_path(session_id, 'exercises', exercise_id, 'sets', set_id)
+            old_volume = set_data['volume']
+            
+            if weight is not None:
+                set_data['weight'] = float(weight)
+            if reps is not None:
+                set_data['reps'] = int(reps)
+            
+            set_data['volume'] = set_data['weight'] * set_data['reps']
+            self.columns.put(session_id, exercise_id, set_id, set_data)
+            self.touch_session(session_id, volume=set_data['volume'] - old_volume)
+            self.adjust_stats(volume=set_data['volume'] - old_volume)
+            self.update_records(session_id, exercise_id, set_id, set_data, True)
+            self.append_journal('set', s=session_id, e=exercise_id, id=set_id, v=set_data)
+            self.emit(SetChanged(session_id, exercise_id, set_id, set_data, 0, set_data['volume'] - old_volume))
+            return True
+        return False
+    
+    @synchronized
+    def delete_set(self, session_id, exercise_id, set_id):
+        if (session_id in self.data['workout_sessions'] and 
+            exercise_id in self.data['workout_sessions'][session_id]['exercises'] and
+            set_id in self.data['workout_sessions'][session_id]['exercises'][exercise_id]['sets']):
+            sets = self.data['workout_sessions'].writable_path(session_id, 'exercises', exercise_id, 'sets')
+            set_data = sets.pop(set_id)
+            self.columns.remove(session_id, exercise_id, set_id)
+            self.touch_session(session_id, sets=-1, volume=-set_data['volume'])
+            self.adjust_stats(volume=-set_data['volume'])
+            name = self.data['workout_sessions'][session_id]['exercises'][exercise_id]['name']
+            if self.records.touches(name, session_id, exercise_id, set_id):
+                self.rebuild_records(name)
+            self.append_journal('del_set', s=session_id, e=exercise_id, id=set_id)
+            self.push_undo('set', session_id, exercise_id, set_id, set_data)
+            self.emit(SetChanged(session_id, exercise_id, set_id, None, -1, -set_data['volume']))
+            return True
+        return False
+    
+    @synchronized
+    def restore_session(self, session):
+        sessions = self.data['workout_sessions']
+        session_id = session['id']
+        if session_id in sessions:
+            return False
+        # The deleted dicts go back as they are; copy-on-write keeps them unshared from here on
+        sessions[session_id] = session
+        header = sessions.headers[session_id]
+        self.columns.load_sessions({session_id: session})
+        self.session_index.add(session_id, session['date'], session['time'])
+        self.rollups.add_session(session['date'], header['set_count'], header['total_volume'])
+        for exercise_id, name in header['exercise_names'].items():
+            self.history.add(name, self.session_index.key_of[session_id], exercise_id)
+        for name in set(header['exercise_names'].values()):
+            self.rebuild_records(name)
+        self.adjust_stats(exercises=header['exercise_count'], sessions=1, volume=header['total_volume'])
+        self.append_journal('session', s=session_id, v=session)
+        self.emit(SessionAdded(session_id))
+        return True
+    
+    @synchronized
+    def restore_exercise(self, session_id, exercise_id, exercise):
+        sessions = self.data['workout_sessions']
+        if session_id not in sessions or exercise_id in sessions[session_id]['exercises']:
+            return False
+        sessions.writable_path(session_id, 'exercises')[exercise_id] = exercise
+        self.columns.register_exercise(session_id, exercise_id)
+        for set_id, set_data in exercise['sets'].items():
+            self.columns.put(session_id, exercise_id, set_id, set_data)
+        volume = self.exercise_volume(exercise)
+        self.touch_session(session_id, exercises=1, sets=len(exercise['sets']), volume=volume)
+        sessions.writable(sessions.writable_header(session_id), 'exercise_names')[exercise_id] = exercise['name']
+        self.history.add(exercise['name'], self.session_index.key_of[session_id], exercise_id)
+        if exercise['sets']:
+            self.rebuild_records(exercise['name'])
+        self.adjust_stats(exercises=1, volume=volume)
+        self.append_journal('exercise', s=session_id, e=exercise_id, v=exercise)
+        self.emit(ExerciseAdded(session_id, exercise_id, len(exercise['sets']), volume))
+        return True
+    
+    @synchronized
+    def restore_set(self, session_id, exercise_id, set_id, set_data):
+        sessions = self.data['workout_sessions']
+        if (session_id not in sessions or exercise_id not in sessions[session_id]['exercises'] or
+            set_id in sessions[session_id]['exercises'][exercise_id]['sets']):
+            return False
+        sessions.writable_path(session_id, 'exercises', exercise_id, 'sets')[set_id] = set_data
+        self.columns.put(session_id, exercise_id, set_id, set_data)
+        self.touch_session(session_id, sets=1, volume=set_data['volume'])
+        self.adjust_stats(volume=set_data['volume'])
+        # Rebuilt rather than offered, so "previous" is what it was before the delete
+        self.rebuild_records(sessions[session_id]['exercises'][exercise_id]['name'])
+        self.append_journal('set', s=session_id, e=exercise_id, id=set_id, v=set_data)
+        self.emit(SetChanged(session_id, exercise_id, set_id, set_data, 1, set_data['volume']))
+        return True
+    
+    def get_exercise_names(self):
+        # Straight from the name index and cached headers; muscle groups would need the shards
+        headers = self.get_session_headers()
+        names = []
+        for keys in self.history.entries.values():
+            latest = keys[-1]
+            names.append((headers[latest[3]]['exercise_names'][latest[4]], None, len(keys)))
+        return names
+    
+    @synchronized
+    def scan_session(self, session_id):
+        sessions = self.data['workout_sessions']
+        return sessions.peek(session_id) if session_id in sessions else {}
+    
+    @synchronized
+    def release_sessions(self, session_ids):
+        # Meant to follow save_data(): sessions still dirty are kept until a snapshot has them
+        sessions = self.data['workout_sessions']
+        for session_id in session_ids:
+            if session_id in sessions.loaded and session_id not in sessions.dirty:
+                self.columns.remove_session(session_id, sessions.writable_table('loaded').pop(session_id))
+    
+    def history_entry(self, date, session_id, exercise_id):
+        # A quarantined shard comes back without its exercises
+        exercise = self.data['workout_sessions'].peek(session_id)['exercises'].get(exercise_id, {})
+        sets = sorted(exercise.get('sets', {}).items(), key=lambda item: item[1]['set_number'])
+        return {"session_id": session_id, "exercise_id": exercise_id, "date": date, "sets": sets}
+    
+    @synchronized
+    def get_exercise_history(self, exercise_name, limit=None):
+        # Only the shards of the returned entries are opened
+        refs = self.history.history(exercise_name)
+        if limit is not None:
+            refs = itertools.islice(refs, limit)
+        return [self.history_entry(*ref) for ref in refs]
+    
+    @synchronized
+    def get_previous_performance(self, session_id, exercise_id):
+        for ref in self.history.before(session_id, exercise_id):
+            entry = self.history_entry(*ref)
+            if entry['sets']:
+                return entry
+        return None
+    
+    @synchronized
+    def get_exercise_muscle_group(self, exercise_name):
+        # Autocomplete lookup: read the shard of the latest logging without keeping it resident
+        for _, session_id, exercise_id in self.history.history(exercise_name):
+            exercise = self.data['workout_sessions'].peek(session_id)['exercises'].get(exercise_id)
+            return exercise.get('muscle_group') if exercise else None
+        return None
+    
+    def update_records(self, session_id, exercise_id, set_id, set_data, overwrote):
+        name = self.data['workout_sessions'][session_id]['exercises'][exercise_id]['name']
+        ref = [session_id, exercise_id, set_id]
+        if overwrote and self.records.touches(name, *ref):
+            # The old values of this set may have been the record, or the best it beat
+            self.rebuild_records(name)
+        elif self.records.offer(name, ref, set_data, lambda other: self.set_precedes(ref, other)) is None:
+            self.rebuild_records(name)
+    
+    def set_precedes(self, ref, other):
+        # Whether set ref comes before set other in the order rebuild_records replays them
+        if ref[:2] == other[:2]:
+            sets = self.data['workout_sessions'][ref[0]]['exercises'][ref[1]]['sets']
+            return other[2] in sets and sets[ref[2]]['set_number'] < sets[other[2]]['set_number']
+        key, other_key = self.history.key_of.get(tuple(ref[:2])), self.history.key_of.get(tuple(other[:2]))
+        return key is not None and other_key is not None and key[1] < other_key[1]
+    
+    def get_session_totals(self, session_id):
+        header = self.get_session_headers().get(session_id)
+        if not header:
+            return {"exercises": 0, "sets": 0, "volume": 0.0}
+        return {"exercises": header['exercise_count'], "sets": header['set_count'], "volume": header['total_volume']}
+    
+    @synchronized
+    def get_exercise_totals(self, session_id, exercise_id):
+        # The columns only cover opened shards
+        sessions = self.data.get('workout_sessions')
+        if sessions is not None and session_id in sessions and not sessions.is_loaded(session_id):
+            sessions[session_id]
+        sets, volume = self.columns.exercise_totals(session_id, exercise_id)
+        return {"sets": sets, "volume": volume}
+    
+    def compute_stats(self):
+        # Header totals cover unopened shards as well
+        headers = self.get_session_headers()
+        total_exercises = sum(header['exercise_count'] for header in headers.values())
+        total_volume = sum(header['total_volume'] for header in headers.values())
+        return total_exercises, len(headers), total_volume
+    
+    def recount_stats(self):
+        # Walks every session (opening all shards) rather than the cached totals, so it
+        # also catches header drift
+        total_exercises = 0
+        total_sessions = len(self.data['workout_sessions'])
+        total_volume = 0.0
+        
+        for session in self.data['workout_sessions'].values():
+            total_exercises += len(session['exercises'])
+            for exercise in session['exercises'].values():
+                for set_data in exercise['sets'].values():
+                    total_volume += set_data['volume']
+        
+        return total_exercises, total_sessions, total_volume
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL DEFAULT '00:00',
+    workout_type TEXT NOT NULL DEFAULT 'Custom',
+    status TEXT NOT NULL DEFAULT 'active'
+);
+CREATE TABLE IF NOT EXISTS exercises (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    muscle_group TEXT NOT NULL DEFAULT 'General',
+    created_at TEXT,
+    name_key TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (session_id, id)
+);
+CREATE TABLE IF NOT EXISTS sets (
+    session_id TEXT NOT NULL,
+    exercise_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    set_number INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    reps INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (session_id, exercise_id, id),
+    FOREIGN KEY (session_id, exercise_id) REFERENCES exercises(session_id, id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS personal_records (
+    name_key TEXT PRIMARY KEY,
+    records TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date, time);
+CREATE INDEX IF NOT EXISTS idx_sessions_type ON sessions(workout_type);
+CREATE INDEX IF NOT EXISTS idx_exercises_name ON exercises(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_exercises_muscle ON exercises(muscle_group);
+"""
+
+# Applied after SQLITE_SCHEMA; databases created before name_key existed get the column here
+SQLITE_UPGRADES = """
+CREATE INDEX IF NOT EXISTS idx_exercises_name_key ON exercises(name_key);
+"""
+
+class SQLiteSessionMap(Mapping):
+    # Read-only view over the sessions table; a session is only assembled when accessed
+    def __init__(self, manager):
+        self.manager = manager
+    
+    def __getitem__(self, session_id):
+        session = self.manager.get_workout_session(session_id)
+        if not session:
+            raise KeyError(session_id)
+        return session
+    
+    def __iter__(self):
+        rows = self.manager.conn.execute("SELECT id FROM sessions ORDER BY date DESC, time DESC")
+        return (row[0] for row in rows.fetchall())
+    
+    def __len__(self):
+        return self.manager.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
+    def __contains__(self, session_id):
+        row = self.manager.conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row is not None
+
+class SQLiteDatabaseManager(StorageBackend):
+    ROLLS_BACK_FAILED_TRANSACTIONS = True
+    
+    def __init__(self, db_file='fitness_data.db'):
+        super().__init__()
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        self.upgrade_schema()
+        self._stats = dict(DEFAULT_APP_STATS)
+        self.update_stats()
+        # personal_records rows, kept in memory and adjusted per mutation like the JSON store's table
+        self.records = PersonalRecords()
+        self.load_records()
+    
+    def upgrade_schema(self):
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(exercises)")}
+        with self.write():
+            if 'name_key' not in columns:
+                self.conn.execute("ALTER TABLE exercises ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+                rows = self.conn.execute("SELECT session_id, id, name FROM exercises").fetchall()
+                self.conn.executemany(
+                    "UPDATE exercises SET name_key = ? WHERE session_id = ? AND id = ?",
+                    ((normalize_exercise_name(row['name']), row['session_id'], row['id']) for row in rows)
+                )
+        self.conn.executescript(SQLITE_UPGRADES)
+    
+    @contextlib.contextmanager
+    def write(self):
+        # Commit per statement group, unless an outer transaction() commits for us
+        try:
+            yield self.conn
+        except Exception:
+            if not self._transaction_depth:
+                self.conn.rollback()
+                self.load_records()
+            raise
+        else:
+            if not self._transaction_depth:
+                self.conn.commit()
+    
+    def end_transaction(self, failed):
+        if failed:
+            self.conn.rollback()
+            # The counters and records already saw the rolled-back changes
+            self.update_stats()
+            self.load_records()
+        else:
+            self.conn.commit()
+    
+    def create_tables(self):
+        with self.write():
+            for key, value in DEFAULT_USER_SETTINGS.items():
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value))
+                )
+    
+    def get_app_stats(self):
+        return self._stats
+    
+    def stats_store(self):
+        return self._stats
+    
+    def get_user_settings(self):
+        rows = self.conn.execute("SELECT key, value FROM settings").fetchall()
+        return {row['key']: json.loads(row['value']) for row in rows} or dict(DEFAULT_USER_SETTINGS)
+    
+    def get_workout_sessions(self):
+        return SQLiteSessionMap(self)
+    
+    def select_headers(self, clause="", params=()):
+        rows = self.conn.execute(
+            "SELECT s.id, s.name, s.date, s.time, s.workout_type, s.status, "
+            "(SELECT COUNT(*) FROM exercises e WHERE e.session_id = s.id) AS exercise_count, "
+            "(SELECT COUNT(*) FROM sets t WHERE t.session_id = s.id) AS set_count, "
+            "(SELECT COALESCE(SUM(volume), 0.0) FROM sets t WHERE t.session_id = s.id) AS total_volume "
+            "FROM sessions s " + clause, params
+        )
+        return [(row['id'], dict(row)) for row in rows]
+    
+    def get_session_headers(self):
+        return dict(self.select_headers())
+    
+    def get_session_header(self, session_id):
+        rows = self.select_headers("WHERE s.id = ?", (session_id,))
+        return rows[0][1] if rows else None
+    
+    def recent_sessions(self, n=None):
+        # Served by idx_sessions_date; rowid keeps ties in insertion order
+        return self.select_headers("ORDER BY s.date DESC, s.time DESC, s.rowid DESC LIMIT ?",
+                                   (-1 if n is None else n,))
+    
+    def rollup_between(self, start, end):
+        row = self.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT s.date), "
+            "(SELECT COUNT(*) FROM sets t JOIN sessions x ON x.id = t.session_id WHERE x.date BETWEEN ? AND ?), "
+            "(SELECT COALESCE(SUM(t.volume), 0.0) FROM sets t JOIN sessions x ON x.id = t.session_id "
+            "WHERE x.date BETWEEN ? AND ?) "
+            "FROM sessions s WHERE s.date BETWEEN ? AND ?", (start, end) * 3
+        ).fetchone()
+        return {"sessions": row[0], "sets": row[2], "volume": row[3], "training_days": row[1]}
+    
+    def get_week_rollup(self, date=None):
+        day = datetime.strptime(date, "%Y-%m-%d") if date else datetime.now()
+        monday = day - timedelta(days=day.weekday())
+        return self.rollup_between(monday.strftime("%Y-%m-%d"), (monday + timedelta(days=6)).strftime("%Y-%m-%d"))
+    
+    def get_month_rollup(self, date=None):
+        month = (date or datetime.now().strftime("%Y-%m-%d"))[:7]
+        return self.rollup_between(f"{month}-01", f"{month}-31")
+    
+    def sessions_between(self, start, end):
+        return self.select_headers("WHERE s.date BETWEEN ? AND ? ORDER BY s.date, s.time, s.rowid", (start, end))
+    
+    def get_workout_session(self, session_id):
+        row = self.conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return {}
+        
+        session = dict(row)
+        session['exercises'] = {}
+        for ex_row in self.conn.execute(
+                "SELECT id, name, muscle_group, created_at FROM exercises WHERE session_id = ? ORDER BY rowid",
+                (session_id,)):
+            exercise = dict(ex_row)
+            exercise['sets'] = {}
+            session['exercises'][exercise['id']] = exercise
+        
+        for set_row in self.conn.execute(
+                "SELECT exercise_id, id, set_number, weight, reps, volume, created_at FROM sets "
+                "WHERE session_id = ? ORDER BY set_number", (session_id,)):
+            exercise = session['exercises'].get(set_row['exercise_id'])
+            if exercise is not None:
+                exercise['sets'][set_row['id']] = {
+                    "set_number": set_row['set_number'], "weight": set_row['weight'], "reps": set_row['reps'],
+                    "volume": set_row['volume'], "created_at": set_row['created_at']
+                }
+        return session
+    
+    def history_entries(self, rows):
+        entries = []
+        for row in rows:
+            sets = [
+                (set_row['id'], {"set_number": set_row['set_number'], "weight": set_row['weight'],
+                                 "reps": set_row['reps'], "volume": set_row['volume'],
+                                 "created_at": set_row['created_at']})
+                for set_row in self.conn.execute(
+                    "SELECT id, set_number, weight, reps, volume, created_at FROM sets "
+                    "WHERE session_id = ? AND exercise_id = ? ORDER BY set_number", (row[0], row[1]))
+            ]
+            entries.append({"session_id": row[0], "exercise_id": row[1], "date": row[2], "sets": sets})
+        return entries
+    
+    def get_exercise_history(self, exercise_name, limit=None):
+        # Served by idx_exercises_name_key
+        rows = self.conn.execute(
+            "SELECT e.session_id, e.id, s.date FROM exercises e JOIN sessions s ON s.id = e.session_id "
+            "WHERE e.name_key = ? ORDER BY s.date DESC, s.time DESC, s.rowid DESC, e.rowid DESC LIMIT ?",
+            (normalize_exercise_name(exercise_name), -1 if limit is None else limit)
+        ).fetchall()
+        return self.history_entries(rows)
+    
+    def get_exercise_muscle_group(self, exercise_name):
+        row = self.conn.execute(
+            "SELECT e.muscle_group FROM exercises e JOIN sessions s ON s.id = e.session_id "
+            "WHERE e.name_key = ? ORDER BY s.date DESC, s.time DESC, s.rowid DESC, e.rowid DESC LIMIT 1",
+            (normalize_exercise_name(exercise_name),)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def get_previous_performance(self, session_id, exercise_id):
+        rows = self.conn.execute(
+            "SELECT e.session_id, e.id, s.date FROM exercises cur "
+            "JOIN sessions cs ON cs.id = cur.session_id "
+            "JOIN exercises e ON e.name_key = cur.name_key "
+            "JOIN sessions s ON s.id = e.session_id "
+            "WHERE cur.session_id = ? AND cur.id = ? AND e.session_id != cur.session_id "
+            "AND (s.date, s.time, s.rowid) < (cs.date, cs.time, cs.rowid) "
+            "AND EXISTS (SELECT 1 FROM sets t WHERE t.session_id = e.session_id AND t.exercise_id = e.id) "
+            "ORDER BY s.date DESC, s.time DESC, s.rowid DESC, e.rowid DESC LIMIT 1",
+            (session_id, exercise_id)
+        ).fetchall()
+        entries = self.history_entries(rows)
+        return entries[0] if entries else None
+    
+    def get_exercise_names(self):
+        # Bare columns come from the MAX(rowid) row, i.e. the latest logging of each name
+        rows = self.conn.execute(
+            "SELECT name, muscle_group, COUNT(*), MAX(rowid) FROM exercises GROUP BY name_key"
+        ).fetchall()
+        return [(row[0], row[1], row[2]) for row in rows]
+    
+    def load_records(self):
+        self.records.table = {
+            row['name_key']: json.loads(row['records'])
+            for row in self.conn.execute("SELECT name_key, records FROM personal_records")
+        }
+        # Databases written before the table existed (or migrated from JSON) fill it once
+        rows = self.conn.execute(
+            "SELECT DISTINCT e.name_key FROM exercises e JOIN sets t ON t.session_id = e.session_id "
+            "AND t.exercise_id = e.id WHERE e.name_key NOT IN (SELECT name_key FROM personal_records)"
+        ).fetchall()
+        if rows:
+            with self.write():
+                for row in rows:
+                    self.rebuild_records(row[0])
+    
+    def rebuild_records(self, name_key):
+        # Only when a delete or edit hit a record, or an earlier set tied or beat one; reads the
+        # exercise's sets in order through idx_exercises_name_key
+        rows = self.conn.execute(
+            "SELECT t.session_id, t.exercise_id, t.id, t.weight, t.reps, t.volume FROM sets t "
+            "JOIN exercises e ON e.session_id = t.session_id AND e.id = t.exercise_id "
+            "JOIN sessions s ON s.id = t.session_id WHERE e.name_key = ? "
+            "ORDER BY s.date, s.time, s.rowid, e.rowid, t.set_number", (name_key,)
+        )
+        self.records.rebuild(name_key, (([row[0], row[1], row[2]], dict(row)) for row in rows))
+        self.save_records(name_key)
+    
+    def save_records(self, name_key):
+        records = self.records.table.get(name_key)
+        if records:
+            self.conn.execute("INSERT OR REPLACE INTO personal_records (name_key, records) VALUES (?, ?)",
+                              (name_key, json.dumps(records)))
+        else:
+            self.records.table.pop(name_key, None)
+            self.conn.execute("DELETE FROM personal_records WHERE name_key = ?", (name_key,))
+    
+    def set_order(self, ref):
+        # Position of a set in the order rebuild_records replays them
+        row = self.conn.execute(
+            "SELECT s.date, s.time, s.rowid, e.rowid, t.set_number FROM sets t "
+            "JOIN exercises e ON e.session_id = t.session_id AND e.id = t.exercise_id "
+            "JOIN sessions s ON s.id = t.session_id WHERE t.session_id = ? AND t.exercise_id = ? AND t.id = ?",
+            tuple(ref)
+        ).fetchone()
+        return tuple(row) if row else None
+    
+    def update_records(self, name_key, ref, set_data, overwrote):
+        # Called inside the write that stored the set
+        if overwrote and self.records.touches(name_key, *ref):
+            self.rebuild_records(name_key)
+            return
+        key = self.set_order(ref)
+        def precedes(other):
+            other_key = self.set_order(other)
+            return key is not None and other_key is not None and key < other_key
+        if self.records.offer(name_key, ref, set_data, precedes) is None:
+            self.rebuild_records(name_key)
+        else:
+            self.save_records(name_key)
+    
+    def forget_records(self, name_keys, *ref):
+        # After a delete: names whose records involved the deleted rows are rebuilt
+        for name_key in set(name_keys):
+            if self.records.touches(name_key, *ref):
+                self.rebuild_records(name_key)
+    
+    def exercise_name_key(self, session_id, exercise_id):
+        row = self.conn.execute(
+            "SELECT name_key FROM exercises WHERE session_id = ? AND id = ?", (session_id, exercise_id)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def get_personal_records(self, exercise_name):
+        return self.records.get(exercise_name)
+    
+    def get_set_records(self, session_id, exercise_id, set_id):
+        name_key = self.exercise_name_key(session_id, exercise_id)
+        if name_key is None:
+            return []
+        return self.records.broken_by(name_key, [session_id, exercise_id, set_id])
+    
+    @synchronized
+    def create_workout_session(self, name, workout_type="Custom", date=None, time=None):
+        session_id = f"session_{str(uuid.uuid4())[:8]}"
+        current_date = date or datetime.now().strftime("%Y-%m-%d")
+        current_time = time or datetime.now().strftime("%H:%M")
+        
+        with self.write():
+            self.conn.execute(
+                "INSERT INTO sessions (id, name, date, time, workout_type, status) VALUES (?, ?, ?, ?, ?, 'active')",
+                (session_id, name, current_date, current_time, workout_type)
+            )
+        self.adjust_stats(sessions=1)
+        self.emit(SessionAdded(session_id))
+        return session_id
+    
+    @synchronized
+    def delete_workout_session(self, session_id):
+        # Read back whole for the undo stack, which also gives the totals
+        session = self.get_workout_session(session_id)
+        if not session:
+            return False
+        with self.write():
+            self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self.forget_records((normalize_exercise_name(exercise['name'])
+                                 for exercise in session['exercises'].values()), session_id)
+        volume = sum(self.exercise_volume(exercise) for exercise in session['exercises'].values())
+        self.adjust_stats(exercises=-len(session['exercises']), sessions=-1, volume=-volume)
+        self.push_undo('session', session)
+        self.emit(SessionRemoved(session_id))
+        return True
+    
+    @synchronized
+    def add_exercise(self, session_id, exercise_name, muscle_group="General"):
+        if session_id not in self.get_workout_sessions():
+            return None
+        
+        exercise_id = f"exercise_{str(uuid.uuid4())[:8]}"
+        with self.write():
+            self.conn.execute(
+                "INSERT INTO exercises (session_id, id, name, muscle_group, created_at, name_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, exercise_id, exercise_name, muscle_group, datetime.now().strftime("%H:%M"),
+                 normalize_exercise_name(exercise_name))
+            )
+        self.adjust_stats(exercises=1)
+        self.emit(ExerciseAdded(session_id, exercise_id, 0, 0.0))
+        return exercise_id
+    
+    @synchronized
+    def delete_exercise(self, session_id, exercise_id):
+        exercise = self.get_workout_session(session_id).get('exercises', {}).get(exercise_id)
+        if exercise is None:
+            return False
+        with self.write():
+            self.conn.execute("DELETE FROM exercises WHERE session_id = ? AND id = ?", (session_id, exercise_id))
+            self.forget_records([normalize_exercise_name(exercise['name'])], session_id, exercise_id)
+        volume = self.exercise_volume(exercise)
+        self.adjust_stats(exercises=-1, volume=-volume)
+        self.push_undo('exercise', session_id, exercise_id, exercise)
+        self.emit(ExerciseRemoved(session_id, exercise_id, -len(exercise['sets']), -volume))
+        return True
+    
+    @synchronized
+    def add_set(self, session_id, exercise_id, weight, reps, set_number=None):
+        # Same numbering as the JSON store: one past the highest set number
+        row = self.conn.execute(
+            "SELECT (SELECT COALESCE(MAX(set_number), 0) FROM sets WHERE session_id = ? AND exercise_id = ?), "
+            "name_key FROM exercises WHERE session_id = ? AND id = ?", (session_id, exercise_id, session_id, exercise_id)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        if set_number is None:
+            set_number = row[0] + 1
+        elif self.conn.execute(
+                "SELECT 1 FROM sets WHERE session_id = ? AND exercise_id = ? AND (id = ? OR set_number = ?)",
+                (session_id, exercise_id, f"set_{set_number}", set_number)).fetchone():
+            return None
+        set_id = f"set_{set_number}"
+        volume = float(weight) * int(reps)
+        set_data = {
+            "set_number": set_number, "weight": float(weight), "reps": int(reps),
+            "volume": volume, "created_at": datetime.now().strftime("%H:%M")
+        }
+        with self.write():
+            self.insert_set(session_id, exercise_id, set_id, set_data)
+            self.update_records(row[1], [session_id, exercise_id, set_id], set_data, False)
+        self.adjust_stats(volume=volume)
+        self.emit(SetChanged(session_id, exercise_id, set_id, set_data, 1, volume))
+        return set_id
+    
+    @synchronized
+    def update_set(self, session_id, exercise_id, set_id, weight=None, reps=None):
+        row = self.conn.execute(
+            "SELECT set_number, weight, reps, volume, created_at FROM sets "
+            "WHERE session_id = ? AND exercise_id = ? AND id = ?",
+            (session_id, exercise_id, set_id)
+        ).fetchone()
+        if row is None:
+            return False
+        
+        new_weight = float(weight) if weight is not None else row['weight']
+        new_reps = int(reps) if reps is not None else row['reps']
+        new_volume = new_weight * new_reps
+        set_data = dict(row, weight=new_weight, reps=new_reps, volume=new_volume)
+        with self.write():
+            self.conn.execute(
+                "UPDATE sets SET weight = ?, reps = ?, volume = ? WHERE session_id = ? AND exercise_id = ? AND id = ?",
+                (new_weight, new_reps, new_volume, session_id, exercise_id, set_id)
+            )
+            self.update_records(self.exercise_name_key(session_id, exercise_id),
+                                [session_id, exercise_id, set_id], set_data, True)
+        self.adjust_stats(volume=new_volume - row['volume'])
+        self.emit(SetChanged(session_id, exercise_id, set_id, set_data, 0, new_volume - row['volume']))
+        return True
+    
+    @synchronized
+    def delete_set(self, session_id, exercise_id, set_id):
+        row = self.conn.execute(
+            "SELECT set_number, weight, reps, volume, created_at FROM sets "
+            "WHERE session_id = ? AND exercise_id = ? AND id = ?",
+            (session_id, exercise_id, set_id)
+        ).fetchone()
+        if row is None:
+            return False
+        
+        with self.write():
+            self.conn.execute(
+                "DELETE FROM sets WHERE session_id = ? AND exercise_id = ? AND id = ?",
+                (session_id, exercise_id, set_id)
+            )
+            self.forget_records([self.exercise_name_key(session_id, exercise_id)], session_id, exercise_id, set_id)
+        self.adjust_stats(volume=-row['volume'])
+        self.push_undo('set', session_id, exercise_id, set_id, dict(row))
+        self.emit(SetChanged(session_id, exercise_id, set_id, None, -1, -row['volume']))
+        return True
+    
+    def insert_exercise(self, session_id, exercise):
+        self.conn.execute(
+            "INSERT INTO exercises (session_id, id, name, muscle_group, created_at, name_key) VALUES (?, ?, ?, ?, ?, ?)",
+            (session_id, exercise['id'], exercise['name'], exercise['muscle_group'], exercise.get('created_at'),
+             normalize_exercise_name(exercise['name']))
+        )
+        for set_id, set_data in exercise['sets'].items():
+            self.insert_set(session_id, exercise['id'], set_id, set_data)
+    
+    def insert_set(self, session_id, exercise_id, set_id, set_data):
+        self.conn.execute(
+            "INSERT INTO sets "
+            "(session_id, exercise_id, id, set_number, weight, reps, volume, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (session_id, exercise_id, set_id, set_data['set_number'], set_data['weight'], set_data['reps'],
+             set_data['volume'], set_data.get('created_at'))
+        )
+    
+    @synchronized
+    def restore_session(self, session):
+        if session['id'] in self.get_workout_sessions():
+            return False
+        with self.write():
+            self.conn.execute(
+                "INSERT INTO sessions (id, name, date, time, workout_type, status) VALUES (?, ?, ?, ?, ?, ?)",
+                (session['id'], session['name'], session['date'], session['time'],
+                 session['workout_type'], session['status'])
+            )
+            for exercise in session['exercises'].values():
+                self.insert_exercise(session['id'], exercise)
+            for name_key in {normalize_exercise_name(exercise['name']) for exercise in session['exercises'].values()}:
+                self.rebuild_records(name_key)
+        volume = sum(self.exercise_volume(exercise) for exercise in session['exercises'].values())
+        self.adjust_stats(exercises=len(session['exercises']), sessions=1, volume=volume)
+        self.emit(SessionAdded(session['id']))
+        return True
+    
+    @synchronized
+    def restore_exercise(self, session_id, exercise_id, exercise):
+        exercises = self.get_workout_session(session_id).get('exercises')
+        if exercises is None or exercise_id in exercises:
+            return False
+        with self.write():
+            self.insert_exercise(session_id, exercise)
+            self.rebuild_records(normalize_exercise_name(exercise['name']))
+        volume = self.exercise_volume(exercise)
+        self.adjust_stats(exercises=1, volume=volume)
+        self.emit(ExerciseAdded(session_id, exercise_id, len(exercise['sets']), volume))
+        return True
+    
+    @synchronized
+    def restore_set(self, session_id, exercise_id, set_id, set_data):
+        exercise = self.get_workout_session(session_id).get('exercises', {}).get(exercise_id)
+        if exercise is None or set_id in exercise['sets']:
+            return False
+        with self.write():
+            self.insert_set(session_id, exercise_id, set_id, set_data)
+            self.rebuild_records(normalize_exercise_name(exercise['name']))
+        self.adjust_stats(volume=set_data['volume'])
+        self.emit(SetChanged(session_id, exercise_id, set_id, set_data, 1, set_data['volume']))
+        return True
+    
+    def get_session_totals(self, session_id):
+        row = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM exercises WHERE session_id = ?), COUNT(*), COALESCE(SUM(volume), 0.0) "
+            "FROM sets WHERE session_id = ?", (session_id, session_id)
+        ).fetchone()
+        return {"exercises": row[0], "sets": row[1], "volume": row[2]}
+    
+    def get_exercise_totals(self, session_id, exercise_id):
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(volume), 0.0) FROM sets WHERE session_id = ? AND exercise_id = ?",
+            (session_id, exercise_id)
+        ).fetchone()
+        return {"sets": row[0], "volume": row[1]}
+    
+    def compute_stats(self):
+        return self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM exercises), (SELECT COUNT(*) FROM sessions), "
+            "(SELECT COALESCE(SUM(volume), 0.0) FROM sets)"
+        ).fetchone()
+    
+    def flush(self):
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+def read_json_store(json_file='fitness_data.json'):
+    # Sessions and settings of a JSON store (sharded, or the single-file layout of older builds),
+    # read without writing anything: no legacy migration, quarantine, archiving or writer thread.
+    # {} when there is nothing to read.
+    store_dir = os.path.splitext(json_file)[0]
+    shard_dir = os.path.join(store_dir, 'sessions')
+    archive_dir = os.path.join(store_dir, 'archive')
+    data = {"workout_sessions": {}, "user_settings": dict(DEFAULT_USER_SETTINGS)}
+    sessions = data['workout_sessions']
+    
+    index_path = find_snapshot(os.path.join(store_dir, 'index'), SNAPSHOT_CODECS['json'])
+    if index_path is not None:
+        journals = [os.path.join(store_dir, 'journal')]
+        try:
+            index = read_snapshot(index_path)
+            data['user_settings'].update(index.get('user_settings', {}))
+            archived = set(index.get('archived_sessions') or ())
+            paths = {}
+            for session_id in index.get('sessions', {}):
+                hot = find_snapshot(os.path.join(shard_dir, session_id), SNAPSHOT_CODECS['json'])
+                cold = find_archive(os.path.join(archive_dir, session_id))
+                paths[session_id] = (cold or hot) if session_id in archived else (hot or cold)
+        except Exception as e:
+            # The shards are the primary data
+            print(f"Error loading data: {e}")
+            paths = {session_id: path for session_id, path, _ in iter_shard_files(shard_dir, archive_dir)}
+        for session_id, path in paths.items():
+            try:
+                if path is None:
+                    raise FileNotFoundError(f"no shard for {session_id}")
+                sessions[session_id] = read_snapshot(path)
+            except Exception as e:
+                print(f"Error loading session {session_id}: {e}")
+    elif os.path.exists(json_file):
+        legacy_journal_file = store_dir + '.journal'
+        journals = [legacy_journal_file + '.old', legacy_journal_file]
+        try:
+            with open(json_file, 'r') as f:
+                for kind, key, value in iter_legacy_snapshot(f):
+                    if kind == 'session':
+                        sessions[key] = value
+                    elif kind == 'corrupt':
+                        print(f"Skipped unreadable session {key} from {json_file}")
+                    elif key == 'user_settings' and isinstance(value, dict):
+                        data['user_settings'].update(value)
+        except Exception as e:
+            # Sessions read before the damage are kept
+            print(f"Error loading data: {e}")
+    else:
+        return {}
+    
+    for path in journals:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # Torn final line from a crash mid-append
+                try:
+                    DatabaseManager.apply_journal_record(data, json_loads(line))
+                except ValueError:
+                    print(f"Skipping unreadable journal record in {path}")
+    return data
+
+def migrate_json_to_sqlite(json_file='fitness_data.json', db_file='fitness_data.db'):
+    # One-shot import; builds into a temp file so a failed run leaves no half-migrated database.
+    # The JSON store is only read, so it stays usable as it was.
+    source = read_json_store(json_file)
+    if not source:
+        return False
+    
+    tmp_file = db_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    
+    conn = sqlite3.connect(tmp_file)
+    try:
+        conn.executescript(SQLITE_SCHEMA)
+        conn.executescript(SQLITE_UPGRADES)
+        with conn:
+            sessions = source['workout_sessions']
+            conn.executemany(
+                "INSERT INTO sessions (id, name, date, time, workout_type, status) VALUES (?, ?, ?, ?, ?, ?)",
+                ((sid, s['name'], s['date'], s.get('time', '00:00'), s.get('workout_type', 'Custom'),
+                  s.get('status', 'active')) for sid, s in sessions.items())
+            )
+            conn.executemany(
+                "INSERT INTO exercises (session_id, id, name, muscle_group, created_at, name_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((sid, eid, ex['name'], ex.get('muscle_group', 'General'), ex.get('created_at'),
+                  normalize_exercise_name(ex['name']))
+                 for sid, s in sessions.items() for eid, ex in s.get('exercises', {}).items())
+            )
+            conn.executemany(
+                "INSERT INTO sets (session_id, exercise_id, id, set_number, weight, reps, volume, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((sid, eid, set_id, st['set_number'], st['weight'], st['reps'], st['volume'], st.get('created_at'))
+                 for sid, s in sessions.items() for eid, ex in s.get('exercises', {}).items()
+                 for set_id, st in ex.get('sets', {}).items())
+            )
+            conn.executemany(
+                "INSERT INTO settings (key, value) VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in source['user_settings'].items())
+            )
+    except Exception as e:
+        print(f"Error migrating {json_file} to SQLite: {e}")
+        conn.close()
+        os.remove(tmp_file)
+        return False
+    
+    conn.close()
+    os.replace(tmp_file, db_file)
+    return True
+
+def create_database_manager(engine=None, json_file='fitness_data.json', db_file='fitness_data.db'):
+    # FITTRACKER_STORAGE=sqlite opts in; an existing database keeps being used
+    engine = engine or os.environ.get('FITTRACKER_STORAGE') or ('sqlite' if os.path.exists(db_file) else 'json')
+    
+    if engine == 'sqlite':
+        json_store = os.path.exists(json_file) or os.path.isdir(os.path.splitext(json_file)[0])
+        if not os.path.exists(db_file) and json_store:
+            migrate_json_to_sqlite(json_file, db_file)
+        return SQLiteDatabaseManager(db_file)
+    return DatabaseManager(json_file)
+
+def make_synthetic_sessions(total_sets, exercises_per_session=5, sets_per_exercise=4):
+    sessions = {}
+    names = ['Bench Press', 'Squat', 'Deadlift', 'Pull-ups', 'Overhead Press', 'Barbell Row']
+    set_count = 0
+    day = 0
+    while set_count < total_sets:
+        session_id = f"session_{day:08x}"
+        session = {
+            "id": session_id, "name": f"Workout {day}", "date": f"{2020 + day // 365}-{day % 12 + 1:02d}-{day % 28 + 1:02d}",
+            "time": "18:30", "workout_type": "Push", "exercises": {}, "status": "active"
+        }
+        for e in range(exercises_per_session):
+            exercise_id = f"exercise_{day:04x}{e:04x}"
+            sets = {}
+            for n in range(1, sets_per_exercise + 1):
+                weight = 20.0 + (day + n) % 80 * 2.5
+                reps = 5 + (day + e + n) % 8
+                sets[f"set_{n}"] = {
+                    "set_number": n, "weight": weight, "reps": reps, "volume": weight * reps, "created_at": "18:45"
+                }
+                set_count += 1
+            session['exercises'][exercise_id] = {
+                "id": exercise_id, "name": names[e % len(names)], "muscle_group": "Chest",
+                "sets": sets, "created_at": "18:31"
+            }
+        sessions[session_id] = session
+        day += 1
+    return sessions
+
+def run_benchmarks(sizes=(1000, 10000, 100000), repeat=3):
+    print(f"json codec: {'orjson' if orjson else 'stdlib json'}; "
+          f"binary body: {'msgpack' if msgpack else 'restricted pickle'}")
+    print(f"{'sets':>8}  {'format':<24} {'save ms':>9} {'load ms':>9} {'size KB':>9}")
+    
+    cases = [
+        ("json indent=2 (legacy)", lambda obj: json.dumps(obj, indent=2).encode('utf-8'), json.loads),
+        ("json compact", SNAPSHOT_CODECS['json'].dumps, decode_snapshot),
+        ("binary", SNAPSHOT_CODECS['binary'].dumps, decode_snapshot),
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            data = {
+                "app_stats": dict(DEFAULT_APP_STATS), "workout_sessions": make_synthetic_sessions(size),
+                "user_settings": dict(DEFAULT_USER_SETTINGS)
+            }
+            for label, dumps, loads in cases:
+                path = os.path.join(tmp_dir, 'snapshot')
+                save_times, load_times = [], []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    with open(path, 'wb') as f:
+                        f.write(dumps(data))
+                    save_times.append(time.perf_counter() - start)
+                    
+                    start = time.perf_counter()
+                    with open(path, 'rb') as f:
+                        loaded = loads(f.read())
+                    load_times.append(time.perf_counter() - start)
+                
+                assert loaded == data, f"{label} did not round-trip"
+                print(f"{size:>8}  {label:<24} {min(save_times) * 1000:>9.1f} {min(load_times) * 1000:>9.1f} "
+                      f"{os.path.getsize(path) / 1024:>9.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="FitTracker storage utilities")
+    parser.add_argument('--benchmark', action='store_true', help="time snapshot save/load per format")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="history sizes in sets")
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        run_benchmarks(args.sizes)
+    else:
+        parser.print_help()
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import DatabaseManager, SQLiteDatabaseManager
+
+@pytest.fixture(params=['json', 'sqlite'])
+def make_db(request, tmp_path):
+    # Opens a store of the parametrized engine under tmp_path; every store is closed at teardown
+    opened = []
+    def make(name='fitness_data'):
+        if request.param == 'json':
+            manager = DatabaseManager(str(tmp_path / f'{name}.json'), archive_after_days=-1)
+        else:
+            manager = SQLiteDatabaseManager(str(tmp_path / f'{name}.db'))
+        manager.create_tables()
+        opened.append(manager)
+        return manager
+    yield make
+    for manager in opened:
+        manager.close()
+
+@pytest.fixture
+def db(make_db):
+    return make_db()
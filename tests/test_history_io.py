@@ -0,0 +1,90 @@
+import csv
+
+import pytest
+
+from history_io import EXPORT_FIELDS, export_csv, export_jsonl, import_history
+
+def history_of(db):
+    # Everything a round trip has to keep, without ids or set numbers
+    history = []
+    for session_id, header in db.sessions_between('0000-00-00', '9999-99-99'):
+        session = db.scan_session(session_id)
+        exercises = sorted(
+            (exercise['name'], exercise.get('muscle_group'), sorted(
+                (set_data['weight'], set_data['reps']) for set_data in exercise.get('sets', {}).values()
+            ))
+            for exercise in session.get('exercises', {}).values()
+        )
+        history.append((session['date'], session['time'], session['name'], session['workout_type'], exercises))
+    return sorted(history)
+
+@pytest.mark.parametrize('export, suffix', [(export_csv, '.csv'), (export_jsonl, '.jsonl')])
+def test_export_import_round_trip(make_db, tmp_path, export, suffix):
+    source = make_db('source')
+    push = source.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    bench = source.add_exercise(push, "Bench Press", "Chest")
+    for weight, reps in ((60, 5), (62.5, 5), (65, 3)):
+        source.add_set(push, bench, weight, reps)
+    source.delete_set(push, bench, 'set_2')
+    source.add_exercise(push, "Cable Fly", "Chest")
+    source.create_workout_session("Rest Day", "Custom", date="2024-05-02", time="08:30")
+    
+    path = str(tmp_path / ('history' + suffix))
+    assert export(source, path) == 4
+    
+    target = make_db('target')
+    counts = import_history(target, path)
+    assert counts['sessions'] == 2 and counts['exercises'] == 2 and counts['sets'] == 2
+    assert counts['skipped'] == 0
+    assert history_of(target) == history_of(source)
+    
+    # A second import of the same file adds nothing
+    counts = import_history(target, path)
+    assert counts['sessions'] == 0 and counts['exercises'] == 0 and counts['sets'] == 0
+    assert counts['duplicates'] == 2
+    assert history_of(target) == history_of(source)
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+def csv_row(workout_name, time, set_number, weight, reps=5):
+    return {'date': '2024-05-01', 'time': time, 'workout_name': workout_name, 'workout_type': 'Push',
+            'exercise_name': 'Bench Press', 'muscle_group': 'Chest', 'set_number': set_number,
+            'weight': weight, 'reps': reps}
+
+def test_import_into_a_date_with_another_session(db, tmp_path):
+    # The app already holds three bench sets on the date, in a different workout
+    session_id = db.create_workout_session("Morning Push", "Push", date="2024-05-01", time="07:00")
+    exercise_id = db.add_exercise(session_id, "Bench Press", "Chest")
+    db.add_sets_bulk(session_id, exercise_id, [(60, 5), (65, 5), (70, 5)])
+    
+    path = str(tmp_path / 'history.csv')
+    # Out of set order and with a gap in the numbering
+    write_csv(path, [csv_row("Evening Push", "18:00", 3, 90), csv_row("Evening Push", "18:00", 1, 80),
+                     csv_row("Evening Push", "18:00", 5, 95)])
+    counts = import_history(db, path)
+    assert (counts['sessions'], counts['sets'], counts['duplicates']) == (1, 3, 0)
+    
+    evening = [session_id for session_id, header in db.sessions_between('2024-05-01', '2024-05-01')
+               if header['name'] == "Evening Push"]
+    session = db.get_workout_session(evening[0])
+    sets = next(iter(session['exercises'].values()))['sets']
+    assert sorted((set_data['set_number'], set_data['weight']) for set_data in sets.values()) == [
+        (1, 80.0), (3, 90.0), (5, 95.0)
+    ]
+    
+    # Importing again adds nothing, and the morning session is untouched
+    counts = import_history(db, path)
+    assert (counts['sessions'], counts['sets'], counts['duplicates']) == (0, 0, 3)
+    assert db.get_exercise_totals(session_id, exercise_id) == {"sets": 3, "volume": (60 + 65 + 70) * 5}
+
+def test_rows_without_set_numbers_are_matched_by_position(db, tmp_path):
+    path = str(tmp_path / 'history.csv')
+    write_csv(path, [csv_row("Push", "18:00", '', weight) for weight in (80, 85, 85)])
+    assert import_history(db, path)['sets'] == 3
+    counts = import_history(db, path)
+    assert (counts['sets'], counts['duplicates']) == (0, 3)
@@ -0,0 +1,220 @@
+import io
+import os
+import json
+
+import pytest
+
+from storage import DatabaseManager, JsonStreamReader, SQLiteDatabaseManager, migrate_json_to_sqlite
+
+def tree_of(root):
+    # {relative path: bytes} of every file below root
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+def summary_of(db):
+    return sorted(
+        (session['date'], session['name'], exercise['name'],
+         sorted((set_data['weight'], set_data['reps']) for set_data in exercise['sets'].values()))
+        for session in db.get_workout_sessions().values() for exercise in session['exercises'].values()
+    )
+
+def test_migrate_sharded_store_leaves_it_untouched(tmp_path):
+    json_file = str(tmp_path / 'fitness_data.json')
+    source = DatabaseManager(json_file, archive_after_days=-1)
+    source.create_tables()
+    old = source.create_workout_session("Pull", "Pull", date="2020-01-06", time="07:00")
+    source.add_set(old, source.add_exercise(old, "Deadlift", "Back"), 140, 3)
+    recent = source.create_workout_session("Push", "Push", date="9999-01-01", time="18:00")
+    bench = source.add_exercise(recent, "Bench Press", "Chest")
+    source.add_set(recent, bench, 80, 5)
+    source.close()
+    # A second start archives the old session
+    DatabaseManager(json_file, archive_after_days=30).close()
+    assert os.listdir(tmp_path / 'fitness_data' / 'archive')
+    # and one more old session is due for the archive
+    source = DatabaseManager(json_file, archive_after_days=-1)
+    older = source.create_workout_session("Pull", "Pull", date="2020-01-13", time="07:00")
+    source.add_set(older, source.add_exercise(older, "Deadlift", "Back"), 145, 3)
+    source.close()
+    # A set only in the journal, as after a crash before the next snapshot
+    set_data = {"set_number": 2, "weight": 82.5, "reps": 5, "volume": 412.5, "created_at": "18:05"}
+    with open(tmp_path / 'fitness_data' / 'journal', 'a') as f:
+        f.write(json.dumps({"op": "set", "s": recent, "e": bench, "id": "set_2", "v": set_data}) + '\n')
+    
+    before = tree_of(tmp_path)
+    assert migrate_json_to_sqlite(json_file, str(tmp_path / 'fitness_data.db'))
+    after = tree_of(tmp_path)
+    del after['fitness_data.db']
+    assert after == before
+    
+    migrated = SQLiteDatabaseManager(str(tmp_path / 'fitness_data.db'))
+    try:
+        assert summary_of(migrated) == [
+            ("2020-01-06", "Pull", "Deadlift", [(140.0, 3)]),
+            ("2020-01-13", "Pull", "Deadlift", [(145.0, 3)]),
+            ("9999-01-01", "Push", "Bench Press", [(80.0, 5), (82.5, 5)]),
+        ]
+        # The records table is filled on first open
+        assert migrated.get_personal_records("Deadlift")['max_weight']['value'] == 145.0
+    finally:
+        migrated.close()
+
+def test_migrate_legacy_file_leaves_it_untouched(tmp_path):
+    json_file = tmp_path / 'fitness_data.json'
+    json_file.write_text(json.dumps({
+        "app_stats": {"total_sessions": 1},
+        "workout_sessions": {
+            "session_1": {"name": "Legs", "date": "2023-03-01", "exercises": {
+                "exercise_1": {"name": "Squat", "sets": {"set_1": {"weight": 100, "reps": 5}}}
+            }},
+            "session_2": ["not", "a", "session"]
+        },
+        "user_settings": {"weight_unit": "lbs"}
+    }))
+    before = tree_of(tmp_path)
+    assert migrate_json_to_sqlite(str(json_file), str(tmp_path / 'fitness_data.db'))
+    after = tree_of(tmp_path)
+    del after['fitness_data.db']
+    assert after == before
+    
+    migrated = SQLiteDatabaseManager(str(tmp_path / 'fitness_data.db'))
+    try:
+        assert summary_of(migrated) == [("2023-03-01", "Legs", "Squat", [(100.0, 5)])]
+        assert migrated.get_user_settings()['weight_unit'] == 'lbs'
+    finally:
+        migrated.close()
+
+def test_migrate_without_json_store(tmp_path):
+    assert not migrate_json_to_sqlite(str(tmp_path / 'fitness_data.json'), str(tmp_path / 'fitness_data.db'))
+    assert not os.listdir(tmp_path)
+
+STREAM_DOCUMENT = {
+    "plain": "text",
+    "escapes": "quote \" backslash \\ brace { bracket ] \\\"",
+    "unicode": "Übung – 💪",
+    "numbers": [0, -1.5, 2e3, {"nested": [[], {}, [1, [2, [3]]]]}],
+    "literals": [True, False, None],
+    "empty_object": {},
+    "empty_list": [],
+    "last": 42
+}
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 64])
+def test_stream_reader_at_small_chunk_sizes(chunk_size):
+    text = json.dumps(STREAM_DOCUMENT, ensure_ascii=False, indent=1)
+    reader = JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+    values = {key: json.loads(reader.read_raw()) for key in reader.iter_object()}
+    assert values == STREAM_DOCUMENT
+    assert reader.peek() == ''
+
+def write_legacy_file(path, sessions_text):
+    path.write_text(
+        '{"app_stats": {"total_sessions": 3}, "workout_sessions": {' + sessions_text +
+        '}, "user_settings": {"name": "Sam", "weight_unit": "kg", "theme": "dark"}}'
+    )
+
+def legacy_session(session_id, date, weight):
+    return json.dumps({
+        "id": session_id, "name": "Legs", "date": date, "time": "08:00", "workout_type": "Legs",
+        "status": "active", "exercises": {"exercise_1": {
+            "id": "exercise_1", "name": "Squat", "muscle_group": "Legs", "sets": {
+                "set_1": {"set_number": 1, "weight": weight, "reps": 5, "volume": weight * 5.0}
+            }
+        }}
+    })
+
+def test_legacy_file_is_migrated_to_shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(JsonStreamReader, 'CHUNK_SIZE', 7)
+    json_file = tmp_path / 'fitness_data.json'
+    write_legacy_file(json_file, ', '.join([
+        '"session_1": ' + legacy_session("session_1", "2023-03-01", 100.0),
+        '"session_2": {"name": 5, "date": "2023-03-02"}',
+        '"session_3": ' + legacy_session("session_3", "2023-03-03", 105.0),
+    ]))
+    # A set logged after the last snapshot of the old build
+    set_data = {"set_number": 2, "weight": 110.0, "reps": 3, "volume": 330.0, "created_at": "08:10"}
+    (tmp_path / 'fitness_data.journal').write_text(
+        json.dumps({"op": "set", "s": "session_3", "e": "exercise_1", "id": "set_2", "v": set_data}) + '\n'
+    )
+    
+    db = DatabaseManager(str(json_file), archive_after_days=-1)
+    try:
+        assert sorted(db.get_session_headers()) == ['session_1', 'session_3']
+        assert db.get_workout_session('session_3')['exercises']['exercise_1']['sets']['set_2'] == set_data
+        assert db.get_user_settings()['name'] == 'Sam'
+        assert db.get_personal_records("Squat")['max_weight']['value'] == 110.0
+    finally:
+        db.close()
+    
+    # The unreadable session is set aside and the old files are kept, renamed
+    quarantined = [json.loads(line) for line in (tmp_path / 'fitness_data.json.corrupt-sessions').open()]
+    assert [record['id'] for record in quarantined] == ['session_2']
+    assert not json_file.exists() and (tmp_path / 'fitness_data.json.migrated').exists()
+    assert (tmp_path / 'fitness_data.journal.migrated').exists()
+    
+    # The next start reads the shards
+    db = DatabaseManager(str(json_file), archive_after_days=-1)
+    try:
+        assert sorted(db.get_session_headers()) == ['session_1', 'session_3']
+        assert db.get_exercise_totals('session_3', 'exercise_1') == {"sets": 2, "volume": 855.0}
+    finally:
+        db.close()
+
+def test_damaged_legacy_file_keeps_sessions_before_the_damage(tmp_path):
+    json_file = tmp_path / 'fitness_data.json'
+    json_file.write_text(
+        '{"workout_sessions": {"session_1": ' + legacy_session("session_1", "2023-03-01", 100.0) +
+        ', "session_2": {"name": "Legs", "date": "2023-03-0'
+    )
+    
+    db = DatabaseManager(str(json_file), archive_after_days=-1)
+    try:
+        assert list(db.get_session_headers()) == ['session_1']
+    finally:
+        db.close()
+    assert not json_file.exists()
+    assert [path.name for path in tmp_path.glob('fitness_data.json.corrupt-*')]
+
+def test_unreadable_shard_is_quarantined(tmp_path):
+    json_file = str(tmp_path / 'fitness_data.json')
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    db.create_tables()
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    db.add_set(session_id, db.add_exercise(session_id, "Bench Press", "Chest"), 60, 5)
+    db.save_data()
+    db.close()
+    shard = tmp_path / 'fitness_data' / 'sessions' / f'{session_id}.json'
+    shard.write_text('{"id": "')
+    
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    try:
+        # The header keeps the session listed and openable, with nothing in it
+        session = db.get_workout_session(session_id)
+        assert (session['name'], session['exercises']) == ("Push", {})
+        assert db.get_session_totals(session_id) == {"exercises": 0, "sets": 0, "volume": 0.0}
+    finally:
+        db.close()
+    assert [path.name for path in shard.parent.glob(f'{session_id}.json.corrupt-*')]
+
+def test_unreadable_index_is_rebuilt_from_shards(tmp_path):
+    json_file = str(tmp_path / 'fitness_data.json')
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    db.create_tables()
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    db.add_set(session_id, db.add_exercise(session_id, "Bench Press", "Chest"), 60, 5)
+    db.save_data()
+    db.close()
+    (tmp_path / 'fitness_data' / 'index.json').write_text('{"sessions": ')
+    
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    try:
+        assert db.get_session_totals(session_id) == {"exercises": 1, "sets": 1, "volume": 300.0}
+        assert db.get_app_stats()['total_volume'] == 300
+    finally:
+        db.close()
+    assert [path.name for path in (tmp_path / 'fitness_data').glob('index.json.corrupt-*')]
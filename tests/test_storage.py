@@ -0,0 +1,303 @@
+import os
+import json
+import random
+
+import pytest
+
+from storage import DatabaseManager, PersonalRecords, SetColumns, SnapshotWriter, decode_snapshot
+
+def sets_of(db, session_id, exercise_id):
+    return db.get_workout_session(session_id)['exercises'][exercise_id]['sets']
+
+def test_add_set_after_delete_keeps_existing_sets(db):
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    exercise_id = db.add_exercise(session_id, "Bench Press", "Chest")
+    for weight in (60, 65, 70):
+        db.add_set(session_id, exercise_id, weight, 5)
+    
+    assert db.delete_set(session_id, exercise_id, 'set_2')
+    new_id = db.add_set(session_id, exercise_id, 80, 5)
+    
+    sets = sets_of(db, session_id, exercise_id)
+    assert new_id == 'set_4'
+    assert sets['set_3']['weight'] == 70
+    assert sets['set_4']['weight'] == 80
+    assert db.get_exercise_totals(session_id, exercise_id) == {"sets": 3, "volume": (60 + 70 + 80) * 5}
+    assert db.get_app_stats()['total_volume'] == (60 + 70 + 80) * 5
+
+def test_failed_transaction_drops_rolled_back_events_and_undo(db):
+    session_id = db.create_workout_session("Legs", "Legs", date="2024-05-02", time="09:00")
+    received = []
+    db.changes.subscribe(received.extend)
+    
+    try:
+        with db.transaction():
+            db.delete_workout_session(session_id)
+            raise RuntimeError("interrupted")
+    except RuntimeError:
+        pass
+    
+    if db.ROLLS_BACK_FAILED_TRANSACTIONS:
+        assert session_id in db.get_session_headers()
+        assert received == []
+        assert not db.can_undo()
+    else:
+        # The JSON engine keeps what the block applied, so it is announced and undoable
+        assert session_id not in db.get_session_headers()
+        assert [type(event).__name__ for event in received] == ['SessionRemoved']
+        assert db.undo_delete() == 'session'
+
+def test_set_columns_running_totals_match_recount():
+    columns = SetColumns()
+    rng = random.Random(7)
+    live = {}
+    for _ in range(2000):
+        ref = (f"s{rng.randrange(5)}", f"e{rng.randrange(3)}", f"set_{rng.randrange(8)}")
+        if ref in live and rng.random() < 0.4:
+            columns.remove(*ref)
+            del live[ref]
+        else:
+            weight, reps = rng.choice((20, 42.5, 60, 100)), rng.randrange(1, 12)
+            columns.put(*ref, {"weight": weight, "reps": reps, "volume": weight * reps, "created_at": "10:00"})
+            live[ref] = weight * reps
+    
+    assert len(columns) == len(live)
+    for session_id, exercise_id in columns.exercise_keys:
+        volumes = [volume for ref, volume in live.items() if ref[:2] == (session_id, exercise_id)]
+        sets, volume = columns.exercise_totals(session_id, exercise_id)
+        assert sets == len(volumes)
+        assert volume == pytest.approx(sum(volumes))
+
+def test_session_header_matches_headers(db):
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-03", time="18:00")
+    exercise_id = db.add_exercise(session_id, "Bench Press", "Chest")
+    db.add_set(session_id, exercise_id, 60, 5)
+    
+    header = db.get_session_header(session_id)
+    assert header == db.get_session_headers()[session_id]
+    assert (header['exercise_count'], header['set_count'], header['total_volume']) == (1, 1, 300.0)
+    assert db.get_session_header('session_missing') is None
+
+def rebuilt_records(db, name):
+    # Records replayed from scratch over every set of the name, oldest first
+    sets = []
+    for session_id, header in db.sessions_between('0000-00-00', '9999-99-99'):
+        for exercise_id, exercise in db.scan_session(session_id)['exercises'].items():
+            if exercise['name'] == name:
+                for set_id, set_data in sorted(exercise['sets'].items(), key=lambda item: item[1]['set_number']):
+                    sets.append(([session_id, exercise_id, set_id], set_data))
+    records = PersonalRecords()
+    records.rebuild(name, sets)
+    return records.get(name)
+
+def test_records_match_rebuild_when_sets_arrive_out_of_date_order(db):
+    rng = random.Random(7)
+    logged = []
+    for step in range(120):
+        if logged and rng.random() < 0.2:
+            session_id, exercise_id, set_id = logged.pop(rng.randrange(len(logged)))
+            if rng.random() < 0.5:
+                db.delete_set(session_id, exercise_id, set_id)
+            else:
+                db.update_set(session_id, exercise_id, set_id, weight=rng.choice((60, 70, 80, 90)))
+                logged.append((session_id, exercise_id, set_id))
+            continue
+        # Each session is dated at random, so older sets keep arriving after newer records
+        session_id = db.create_workout_session("Push", "Push", date=f"2024-{rng.randint(1, 12):02d}-01",
+                                               time=f"{step % 24:02d}:00")
+        exercise_id = db.add_exercise(session_id, "Bench Press", "Chest")
+        for _ in range(rng.randint(1, 3)):
+            set_id = db.add_set(session_id, exercise_id, rng.choice((60, 70, 80, 90)), rng.randint(1, 8))
+            logged.append((session_id, exercise_id, set_id))
+        
+        assert db.get_personal_records("Bench Press") == rebuilt_records(db, "Bench Press")
+
+def test_exercise_totals_of_unopened_shard(tmp_path):
+    json_file = str(tmp_path / 'fitness_data.json')
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    db.create_tables()
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    exercise_id = db.add_exercise(session_id, "Bench Press", "Chest")
+    db.add_sets_bulk(session_id, exercise_id, [(60, 5), (70, 5)])
+    db.save_data()
+    db.close()
+    
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    try:
+        assert not db.data['workout_sessions'].is_loaded(session_id)
+        assert db.get_exercise_totals(session_id, exercise_id) == {"sets": 2, "volume": 650.0}
+    finally:
+        db.close()
+
+def test_muscle_group_lookup_leaves_shard_unloaded(tmp_path):
+    json_file = str(tmp_path / 'fitness_data.json')
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    db.create_tables()
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    db.add_exercise(session_id, "Bench Press", "Chest")
+    db.save_data()
+    db.close()
+    
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    try:
+        assert db.get_exercise_muscle_group("bench press") == "Chest"
+        assert not db.data['workout_sessions'].is_loaded(session_id)
+    finally:
+        db.close()
+
+def test_muscle_group_comes_from_latest_logging(db):
+    for date, muscle_group in (("2024-05-08", "Upper Body"), ("2024-05-01", "Chest")):
+        session_id = db.create_workout_session("Push", "Push", date=date, time="10:00")
+        db.add_exercise(session_id, "Bench Press", muscle_group)
+    assert db.get_exercise_muscle_group("Bench Press") == "Upper Body"
+    assert db.get_exercise_muscle_group("Squat") is None
+
+def random_history(db, rng, steps):
+    # Random adds, deletes and undos; yields after each step with the session ids in creation
+    # order (a restored session counts as created again, so it sorts last among equal times)
+    created = []
+    for _ in range(steps):
+        roll = rng.random()
+        if roll < 0.3 or not created:
+            session_id = db.create_workout_session(
+                "Session", "Custom", date=f"2024-0{rng.randint(1, 3)}-{rng.randint(1, 28):02d}",
+                time=rng.choice(("07:00", "12:00", "18:00"))
+            )
+            created.append(session_id)
+        elif roll < 0.4:
+            session_id = created.pop(rng.randrange(len(created)))
+            db.delete_workout_session(session_id)
+            if rng.random() < 0.5 and db.undo_delete() == 'session':
+                created.append(session_id)
+        else:
+            session_id = rng.choice(created)
+            exercises = list(db.get_workout_session(session_id)['exercises'])
+            if not exercises or roll < 0.5:
+                db.add_exercise(session_id, rng.choice(("Squat", "Bench Press")), "General")
+            elif roll < 0.55:
+                db.delete_exercise(session_id, rng.choice(exercises))
+                if rng.random() < 0.5:
+                    db.undo_delete()
+            else:
+                exercise_id = rng.choice(exercises)
+                sets = list(db.get_workout_session(session_id)['exercises'][exercise_id]['sets'])
+                if sets and roll < 0.65:
+                    db.delete_set(session_id, exercise_id, rng.choice(sets))
+                else:
+                    db.add_set(session_id, exercise_id, rng.choice((40, 60, 80)), rng.randint(1, 10))
+        yield created
+
+def test_date_index_after_adds_and_deletes(db):
+    for created in random_history(db, random.Random(11), 150):
+        headers = db.get_session_headers()
+        assert sorted(headers) == sorted(created)
+        # Newest first; sessions at the same date and time by creation, latest first
+        expected = sorted(created, key=lambda session_id: (headers[session_id]['date'], headers[session_id]['time'],
+                                                            created.index(session_id)), reverse=True)
+        assert [session_id for session_id, _ in db.recent_sessions()] == expected
+        assert [session_id for session_id, _ in db.recent_sessions(5)] == expected[:5]
+        assert [session_id for session_id, _ in db.sessions_between('2024-02-01', '2024-02-29')] == [
+            session_id for session_id in reversed(expected) if headers[session_id]['date'].startswith('2024-02')
+        ]
+
+def rollup_of(db, start, end):
+    # Summary recounted from the sessions themselves
+    sessions = [db.scan_session(session_id) for session_id, _ in db.sessions_between(start, end)]
+    sets = [set_data for session in sessions for exercise in session['exercises'].values()
+            for set_data in exercise['sets'].values()]
+    return {"sessions": len(sessions), "sets": len(sets), "volume": sum(set_data['volume'] for set_data in sets),
+            "training_days": len({session['date'] for session in sessions})}
+
+def test_rollups_after_adds_and_deletes(db):
+    # 2024-02-12 is the Monday of ISO week 7
+    for _ in random_history(db, random.Random(13), 300):
+        week, month = db.get_week_rollup('2024-02-14'), db.get_month_rollup('2024-02-14')
+        assert week == pytest.approx(rollup_of(db, '2024-02-12', '2024-02-18'))
+        assert month == pytest.approx(rollup_of(db, '2024-02-01', '2024-02-29'))
+
+class MutatingCodec:
+    # Runs mutate() once, the first time a snapshot payload is encoded, i.e. after the freeze
+    def __init__(self, codec, mutate):
+        self.codec = codec
+        self.mutate = mutate
+    
+    def __getattr__(self, name):
+        return getattr(self.codec, name)
+    
+    def dumps(self, obj):
+        if self.mutate is not None:
+            mutate, self.mutate = self.mutate, None
+            mutate()
+        return self.codec.dumps(obj)
+
+def test_snapshot_keeps_frozen_state_and_restart_replays_later_changes(tmp_path):
+    json_file = str(tmp_path / 'fitness_data.json')
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    db.create_tables()
+    push = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    bench = db.add_exercise(push, "Bench Press", "Chest")
+    db.add_sets_bulk(push, bench, [(60, 5), (70, 5)])
+    legs = db.create_workout_session("Legs", "Legs", date="2024-05-02", time="10:00")
+    db.add_set(legs, db.add_exercise(legs, "Squat", "Legs"), 100, 5)
+    db.save_data()
+    db.add_set(push, bench, 72.5, 2)
+    
+    # Changes after the freeze: edits, a delete undone and a delete kept
+    frozen_push = json.loads(json.dumps(db.get_workout_session(push)))
+    def mutate():
+        db.update_set(push, bench, 'set_1', weight=65)
+        db.add_set(push, bench, 75, 3)
+        db.delete_set(push, bench, 'set_2')
+        assert db.undo_delete() == 'set'
+        db.delete_workout_session(legs)
+    db.codec = MutatingCodec(db.codec, mutate)
+    files = db.serialize_snapshot()
+    db.codec = db.codec.codec
+    
+    payloads = {os.path.basename(path): decode_snapshot(payload) for path, payload in files if payload is not None}
+    assert payloads[f'{push}.json'] == frozen_push
+    assert sorted(payloads['index.json']['sessions']) == sorted([push, legs])
+    assert db.get_workout_session(push)['exercises'][bench]['sets']['set_1']['weight'] == 65.0
+    
+    # Written as the writer would, then closed before the next snapshot: the journal holds the rest
+    for path, payload in files:
+        if payload is not None:
+            SnapshotWriter.write_atomic(path, payload)
+    db.flush()
+    expected = json.loads(json.dumps(db.get_workout_session(push)))
+    expected_stats = dict(db.get_app_stats())
+    db.close()
+    
+    db = DatabaseManager(json_file, archive_after_days=-1)
+    try:
+        assert list(db.get_session_headers()) == [push]
+        assert db.get_workout_session(push) == expected
+        assert db.get_app_stats() == expected_stats
+        assert db.get_exercise_totals(push, bench) == {"sets": 4, "volume": 65 * 5 + 70 * 5 + 72.5 * 2 + 75 * 3}
+    finally:
+        db.close()
+
+def test_records_are_kept_not_rebuilt_per_query(make_db, monkeypatch):
+    db = make_db()
+    session_id = db.create_workout_session("Push", "Push", date="2024-05-01", time="10:00")
+    exercise_id = db.add_exercise(session_id, "Bench Press", "Chest")
+    for weight in (60, 70, 65):
+        db.add_set(session_id, exercise_id, weight, 5)
+    
+    rebuilds = []
+    original = PersonalRecords.rebuild
+    monkeypatch.setattr(PersonalRecords, 'rebuild', lambda self, *args: rebuilds.append(args) or original(self, *args))
+    db.add_set(session_id, exercise_id, 75, 5)
+    for _ in range(3):
+        assert db.get_personal_records("Bench Press")['max_weight']['value'] == 75.0
+        assert db.get_set_records(session_id, exercise_id, 'set_4') == ['max_weight', 'best_volume', 'best_e1rm']
+    assert rebuilds == []
+    
+    # Kept across a restart without a rebuild either
+    expected = db.get_personal_records("Bench Press")
+    db.save_data()
+    db.close()
+    db = make_db()
+    assert db.get_personal_records("Bench Press") == expected
+    assert rebuilds == []
+    assert expected == rebuilt_records(db, "Bench Press")